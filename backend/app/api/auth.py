@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
-from jose import JWTError
+from jose import JWTError, jwt as jose_jwt
 
 from app.core.config import get_settings
 from app.core.database import get_db_session
@@ -15,6 +15,7 @@ from app.core.security import create_access_token, create_refresh_token, verify_
 from app.services.user_service import UserService
 from app.services.dependencies import get_user_service_dep
 from app.auth.dependencies import get_current_user
+from app.auth.user_cache import invalidate_user
 from app.models.user import User
 from app.schemas.auth import (
     SignUpRequest, 
@@ -124,8 +125,18 @@ async def signin(
     )
 
 @router.post("/signout")
-async def signout():
+async def signout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+):
     """Sign out user (token invalidation would be handled client-side for now)"""
+    # Drop the cached user so the next request with any token re-reads the database.
+    if credentials:
+        try:
+            payload = jose_jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if payload.get("sub"):
+                await invalidate_user(payload["sub"])
+        except JWTError:
+            pass
     return {"message": "Successfully signed out"}
 
 @router.post("/refresh", response_model=TokenResponse)
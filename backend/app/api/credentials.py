@@ -10,6 +10,7 @@ from app.models.user import User
 from app.services.credential_service import CredentialService
 from app.services.dependencies import get_credential_service_dep, get_db_session
 from app.auth.dependencies import get_current_user
+from app.core.credential_cache import get_credential_cache
 from app.schemas.user_credential import (
     CredentialCreateRequest,
     CredentialUpdateRequest,
@@ -215,6 +216,7 @@ async def update_credential(
             
             await db.commit()
             await db.refresh(existing_credential)
+            get_credential_cache().invalidate(user_id, credential_id)
             credential = existing_credential
             
         else:
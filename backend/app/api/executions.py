@@ -1,62 +1,32 @@
 """Workflow Executions API endpoints"""
 
 import logging
+import uuid
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.core.database import get_db_session
+from app.core.profiler import get_profile_path
+from app.models.execution import ExecutionCheckpoint, WorkflowExecution
+from app.models.user import User
+from app.services.dependencies import get_execution_service_dep
+from app.services.execution_service import ExecutionService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Mock executions data
-MOCK_EXECUTIONS = {
-    "1": {
-        "id": "1",
-        "workflow_id": "workflow_1",
-        "workflow_name": "Customer Support Agent",
-        "status": "completed",
-        "input_data": {"message": "Hello, I need help with my order"},
-        "output_data": {"response": "I'd be happy to help you with your order. Could you please provide your order number?"},
-        "execution_time": 2.5,
-        "node_count": 5,
-        "created_at": "2025-01-14T10:30:00Z",
-        "completed_at": "2025-01-14T10:30:02Z",
-        "error_message": None
-    },
-    "2": {
-        "id": "2", 
-        "workflow_id": "workflow_2",
-        "workflow_name": "Document Summarizer",
-        "status": "running",
-        "input_data": {"text": "Long document content..."},
-        "output_data": None,
-        "execution_time": None,
-        "node_count": 8,
-        "created_at": "2025-01-14T11:00:00Z",
-        "completed_at": None,
-        "error_message": None
-    },
-    "3": {
-        "id": "3",
-        "workflow_id": "workflow_1", 
-        "workflow_name": "Customer Support Agent",
-        "status": "failed",
-        "input_data": {"message": "Test message"},
-        "output_data": None,
-        "execution_time": 1.2,
-        "node_count": 5,
-        "created_at": "2025-01-14T09:15:00Z",
-        "completed_at": "2025-01-14T09:15:01Z",
-        "error_message": "OpenAI API rate limit exceeded"
-    }
-}
-
 class ExecutionResponse(BaseModel):
     id: str
-    workflow_id: str
-    workflow_name: str
+    workflow_id: Optional[str]  # None for ad-hoc runs
+    workflow_name: Optional[str]
     status: str  # "running", "completed", "failed", "cancelled"
+    source: Optional[str] = None  # where the run came from, e.g. "api"
     input_data: Dict[str, Any]
     output_data: Optional[Dict[str, Any]]
     execution_time: Optional[float]
@@ -72,110 +42,159 @@ class ExecutionSummary(BaseModel):
     running_executions: int
     average_execution_time: float
 
+def _to_response(execution: WorkflowExecution, workflow_name: Optional[str]) -> ExecutionResponse:
+    def iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return ExecutionResponse(
+        id=str(execution.id),
+        workflow_id=str(execution.workflow_id) if execution.workflow_id else None,
+        workflow_name=workflow_name,
+        status=execution.status,
+        source=execution.source,
+        input_data=execution.inputs or {},
+        output_data=execution.outputs,
+        execution_time=round(execution.duration_ms / 1000, 3) if execution.duration_ms is not None else None,
+        node_count=execution.node_count or 0,
+        created_at=iso(execution.created_at) or "",
+        completed_at=iso(execution.completed_at),
+        error_message=execution.error_message,
+    )
+
+
+async def _get_or_404(
+    execution_service: ExecutionService, db: AsyncSession, execution_id: uuid.UUID, user: User
+):
+    found = await execution_service.get_user_execution(db, execution_id, user.id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return found
+
+
 @router.get("/", response_model=List[ExecutionResponse])
 async def get_executions(
-    workflow_id: Optional[str] = Query(None, description="Filter by workflow ID"),
+    workflow_id: Optional[uuid.UUID] = Query(None, description="Filter by workflow ID"),
     status: Optional[str] = Query(None, description="Filter by execution status"),
-    limit: int = Query(50, description="Maximum number of executions to return"),
-    offset: int = Query(0, description="Number of executions to skip")
+    since: Optional[datetime] = Query(None, description="Only executions started at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only executions started before this time"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of executions to return"),
+    offset: int = Query(0, ge=0, description="Number of executions to skip"),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
 ):
     """Get execution history with optional filtering"""
-    executions = list(MOCK_EXECUTIONS.values())
-    
-    # Apply filters
-    if workflow_id:
-        executions = [e for e in executions if e["workflow_id"] == workflow_id]
-    
-    if status:
-        executions = [e for e in executions if e["status"] == status]
-    
-    # Apply pagination
-    executions = executions[offset:offset + limit]
-    
-    return [ExecutionResponse(**execution) for execution in executions]
+    rows = await execution_service.list_executions(
+        db, current_user.id,
+        workflow_id=workflow_id, status=status, since=since, until=until, skip=offset, limit=limit,
+    )
+    return [_to_response(execution, name) for execution, name in rows]
 
 @router.get("/summary", response_model=ExecutionSummary)
-async def get_execution_summary():
+async def get_execution_summary(
+    workflow_id: Optional[uuid.UUID] = Query(None, description="Filter by workflow ID"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
+):
     """Get execution statistics summary"""
-    executions = list(MOCK_EXECUTIONS.values())
-    
-    total = len(executions)
-    successful = len([e for e in executions if e["status"] == "completed"])
-    failed = len([e for e in executions if e["status"] == "failed"]) 
-    running = len([e for e in executions if e["status"] == "running"])
-    
-    # Calculate average execution time for completed executions
-    completed_executions = [e for e in executions if e["status"] == "completed" and e["execution_time"]]
-    avg_time = sum(e["execution_time"] for e in completed_executions) / len(completed_executions) if completed_executions else 0
-    
-    return ExecutionSummary(
-        total_executions=total,
-        successful_executions=successful,
-        failed_executions=failed,
-        running_executions=running,
-        average_execution_time=round(avg_time, 2)
+    summary = await execution_service.summarize(
+        db, current_user.id, workflow_id=workflow_id, since=since, until=until
     )
+    return ExecutionSummary(**summary)
 
 @router.get("/{execution_id}", response_model=ExecutionResponse)
-async def get_execution(execution_id: str):
+async def get_execution(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
+):
     """Get details of a specific execution"""
-    execution = MOCK_EXECUTIONS.get(execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
-    
-    return ExecutionResponse(**execution)
+    execution, name = await _get_or_404(execution_service, db, execution_id, current_user)
+    return _to_response(execution, name)
 
 @router.delete("/{execution_id}")
-async def delete_execution(execution_id: str):
+async def delete_execution(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
+):
     """Delete an execution record"""
-    if execution_id not in MOCK_EXECUTIONS:
-        raise HTTPException(status_code=404, detail="Execution not found")
-    
-    del MOCK_EXECUTIONS[execution_id]
+    await _get_or_404(execution_service, db, execution_id, current_user)
+    # Bulk deletes, no relationship loading; checkpoints have no FK to the partitioned table.
+    await db.execute(delete(ExecutionCheckpoint).where(ExecutionCheckpoint.execution_id == execution_id))
+    await db.execute(delete(WorkflowExecution).where(WorkflowExecution.id == execution_id))
+    await db.commit()
     return {"message": "Execution deleted successfully"}
 
 @router.post("/{execution_id}/cancel")
-async def cancel_execution(execution_id: str):
+async def cancel_execution(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
+):
     """Cancel a running execution"""
-    execution = MOCK_EXECUTIONS.get(execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    execution, _ = await _get_or_404(execution_service, db, execution_id, current_user)
     
-    if execution["status"] != "running":
+    if execution.status != "running":
         raise HTTPException(status_code=400, detail="Execution is not running")
     
-    execution["status"] = "cancelled"
-    execution["completed_at"] = datetime.utcnow().isoformat() + "Z"
+    execution.status = "cancelled"
+    execution.completed_at = datetime.now(timezone.utc)
+    await db.commit()
     
     return {"message": "Execution cancelled successfully"}
 
+@router.get("/{execution_id}/profile")
+async def get_execution_profile(
+    execution_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Download the speedscope profile of an execution run with ``profile=true``.
+
+    Profiles are stored per user, so only the user who ran the execution can
+    fetch it.  Open the file at https://www.speedscope.app to view it as a
+    flame graph.
+    """
+    path = get_profile_path(execution_id, current_user.id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(
+        path,
+        media_type="application/json",
+        filename=f"{execution_id}.speedscope.json",
+    )
+
 @router.get("/{execution_id}/logs")
-async def get_execution_logs(execution_id: str):
-    """Get detailed logs for an execution"""
-    execution = MOCK_EXECUTIONS.get(execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
-    
-    # Mock logs data
-    logs = [
-        {
-            "timestamp": "2025-01-14T10:30:00.100Z",
-            "level": "INFO", 
-            "node_id": "start_node",
-            "message": "Workflow execution started"
-        },
-        {
-            "timestamp": "2025-01-14T10:30:00.500Z",
-            "level": "INFO",
-            "node_id": "llm_node", 
-            "message": "Processing user input with OpenAI GPT-4"
-        },
-        {
-            "timestamp": "2025-01-14T10:30:02.000Z",
-            "level": "INFO",
-            "node_id": "end_node",
-            "message": "Workflow execution completed successfully"
-        }
-    ]
+async def get_execution_logs(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+    execution_service: ExecutionService = Depends(get_execution_service_dep),
+):
+    """Get the lifecycle log of an execution (history keeps a compact record, not full logs)"""
+    execution, _ = await _get_or_404(execution_service, db, execution_id, current_user)
+
+    logs = [{
+        "timestamp": execution.started_at.isoformat() if execution.started_at else None,
+        "level": "INFO",
+        "node_id": None,
+        "message": "Workflow execution started",
+    }]
+    if execution.completed_at:
+        failed = execution.status == "failed"
+        logs.append({
+            "timestamp": execution.completed_at.isoformat(),
+            "level": "ERROR" if failed else "INFO",
+            "node_id": None,
+            "message": f"Workflow execution failed: {execution.error_message}" if failed
+            else f"Workflow execution {execution.status}",
+        })
     
-    return {"execution_id": execution_id, "logs": logs}
\ No newline at end of file
+    return {"execution_id": str(execution_id), "logs": logs}
@@ -1,60 +1,80 @@
 
+import asyncio
 import json
 import logging
 import uuid
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional, AsyncGenerator, List
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc
 
 from app.core.engine_v2 import get_engine
+from app.core.execution_history import record_execution
+from app.core.profiler import ExecutionProfiler, profile_span
 from app.core.database import get_db_session
-from app.auth.dependencies import get_current_user, get_optional_user
+from app.auth.dependencies import get_current_user, get_current_user_or_api_key, get_optional_user
 from app.models.user import User
 from app.models.workflow import Workflow, WorkflowTemplate
 from app.schemas.workflow import (
     WorkflowCreate, 
     WorkflowUpdate, 
     WorkflowResponse,
+    WorkflowSummaryPage,
+    WorkflowSummaryResponse,
     WorkflowTemplateCreate,
     WorkflowTemplateResponse
 )
 from app.services.workflow_service import WorkflowService, WorkflowTemplateService
-from app.services.dependencies import get_workflow_service_dep, get_workflow_template_service_dep
+from app.services.credential_service import CredentialService
+from app.services.dependencies import (
+    get_credential_service_dep,
+    get_workflow_service_dep,
+    get_workflow_template_service_dep,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Full-row listings return a bare list; the keyset cursor for the next page travels in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _set_next_cursor(response: Response, workflow_service: WorkflowService, workflows, limit: int) -> None:
+    next_cursor = workflow_service.next_cursor(workflows, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
 
 @router.get("/", response_model=List[WorkflowResponse])
 async def get_workflows(
+    response: Response,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_user),
     workflow_service: WorkflowService = Depends(get_workflow_service_dep),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
     Get list of workflows for the current user.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` for keyset
+    pagination; ``skip`` is ignored when a cursor is given.
     """
     try:
         user_id = current_user.id  # Cache user ID
         # Get user's workflows, ordered by updated_at descending
-        query = (
-            select(Workflow)
-            .filter_by(user_id=user_id)
-            .order_by(desc(Workflow.updated_at))
-            .offset(skip)
-            .limit(limit)
+        workflows = await workflow_service.get_user_workflows(
+            db, user_id, skip=skip, limit=limit, cursor=cursor
         )
-        result = await db.execute(query)
-        workflows = result.scalars().all()
-        
+        _set_next_cursor(response, workflow_service, workflows, limit)
         return [WorkflowResponse.model_validate(workflow) for workflow in workflows]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching workflows: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch workflows")
@@ -223,21 +243,27 @@ async def validate_workflow(
 
 @router.get("/public/", response_model=List[WorkflowResponse])
 async def get_public_workflows(
+    response: Response,
     db: AsyncSession = Depends(get_db_session),
     workflow_service: WorkflowService = Depends(get_workflow_service_dep),
     current_user: Optional[User] = Depends(get_optional_user),
     skip: int = 0,
     limit: int = 100,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Get list of public workflows.
     """
     try:
         workflows = await workflow_service.get_public_workflows(
-            db, skip=skip, limit=limit, search=search
+            db, skip=skip, limit=limit, search=search, cursor=cursor
         )
+        if not search:  # ranked search results page with skip
+            _set_next_cursor(response, workflow_service, workflows, limit)
         return [WorkflowResponse.model_validate(workflow) for workflow in workflows]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching public workflows: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch public workflows")
@@ -250,22 +276,70 @@ async def search_workflows(
     current_user: User = Depends(get_current_user),
     workflow_service: WorkflowService = Depends(get_workflow_service_dep),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
-    Search user's workflows by name or description.
+    Search user's workflows by name or description, best matches first
+    (word-prefix full-text match plus typo-tolerant name similarity).
+    Ranked results page with ``skip``; a ``cursor`` is rejected with 400.
     """
     try:
         user_id = current_user.id  # Cache user ID
         workflows = await workflow_service.get_user_workflows(
-            db, user_id, skip=skip, limit=limit, search=q
+            db, user_id, skip=skip, limit=limit, search=q, cursor=cursor
         )
         return [WorkflowResponse.model_validate(workflow) for workflow in workflows]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error searching workflows: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to search workflows")
 
 
+@router.get("/summaries/", response_model=WorkflowSummaryPage)
+async def get_workflow_summaries(
+    db: AsyncSession = Depends(get_db_session),
+    current_user: Optional[User] = Depends(get_optional_user),
+    workflow_service: WorkflowService = Depends(get_workflow_service_dep),
+    public: bool = False,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+):
+    """
+    Slim, keyset-paginated listing for dashboards: no ``flow_data``.
+
+    Lists the current user's workflows, or public ones with ``public=true``
+    (the only option without authentication). With ``q`` results are ranked
+    by relevance and paged with ``skip`` instead of a cursor.
+    """
+    if not public and current_user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    limit = max(1, min(limit, 500))
+    try:
+        workflows = await workflow_service.list_workflows(
+            db,
+            user_id=None if public else current_user.id,
+            public_only=public,
+            search=q,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            summary=True,
+        )
+        return WorkflowSummaryPage(
+            items=[WorkflowSummaryResponse.model_validate(workflow) for workflow in workflows],
+            next_cursor=None if q else workflow_service.next_cursor(workflows, limit),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching workflow summaries: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to fetch workflow summaries")
+
+
 @router.post("/{workflow_id}/duplicate", response_model=WorkflowResponse)
 async def duplicate_workflow(
     workflow_id: uuid.UUID,
@@ -462,18 +536,32 @@ class AdhocExecuteRequest(BaseModel):
     flow_data: Dict[str, Any]
     input_text: str = "Hello"
     session_id: Optional[str] = None
+    profile: bool = False
+    # Saved workflow this flow belongs to; links the execution history record
+    workflow_id: Optional[uuid.UUID] = None
 
 
 @router.post("/execute")
 async def execute_adhoc_workflow(
     req: AdhocExecuteRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_api_key),
+    db: AsyncSession = Depends(get_db_session),
+    credential_service: CredentialService = Depends(get_credential_service_dep),
+    workflow_service: WorkflowService = Depends(get_workflow_service_dep),
 ):
     """
     Execute a workflow directly from flow data and stream the output.
-    This is the primary endpoint for running workflows from the frontend.
+    This is the primary endpoint for running workflows from the frontend;
+    programmatic callers can authenticate with an ``X-API-Key`` header instead.
+
+    With ``profile=true`` the build and execution are profiled; the profile is
+    available from ``GET /api/v1/executions/{execution_id}/profile`` using the
+    ``X-Execution-Id`` response header (also sent on the ``complete`` event).
     """
     engine = get_engine()
+    execution_id = str(uuid.uuid4())
+    started_at = datetime.now(timezone.utc)
+    profiler = ExecutionProfiler(execution_id, user_id=current_user.id).start() if req.profile else None
     session_id = req.session_id or str(uuid.uuid4())
     user_id = current_user.id  # Cache user ID
     user_email = current_user.email  # Cache user email
@@ -483,8 +571,18 @@ async def execute_adhoc_workflow(
         "user_email": user_email
     }
 
+    # Only link the history record to the user's own workflow: an unknown id would fail
+    # the batched insert, and another user's would delete the record with their workflow
+    workflow_id = None
+    if req.workflow_id and await workflow_service.get_by_id(db, req.workflow_id, user_id):
+        workflow_id = req.workflow_id
+
+    profile_token = profiler.activate() if profiler else None
     try:
-        engine.build(flow_data=req.flow_data, user_context=user_context)
+        # One query for every credential the flow references
+        credentials = await credential_service.prefetch_flow_credentials(db, user_id, req.flow_data)
+        # The build resolves from this list, never with a blocking query on the event loop
+        engine.build(flow_data=req.flow_data, user_context={**user_context, "credentials": credentials})
         result_stream = await engine.execute(
             inputs={"input": req.input_text},
             stream=True,
@@ -492,7 +590,17 @@ async def execute_adhoc_workflow(
         )
     except Exception as e:
         logger.error(f"Error during graph build or execution: {e}", exc_info=True)
+        if profiler:
+            profiler.deactivate(profile_token)
+            profiler.finish()
+            profiler = None
+        record_execution(
+            execution_id=execution_id, user_id=user_id, workflow_id=workflow_id,
+            status="failed", started_at=started_at, inputs={"input": req.input_text}, error=str(e),
+        )
         raise HTTPException(status_code=400, detail=f"Failed to run workflow: {e}")
+    if profiler:
+        profiler.deactivate(profile_token)
 
     def _make_chunk_serializable(obj):
         """Convert any object to a JSON-serializable format."""
@@ -518,6 +626,9 @@ async def execute_adhoc_workflow(
             return str(obj)
     
     async def event_generator():
+        stream_token = profiler.activate() if profiler else None
+        # Outcome for the history record; stays "cancelled" if the client disconnects
+        outcome: Dict[str, Any] = {"status": "cancelled"}
         try:
             if not isinstance(result_stream, AsyncGenerator):
                 raise TypeError("Expected an async generator from the engine for streaming.")
@@ -526,8 +637,19 @@ async def execute_adhoc_workflow(
                 # Make chunk serializable before JSON conversion
                 try:
                     # Use the same serialization method as the graph builder
-                    serialized_chunk = _make_chunk_serializable(chunk)
-                    yield f"data: {json.dumps(serialized_chunk)}\n\n"
+                    with profile_span("sse_serialize"):
+                        serialized_chunk = _make_chunk_serializable(chunk)
+                        if isinstance(serialized_chunk, dict) and serialized_chunk.get("type") == "complete":
+                            serialized_chunk["execution_id"] = execution_id
+                            outcome = {
+                                "status": "completed",
+                                "output": serialized_chunk.get("result"),
+                                "node_count": len(serialized_chunk.get("executed_nodes") or []),
+                            }
+                        elif isinstance(serialized_chunk, dict) and serialized_chunk.get("type") == "error":
+                            outcome = {"status": "failed", "error": serialized_chunk.get("error")}
+                        payload = json.dumps(serialized_chunk)
+                    yield f"data: {payload}\n\n"
                 except (TypeError, ValueError) as e:
                     # Handle non-serializable objects
                     logger.warning(f"Non-serializable chunk: {e}")
@@ -535,7 +657,20 @@ async def execute_adhoc_workflow(
                     yield f"data: {json.dumps(safe_chunk)}\n\n"
         except Exception as e:
             logger.error(f"Streaming execution error: {e}", exc_info=True)
+            outcome = {"status": "failed", "error": str(e)}
             error_data = {"event": "error", "data": str(e)}
             yield f"data: {json.dumps(error_data)}\n\n"
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+        finally:
+            record_execution(
+                execution_id=execution_id, user_id=user_id, workflow_id=workflow_id,
+                started_at=started_at, inputs={"input": req.input_text}, **outcome,
+            )
+            if profiler:
+                profiler.deactivate(stream_token)
+                await asyncio.get_running_loop().run_in_executor(None, profiler.finish)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"X-Execution-Id": execution_id},
+    )
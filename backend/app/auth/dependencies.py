@@ -1,15 +1,18 @@
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.user_cache import get_user_cache
 from app.models.user import User
+from app.services.api_key_service import APIKeyService
 from app.services.user_service import UserService
-from app.services.dependencies import get_user_service_dep, get_db_session
+from app.services.dependencies import get_api_key_service, get_user_service_dep, get_db_session
 from app.core.config import get_settings
 
 security = HTTPBearer()
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 settings = get_settings()
 
 async def get_current_user(
@@ -19,6 +22,9 @@ async def get_current_user(
 ) -> User:
     """
     Decode JWT and return the database user.
+
+    Users are served from the short-TTL user cache when possible, so most
+    authenticated requests do not touch the database here.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,9 +41,15 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    user_cache = get_user_cache()
+    user = await user_cache.get(email)
+    if user is not None:
+        return user
+
     user = await user_service.get_by_email(db, email=email)
     if user is None:
         raise credentials_exception
+    await user_cache.set(email, user)
     return user
 
 async def get_optional_user(
@@ -53,4 +65,41 @@ async def get_optional_user(
     try:
         return await get_current_user(credentials, db, user_service)
     except HTTPException:
-        return None
\ No newline at end of file
+        return None
+
+async def get_api_key_user(
+    api_key: Optional[str] = Depends(api_key_header),
+    db: AsyncSession = Depends(get_db_session),
+    api_key_service: APIKeyService = Depends(get_api_key_service),
+) -> User:
+    """
+    Authenticate a programmatic caller by its ``X-API-Key`` header.
+    """
+    user = await api_key_service.authenticate(db, api_key) if api_key else None
+    if user is None or user.status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+            headers={"WWW-Authenticate": "APIKey"},
+        )
+    return user
+
+async def get_current_user_or_api_key(
+    api_key: Optional[str] = Depends(api_key_header),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_db_session),
+    user_service: UserService = Depends(get_user_service_dep),
+    api_key_service: APIKeyService = Depends(get_api_key_service),
+) -> User:
+    """
+    Accept either an ``X-API-Key`` header or a Bearer JWT (API key wins if both are sent).
+    """
+    if api_key:
+        return await get_api_key_user(api_key, db, api_key_service)
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(credentials, db, user_service)
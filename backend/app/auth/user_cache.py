@@ -0,0 +1,209 @@
+"""Short-lived cache of authenticated users, keyed by JWT subject.
+
+``get_current_user`` runs on every authenticated request, and without a cache
+each of them costs a ``SELECT ... FROM users``.  The cache keeps a snapshot of
+the user's columns for ``AUTH_USER_CACHE_TTL_SECONDS`` and hands out a fresh
+detached :class:`User` per request, so callers can still ``db.add()`` it
+(e.g. ``UserService.update_user``) without two requests sharing one instance.
+
+Backends (``AUTH_USER_CACHE_BACKEND``):
+
+* ``memory`` – per-process LRU bounded by ``AUTH_USER_CACHE_MAX_SIZE``.
+  Invalidation only reaches the local process, so the TTL bounds staleness
+  on other pods.
+* ``redis``  – shared across pods via ``REDIS_URL``; invalidation is global.
+  Redis errors are logged and treated as cache misses.
+* ``none``   – disabled.
+
+Secret columns (password hash, stored credential, temp token) are never
+cached; on the returned instance they are expired and load on first access
+once it is attached to a session.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.sql import sqltypes
+
+from app.core.config import get_settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["UserCache", "get_user_cache", "invalidate_user"]
+
+_SECRET_COLUMNS = frozenset({"password_hash", "credential", "temp_token"})
+_REDIS_PREFIX = "kai:auth:user:"
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    state = inspect(user)
+    return {
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key not in _SECRET_COLUMNS and column.key not in state.unloaded
+    }
+
+
+def _materialize(snapshot: Dict[str, Any]) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def _encode(snapshot: Dict[str, Any]) -> str:
+    return json.dumps(
+        {key: value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, uuid.UUID) else value
+         for key, value in snapshot.items()}
+    )
+
+
+def _decode(payload: str) -> Dict[str, Any]:
+    data = json.loads(payload)
+    columns = User.__table__.columns
+    for key, value in data.items():
+        if value is None:
+            continue
+        column_type = columns[key].type
+        if isinstance(column_type, sqltypes.DateTime):
+            data[key] = datetime.fromisoformat(value)
+        elif isinstance(column_type, sqltypes.Uuid):
+            data[key] = uuid.UUID(value)
+    return data
+
+
+class _MemoryBackend:
+    def __init__(self, ttl: float, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    async def set(self, key: str, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _RedisBackend:
+    def __init__(self, url: str, ttl: float):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = await self._client.get(_REDIS_PREFIX + key)
+        return _decode(payload) if payload else None
+
+    async def set(self, key: str, snapshot: Dict[str, Any]) -> None:
+        await self._client.set(_REDIS_PREFIX + key, _encode(snapshot), ex=self._ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(_REDIS_PREFIX + key)
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=_REDIS_PREFIX + "*"):
+            await self._client.delete(key)
+
+
+class UserCache:
+    """Subject -> user cache used by ``get_current_user``."""
+
+    def __init__(self, backend: Optional[Any]):
+        self._backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    async def get(self, subject: str) -> Optional[User]:
+        if self._backend is None:
+            return None
+        try:
+            snapshot = await self._backend.get(subject)
+        except Exception as e:
+            logger.warning("User cache lookup failed, falling back to database: %s", e)
+            return None
+        return _materialize(snapshot) if snapshot else None
+
+    async def set(self, subject: str, user: User) -> None:
+        if self._backend is None:
+            return
+        try:
+            await self._backend.set(subject, _snapshot(user))
+        except Exception as e:
+            logger.warning("User cache store failed: %s", e)
+
+    async def invalidate(self, subject: str) -> None:
+        if self._backend is None:
+            return
+        try:
+            await self._backend.delete(subject)
+        except Exception as e:
+            logger.warning("User cache invalidation failed for %s: %s", subject, e)
+
+    async def clear(self) -> None:
+        if self._backend is not None:
+            await self._backend.clear()
+
+
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get the process-wide user cache, built from settings on first use."""
+    global _user_cache
+    if _user_cache is None:
+        settings = get_settings()
+        mode = settings.AUTH_USER_CACHE_BACKEND
+        backend: Optional[Any] = None
+        if mode == "memory":
+            backend = _MemoryBackend(settings.AUTH_USER_CACHE_TTL_SECONDS, settings.AUTH_USER_CACHE_MAX_SIZE)
+        elif mode == "redis":
+            try:
+                backend = _RedisBackend(settings.REDIS_URL, settings.AUTH_USER_CACHE_TTL_SECONDS)
+            except ImportError:
+                logger.warning("redis is not installed; falling back to the in-memory user cache")
+                backend = _MemoryBackend(settings.AUTH_USER_CACHE_TTL_SECONDS, settings.AUTH_USER_CACHE_MAX_SIZE)
+        elif mode != "none":
+            logger.warning("Unknown AUTH_USER_CACHE_BACKEND '%s'; user cache disabled", mode)
+        _user_cache = UserCache(backend)
+    return _user_cache
+
+
+async def invalidate_user(email: str) -> None:
+    """Drop the cached entry for ``email`` (profile update, sign-out, deactivation)."""
+    await get_user_cache().invalidate(email)
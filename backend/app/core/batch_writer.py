@@ -0,0 +1,146 @@
+"""Background batch inserter for append-only tables.
+
+Callers :meth:`~BatchInsertWriter.submit` plain row dicts; a daemon thread
+drains a bounded queue and inserts them ``batch_size`` at a time (or every
+``flush_interval`` seconds) through the synchronous engine, so it works the
+same from the API event loop and from Celery workers.  If a batch fails the
+rows are retried one by one, so one bad row cannot sink the others.  When
+the queue is full, rows are dropped and counted instead of blocking the
+caller.
+
+Used by the execution history (:mod:`app.core.execution_history`) and the
+database chat history (:mod:`app.core.chat_history`).
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Table, insert
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BatchInsertWriter"]
+
+_STOP = object()
+
+Row = Dict[str, Any]
+
+
+class BatchInsertWriter:
+    """Queue + background thread that batch-inserts rows into one table."""
+
+    def __init__(
+        self,
+        table: Callable[[], Table],
+        *,
+        name: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        on_flushed: Optional[Callable[[List[Row]], None]] = None,
+    ):
+        # ``table`` is a callable so models are imported lazily in the thread
+        self._table = table
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flushed = on_flushed
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+    def start(self) -> "BatchInsertWriter":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush pending rows and stop the thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("%s queue full at shutdown; pending rows lost", self.name)
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def submit(self, row: Row) -> bool:
+        """Enqueue a row without blocking; returns ``False`` if it was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("%s queue full; %d rows dropped so far", self.name, self.dropped)
+            return False
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        batch: List[Row] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: List[Row]) -> None:
+        if not batch:
+            return
+        try:
+            self._insert(batch)
+        finally:
+            if self.on_flushed is not None:
+                try:
+                    self.on_flushed(batch)
+                except Exception as e:
+                    logger.error("%s flush callback failed: %s", self.name, e)
+
+    def _insert(self, batch: List[Row]) -> None:
+        from app.core.database import sync_engine
+
+        statement = insert(self._table())
+        try:
+            with sync_engine.begin() as conn:
+                conn.execute(statement, batch)
+            self.written += len(batch)
+            return
+        except Exception as e:
+            logger.warning("%s: batch insert of %d rows failed (%s); retrying row by row", self.name, len(batch), e)
+
+        for row in batch:
+            try:
+                with sync_engine.begin() as conn:
+                    conn.execute(statement, [row])
+                self.written += 1
+            except Exception as e:
+                logger.error("%s: dropping row %s: %s", self.name, row.get("id"), e)
@@ -22,7 +22,8 @@ def create_celery_app() -> Celery:
         backend=redis_url,
         include=[
             "app.tasks.workflow_tasks",
-            "app.tasks.monitoring_tasks"
+            "app.tasks.monitoring_tasks",
+            "app.tasks.maintenance_tasks"
         ]
     )
     
@@ -32,6 +33,7 @@ def create_celery_app() -> Celery:
         task_routes={
             "app.tasks.workflow_tasks.*": {"queue": "workflows"},
             "app.tasks.monitoring_tasks.*": {"queue": "monitoring"},
+            "app.tasks.maintenance_tasks.*": {"queue": "monitoring"},
         },
         
         # Task execution
@@ -67,6 +69,14 @@ def create_celery_app() -> Celery:
                 "task": "app.tasks.monitoring_tasks.cleanup_old_tasks",
                 "schedule": 3600.0,  # Run every hour
             },
+            "maintain-partitions": {
+                "task": "app.tasks.maintenance_tasks.maintain_partitions",
+                "schedule": 86400.0,  # Run daily
+            },
+            "prune-profiles": {
+                "task": "app.tasks.maintenance_tasks.prune_profiles",
+                "schedule": 3600.0,  # Run every hour
+            },
             "health-check": {
                 "task": "app.tasks.monitoring_tasks.health_check",
                 "schedule": 300.0,  # Run every 5 minutes
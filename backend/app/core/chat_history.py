@@ -0,0 +1,274 @@
+"""Chat history persisted to the ``chat_message`` table.
+
+:class:`DatabaseChatMessageHistory` is the durable alternative to the
+session memory store (:mod:`app.core.session_memory`) for memory nodes with
+``storage="database"``:
+
+* Appends are O(1): each message becomes one row handed to a shared
+  :class:`~app.core.batch_writer.BatchInsertWriter`, which inserts them in
+  batches off the request path.
+* Reads load only the newest ``max_messages`` rows of one conversation through
+  the ``(user_id, chatflow_id, session_id, created_at)`` index, never the
+  whole log.
+* Messages that are queued but not flushed yet are tracked per conversation
+  and merged into reads, so the next turn sees them even before they reach
+  the database.
+
+A conversation is identified by the authenticated ``user_id``, ``chatflow_id``
+(the memory's scope – the node, or an explicit id to share history between a
+user's flows) and ``session_id``.  The last two come from the client, so
+every read, write and delete is restricted to the user's own rows.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from app.core.batch_writer import BatchInsertWriter
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DatabaseChatMessageHistory",
+    "chat_flow_id",
+    "get_chat_history",
+    "get_chat_history_writer",
+    "stop_chat_history_writer",
+]
+
+
+# Namespace for deriving chatflow ids from memory scopes that are not UUIDs
+_CHATFLOW_NAMESPACE = uuid.UUID("5b0c3c1e-7f0a-4c55-9a57-1d3f3e0c6a42")
+
+# LangChain message type <-> chat_message.role (constrained in the schema)
+_ROLES = {"human": "user", "ai": "assistant", "system": "system", "function": "function", "tool": "tool"}
+_MESSAGE_CLASSES = {"user": HumanMessage, "assistant": AIMessage, "system": SystemMessage}
+
+_Conversation = Tuple[Optional[uuid.UUID], uuid.UUID, str]  # (user_id, chatflow_id, session_id)
+
+
+def chat_flow_id(scope: Union[str, uuid.UUID]) -> uuid.UUID:
+    """``chatflow_id`` for a memory scope: the scope itself if it is a UUID, else a stable UUIDv5."""
+    if isinstance(scope, uuid.UUID):
+        return scope
+    try:
+        return uuid.UUID(str(scope))
+    except ValueError:
+        return uuid.uuid5(_CHATFLOW_NAMESPACE, str(scope))
+
+
+def _chat_table():
+    from app.models.chat import ChatMessage
+
+    return ChatMessage.__table__
+
+
+def _content(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+
+
+def _to_message(role: str, content: str) -> BaseMessage:
+    return _MESSAGE_CLASSES.get(role, HumanMessage)(content=content)
+
+
+def _row_key(row: Dict[str, Any]) -> _Conversation:
+    return (row["user_id"], row["chatflow_id"], row["session_id"])
+
+
+# ----------------------------------------------------------------------------
+# Writer with pending-row tracking
+# ----------------------------------------------------------------------------
+
+class _PendingRows:
+    """Rows queued for insert but not yet flushed, by conversation."""
+
+    def __init__(self):
+        self._rows: Dict[_Conversation, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, rows: Sequence[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self._rows.setdefault(_row_key(row), []).append(row)
+
+    def discard(self, rows: Sequence[Dict[str, Any]]) -> None:
+        flushed = {row["id"] for row in rows}
+        with self._lock:
+            for key in {_row_key(row) for row in rows}:
+                remaining = [row for row in self._rows.get(key, ()) if row["id"] not in flushed]
+                if remaining:
+                    self._rows[key] = remaining
+                else:
+                    self._rows.pop(key, None)
+
+    def drop(self, key: _Conversation) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._rows.pop(key, [])
+
+    def get(self, key: _Conversation) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._rows.get(key, ()))
+
+
+_pending = _PendingRows()
+_writer: Optional[BatchInsertWriter] = None
+_writer_lock = threading.Lock()
+
+
+def stop_chat_history_writer() -> None:
+    """Flush and stop the writer if it was started (call before the engines are disposed)."""
+    if _writer is not None:
+        _writer.stop()
+
+
+def get_chat_history_writer() -> BatchInsertWriter:
+    """Get the process-wide ``chat_message`` writer (started lazily on first message)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            settings = get_settings()
+            _writer = BatchInsertWriter(
+                _chat_table,
+                name="chat-history-writer",
+                batch_size=settings.CHAT_HISTORY_BATCH_SIZE,
+                flush_interval=settings.CHAT_HISTORY_FLUSH_INTERVAL,
+                max_queue=settings.CHAT_HISTORY_QUEUE_SIZE,
+                on_flushed=_pending.discard,
+            )
+            atexit.register(stop_chat_history_writer)
+    return _writer
+
+
+# ----------------------------------------------------------------------------
+# LangChain adapter
+# ----------------------------------------------------------------------------
+
+class DatabaseChatMessageHistory(BaseChatMessageHistory):
+    """LangChain chat history reading and appending ``chat_message`` rows."""
+
+    def __init__(
+        self,
+        chatflow_id: Union[str, uuid.UUID],
+        session_id: Optional[str] = None,
+        *,
+        user_id: Optional[Union[str, uuid.UUID]] = None,
+        max_messages: int = 50,
+    ):
+        self.chatflow_id = chat_flow_id(chatflow_id)
+        self.session_id = session_id or "default_session"
+        self.user_id = uuid.UUID(str(user_id)) if user_id else None
+        self.max_messages = max_messages
+
+    @property
+    def _key(self) -> _Conversation:
+        return (self.user_id, self.chatflow_id, self.session_id)
+
+    def _where(self, table: Any) -> List[Any]:
+        owner = table.c.user_id.is_(None) if self.user_id is None else table.c.user_id == self.user_id
+        return [owner, table.c.chatflow_id == self.chatflow_id, table.c.session_id == self.session_id]
+
+    def _load_rows(self) -> List[Tuple[datetime, str, str]]:
+        """Newest ``max_messages`` rows as ``(created_at, role, content)``, oldest first."""
+        from sqlalchemy import select
+
+        from app.core.database import sync_engine
+
+        table = _chat_table()
+        query = (
+            select(table.c.created_at, table.c.role, table.c.content)
+            .where(*self._where(table))
+            .order_by(table.c.created_at.desc())
+        )
+        if self.max_messages > 0:
+            query = query.limit(self.max_messages)
+        with sync_engine.connect() as conn:
+            rows = [tuple(row) for row in conn.execute(query)]
+        rows.reverse()
+        return rows
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        # Snapshot pending rows first: a row flushed between the two reads is
+        # then seen twice at worst (deduplicated below), never missed.
+        pending = _pending.get(self._key)
+        try:
+            stored = self._load_rows()
+        except Exception as e:
+            logger.warning("Chat history read failed for %s/%s: %s", self.chatflow_id, self.session_id, e)
+            stored = []
+
+        seen = {(created_at, role, content) for created_at, role, content in stored}
+        combined = stored + [
+            (row["created_at"], row["role"], row["content"])
+            for row in pending
+            if (row["created_at"], row["role"], row["content"]) not in seen
+        ]
+        combined.sort(key=lambda item: item[0])
+        if self.max_messages > 0:
+            combined = combined[-self.max_messages:]
+        return [_to_message(role, content) for _, role, content in combined]
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        now = datetime.now(timezone.utc)
+        rows = []
+        for offset, message in enumerate(messages):
+            content = _content(message)
+            if not content:
+                continue  # chat_message rejects empty content
+            rows.append({
+                "id": uuid.uuid4(),
+                "role": _ROLES.get(message.type, "user"),
+                "chatflow_id": self.chatflow_id,
+                "session_id": self.session_id,
+                "user_id": self.user_id,
+                "content": content,
+                # Distinct timestamps keep messages of one call in order
+                "created_at": now + timedelta(microseconds=offset),
+            })
+        if not rows:
+            return
+        _pending.add(rows)
+        writer = get_chat_history_writer()
+        dropped = [row for row in rows if not writer.submit(row)]
+        if dropped:
+            _pending.discard(dropped)
+
+    def clear(self) -> None:
+        from sqlalchemy import delete
+
+        from app.core.database import sync_engine
+
+        _pending.drop(self._key)
+        table = _chat_table()
+        try:
+            with sync_engine.begin() as conn:
+                conn.execute(delete(table).where(*self._where(table)))
+        except Exception as e:
+            logger.warning("Chat history clear failed for %s/%s: %s", self.chatflow_id, self.session_id, e)
+
+
+def get_chat_history(
+    storage: str,
+    session_id: Optional[str],
+    scope: str,
+    *,
+    chatflow_id: Optional[str] = None,
+    max_messages: int = 50,
+    user_id: Optional[str] = None,
+) -> BaseChatMessageHistory:
+    """Chat history of ``user_id``'s session for a memory node: the session memory store or ``chat_message`` rows."""
+    if storage == "database":
+        return DatabaseChatMessageHistory(chatflow_id or scope, session_id, user_id=user_id, max_messages=max_messages)
+    from app.core.session_memory import SessionChatMessageHistory, session_memory_key
+
+    return SessionChatMessageHistory(session_memory_key(session_id, scope, user_id))
@@ -18,6 +18,7 @@ class Settings(BaseSettings):
 
     # Core settings
     APP_NAME: str = "KAI Fusion"
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() in ("true", "1", "t")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     API_V1_STR: str = "/api/v1"
 
@@ -39,6 +40,11 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "5"))
     DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
     DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "t")
+    # Async engine pooling: "null" opens a connection per session and disables prepared
+    # statements (safe behind pgbouncer / serverless); "queue" keeps a per-process pool
+    # of DB_POOL_SIZE + DB_MAX_OVERFLOW connections for long-running pods.
+    DB_POOL_MODE: str = os.getenv("DB_POOL_MODE", "null").lower()
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
     
     # Supabase specific settings
     SUPABASE_URL: Optional[str] = os.getenv("SUPABASE_URL")
@@ -77,6 +83,14 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # Add this line
     CREDENTIAL_MASTER_KEY: Optional[str] = os.getenv("CREDENTIAL_MASTER_KEY")
+    # Comma-separated older master keys, still accepted for decryption during a key rotation
+    CREDENTIAL_PREVIOUS_KEYS: Optional[str] = os.getenv("CREDENTIAL_PREVIOUS_KEYS")
+    API_KEY_HASH_SECRET: Optional[str] = os.getenv("API_KEY_HASH_SECRET")  # defaults to SECRET_KEY
+    # Authenticated-user cache used by get_current_user: "memory", "redis" or "none"
+    AUTH_USER_CACHE_BACKEND: str = os.getenv("AUTH_USER_CACHE_BACKEND", "memory").lower()
+    AUTH_USER_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    AUTH_USER_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", "10000"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = [
@@ -90,6 +104,12 @@ class Settings(BaseSettings):
     
     # Logging Settings
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() in ("true", "1", "t")
+    # "debug" logs every node of every execution; "production" only emits
+    # hot-path debug records for a sampled fraction of executions.
+    EXECUTION_LOG_MODE: str = os.getenv("EXECUTION_LOG_MODE", "debug")
+    EXECUTION_LOG_SAMPLE_RATE: float = float(os.getenv("EXECUTION_LOG_SAMPLE_RATE", "0.01"))
     
     # LangSmith Settings (Optional)
     LANGCHAIN_TRACING_V2: bool = os.getenv("LANGCHAIN_TRACING_V2", "false").lower() == "true"
@@ -100,6 +120,84 @@ class Settings(BaseSettings):
     # Session Management
     SESSION_TTL_MINUTES: int = int(os.getenv("SESSION_TTL_MINUTES", "30"))
     MAX_SESSIONS: int = int(os.getenv("MAX_SESSIONS", "1000"))
+    # Conversation memory store for memory/agent nodes: "memory" (per process) or "redis"
+    SESSION_MEMORY_BACKEND: str = os.getenv("SESSION_MEMORY_BACKEND", "memory").lower()
+    SESSION_MEMORY_MAX_MB: int = int(os.getenv("SESSION_MEMORY_MAX_MB", "256"))
+    # Background threads running SummaryMemory summarization off the request path
+    SUMMARY_MEMORY_WORKERS: int = int(os.getenv("SUMMARY_MEMORY_WORKERS", "2"))
+    
+    # Execution history (compact record per execution, batch-written in the background)
+    EXECUTION_HISTORY_ENABLED: bool = os.getenv("EXECUTION_HISTORY_ENABLED", "true").lower() in ("true", "1", "t")
+    EXECUTION_HISTORY_BATCH_SIZE: int = int(os.getenv("EXECUTION_HISTORY_BATCH_SIZE", "100"))
+    EXECUTION_HISTORY_FLUSH_INTERVAL: float = float(os.getenv("EXECUTION_HISTORY_FLUSH_INTERVAL", "1.0"))
+    EXECUTION_HISTORY_QUEUE_SIZE: int = int(os.getenv("EXECUTION_HISTORY_QUEUE_SIZE", "10000"))
+    EXECUTION_HISTORY_MAX_OUTPUT_CHARS: int = int(os.getenv("EXECUTION_HISTORY_MAX_OUTPUT_CHARS", "2000"))
+
+    # Database chat history for memory nodes with storage="database" (batch-written to chat_message)
+    CHAT_HISTORY_BATCH_SIZE: int = int(os.getenv("CHAT_HISTORY_BATCH_SIZE", "100"))
+    CHAT_HISTORY_FLUSH_INTERVAL: float = float(os.getenv("CHAT_HISTORY_FLUSH_INTERVAL", "0.5"))
+    CHAT_HISTORY_QUEUE_SIZE: int = int(os.getenv("CHAT_HISTORY_QUEUE_SIZE", "10000"))
+
+    # Decrypted credential cache (shared by CredentialService and CredentialProvider)
+    CREDENTIAL_CACHE_TTL_SECONDS: int = int(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "300"))
+    CREDENTIAL_CACHE_MAX_SIZE: int = int(os.getenv("CREDENTIAL_CACHE_MAX_SIZE", "1000"))
+    # How long an unknown or undecryptable credential reference is remembered as missing
+    CREDENTIAL_NEGATIVE_CACHE_TTL_SECONDS: int = int(os.getenv("CREDENTIAL_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+
+    # History retention: monthly partitions older than this are dropped (0 = keep forever)
+    EXECUTION_RETENTION_MONTHS: int = int(os.getenv("EXECUTION_RETENTION_MONTHS", "6"))
+    LOGIN_ACTIVITY_RETENTION_MONTHS: int = int(os.getenv("LOGIN_ACTIVITY_RETENTION_MONTHS", "12"))
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+    
+    # Managed local FAISS indexes (see app.core.faiss_store)
+    FAISS_SNAPSHOT_INTERVAL_SECONDS: float = float(os.getenv("FAISS_SNAPSHOT_INTERVAL_SECONDS", "60"))
+    FAISS_MMAP_THRESHOLD_MB: int = int(os.getenv("FAISS_MMAP_THRESHOLD_MB", "512"))
+    FAISS_ADD_BATCH_SIZE: int = int(os.getenv("FAISS_ADD_BATCH_SIZE", "256"))
+    FAISS_IVF_NLIST: int = int(os.getenv("FAISS_IVF_NLIST", "1024"))
+    FAISS_IVF_NPROBE: int = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+    FAISS_HNSW_M: int = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_HNSW_EF_SEARCH: int = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+    # Node folder paths resolve under <FAISS_ROOT_DIR>/<user id>/ (see app.core.storage_paths)
+    FAISS_ROOT_DIR: str = os.getenv("FAISS_ROOT_DIR", "data/faiss")
+    
+    # Shared Qdrant/Chroma clients (see app.core.vector_clients): texts per upsert request
+    VECTOR_STORE_UPSERT_BATCH: int = int(os.getenv("VECTOR_STORE_UPSERT_BATCH", "64"))
+    # Embedded Qdrant paths and Chroma directories resolve under <root>/<user id>/
+    QDRANT_LOCAL_ROOT_DIR: str = os.getenv("QDRANT_LOCAL_ROOT_DIR", "data/qdrant")
+    CHROMA_ROOT_DIR: str = os.getenv("CHROMA_ROOT_DIR", "data/chroma")
+    
+    # Retrieval result and query-embedding cache for the shared vector stores (see app.core.retrieval_cache)
+    RETRIEVAL_CACHE_ENABLED: bool = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() in ("true", "1", "t")
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "2048"))
+    RETRIEVAL_CACHE_TTL_SECONDS: float = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+    RETRIEVAL_QUERY_VECTOR_CACHE_SIZE: int = int(os.getenv("RETRIEVAL_QUERY_VECTOR_CACHE_SIZE", "4096"))
+    
+    # Content-addressed embedding cache used by the embedding nodes (see app.core.embedding_cache)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("true", "1", "t")
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_FLOAT16: bool = os.getenv("EMBEDDING_CACHE_FLOAT16", "true").lower() in ("true", "1", "t")
+    EMBEDDING_CACHE_REDIS: bool = os.getenv("EMBEDDING_CACHE_REDIS", "false").lower() in ("true", "1", "t")
+    EMBEDDING_CACHE_REDIS_TTL_SECONDS: int = int(os.getenv("EMBEDDING_CACHE_REDIS_TTL_SECONDS", "604800"))
+    
+    # Local (sentence-transformers) embedding inference: shared models, micro-batched encoding
+    LOCAL_EMBEDDING_WORKERS: int = int(os.getenv("LOCAL_EMBEDDING_WORKERS", "1"))
+    LOCAL_EMBEDDING_MAX_BATCH: int = int(os.getenv("LOCAL_EMBEDDING_MAX_BATCH", "64"))
+    LOCAL_EMBEDDING_BATCH_WAIT_MS: float = float(os.getenv("LOCAL_EMBEDDING_BATCH_WAIT_MS", "5"))
+    # Models kept loaded at once; the least recently used one is unloaded beyond this
+    LOCAL_EMBEDDING_MAX_MODELS: int = int(os.getenv("LOCAL_EMBEDDING_MAX_MODELS", "4"))
+    
+    # Document ingestion pipeline: documents per split task sent to a worker process
+    INGESTION_SPLIT_BATCH: int = int(os.getenv("INGESTION_SPLIT_BATCH", "16"))
+    # Server-side caps on the per-flow ingestion settings
+    INGESTION_MAX_SPLIT_WORKERS: int = int(os.getenv("INGESTION_MAX_SPLIT_WORKERS", "4"))
+    INGESTION_MAX_CONCURRENCY: int = int(os.getenv("INGESTION_MAX_CONCURRENCY", "16"))
+    INGESTION_MAX_EMBED_BATCH: int = int(os.getenv("INGESTION_MAX_EMBED_BATCH", "1024"))
+    
+    # Execution profiling (opt-in per request)
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "2"))
+    # Profiles older than this are deleted (0 keeps them forever)
+    PROFILE_RETENTION_HOURS: float = float(os.getenv("PROFILE_RETENTION_HOURS", "24"))
     
     # File Upload Settings
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
@@ -150,21 +248,9 @@ def get_settings() -> Settings:
 
 def setup_logging(settings: Settings):
     """Setup logging configuration"""
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler("app.log") if not settings.DEBUG else logging.NullHandler()
-        ]
-    )
-    
-    # Set specific loggers
-    logging.getLogger("uvicorn").setLevel(logging.INFO)
-    logging.getLogger("fastapi").setLevel(logging.INFO)
-    
-    if settings.DEBUG:
-        logging.getLogger("app").setLevel(logging.DEBUG)
+    from app.core.logging_config import configure_logging
+
+    configure_logging(settings)
 
 def setup_langsmith(settings: Settings):
     """Setup LangSmith tracing if enabled"""
@@ -0,0 +1,223 @@
+"""Process-wide cache of decrypted user credentials.
+
+Both :class:`~app.services.credential_service.CredentialService` and
+:class:`~app.core.credential_provider.CredentialProvider` read through this
+cache instead of base64-decoding and Fernet-decrypting on every access.
+
+* Size-bounded LRU (``CREDENTIAL_CACHE_MAX_SIZE``) with a per-entry TTL
+  (``CREDENTIAL_CACHE_TTL_SECONDS``).
+* Entries carry the row's ``updated_at``; a lookup with a newer version is a
+  miss, so other processes' updates are picked up even before the TTL.
+* :meth:`CredentialCache.invalidate` drops one credential or all of a user's
+  credentials; the service calls it on update and delete.
+* References that resolved to nothing (unknown id or name, undecryptable
+  secret) are remembered for ``CREDENTIAL_NEGATIVE_CACHE_TTL_SECONDS`` via
+  :meth:`CredentialCache.put_missing`, so a flow with a dangling reference
+  does not query the database on every build.  Invalidating a user's
+  credential also forgets that user's misses.
+* Secrets are held as a ``bytearray`` of their JSON and overwritten with
+  zeros when an entry is evicted, expires or is invalidated.  Callers get a
+  freshly parsed copy on every hit – copies handed out are theirs to drop,
+  Python cannot wipe them.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+__all__ = ["CredentialCache", "get_credential_cache"]
+
+_Key = Tuple[str, str]  # (user_id, credential_id)
+
+
+@dataclass
+class _Entry:
+    meta: Dict[str, Any]
+    secret: bytearray
+    version: Optional[str]
+    expires_at: float
+    name: str = field(default="")
+
+    def wipe(self) -> None:
+        self.secret[:] = bytes(len(self.secret))
+
+
+def _version(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class CredentialCache:
+    """Thread-safe LRU + TTL cache keyed by ``(user_id, credential_id)``."""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300.0, negative_ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._names: Dict[Tuple[str, str], str] = {}  # (user_id, name) -> credential_id
+        self._missing: "OrderedDict[Tuple[str, str], float]" = OrderedDict()  # (user_id, ref) -> expiry
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, user_id: Any, credential_id: Any, version: Any = None) -> Optional[Dict[str, Any]]:
+        """Return ``{**metadata, "secret": {...}}`` or ``None`` on a miss.
+
+        ``version`` is the row's ``updated_at``; an entry cached for a
+        different version is dropped.
+        """
+        key = (str(user_id), str(credential_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic() or (
+                version is not None and entry.version != _version(version)
+            ):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {**entry.meta, "secret": json.loads(entry.secret.decode("utf-8"))}
+
+    def get_by_name(self, user_id: Any, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            credential_id = self._names.get((str(user_id), name))
+        if credential_id is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return self.get(user_id, credential_id)
+
+    def is_missing(self, user_id: Any, ref: str) -> bool:
+        """Whether ``ref`` (an id or name) recently failed to resolve for ``user_id``."""
+        key = (str(user_id), ref)
+        with self._lock:
+            expires_at = self._missing.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._missing[key]
+                return False
+            return True
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def put(self, user_id: Any, credential: Dict[str, Any]) -> None:
+        """Cache a decrypted credential dict (``id``, ``name``, ``updated_at``, ``secret`` …)."""
+        if self.max_size <= 0:
+            return
+        meta = {k: v for k, v in credential.items() if k != "secret"}
+        key = (str(user_id), str(credential["id"]))
+        entry = _Entry(
+            meta=meta,
+            secret=bytearray(json.dumps(credential.get("secret", {})).encode("utf-8")),
+            version=_version(credential.get("updated_at")),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            name=credential.get("name") or "",
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._by_user.setdefault(key[0], set()).add(key[1])
+            if entry.name:
+                self._names[(key[0], entry.name)] = key[1]
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def put_missing(self, user_id: Any, refs: Iterable[str]) -> None:
+        """Remember that ``refs`` did not resolve to a usable credential of ``user_id``."""
+        if self.max_size <= 0 or self.negative_ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.negative_ttl_seconds
+        with self._lock:
+            for ref in refs:
+                key = (str(user_id), ref)
+                self._missing.pop(key, None)
+                self._missing[key] = expires_at
+            while len(self._missing) > self.max_size:
+                self._missing.popitem(last=False)
+
+    def invalidate(self, user_id: Any, credential_id: Any = None) -> None:
+        """Drop one credential, or every credential of ``user_id`` if no id is given.
+
+        Either way the user's remembered misses are forgotten, since a created
+        or renamed credential may now satisfy them.
+        """
+        user_key = str(user_id)
+        with self._lock:
+            ids = [str(credential_id)] if credential_id is not None else list(self._by_user.get(user_key, ()))
+            for cid in ids:
+                if (user_key, cid) in self._entries:
+                    self._remove((user_key, cid))
+            for key in [key for key in self._missing if key[0] == user_key]:
+                del self._missing[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._missing.clear()
+
+    def _remove(self, key: _Key) -> None:
+        # Caller holds the lock.
+        entry = self._entries.pop(key)
+        entry.wipe()
+        user_ids = self._by_user.get(key[0])
+        if user_ids is not None:
+            user_ids.discard(key[1])
+            if not user_ids:
+                del self._by_user[key[0]]
+        if entry.name and self._names.get((key[0], entry.name)) == key[1]:
+            del self._names[(key[0], entry.name)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "missing": len(self._missing),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[CredentialCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_credential_cache() -> CredentialCache:
+    """Get the process-wide credential cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = CredentialCache(
+                max_size=settings.CREDENTIAL_CACHE_MAX_SIZE,
+                ttl_seconds=settings.CREDENTIAL_CACHE_TTL_SECONDS,
+                negative_ttl_seconds=settings.CREDENTIAL_NEGATIVE_CACHE_TTL_SECONDS,
+            )
+    return _cache
@@ -1,8 +1,9 @@
 from typing import Dict, Any, Optional, Set
 import asyncio
-from datetime import datetime, timedelta
 import threading
+import uuid
 
+from app.core.credential_cache import get_credential_cache
 from app.core.encryption import decrypt_data
 
 # ------------------------------------------------------------------
@@ -30,7 +31,7 @@ except ImportError:  # pragma: no cover – executes once after removal
 class CredentialProvider:
     """
     Singleton credential provider for secure access to encrypted credentials
-    Implements caching and lazy loading for performance
+    Decrypted credentials are served from the shared, bounded credential cache
     """
     
     _instance = None
@@ -46,9 +47,7 @@ class CredentialProvider:
     
     def __init__(self):
         if not hasattr(self, '_initialized') or not self._initialized:
-            self.cache: Dict[str, Dict[str, Any]] = {}
-            self.cache_timestamps: Dict[str, datetime] = {}
-            self.cache_ttl = timedelta(minutes=5)  # Cache for 5 minutes
+            self.cache = get_credential_cache()
             self.user_contexts: Dict[str, str] = {}  # Maps context_id to user_id
             self._initialized = True
     
@@ -61,14 +60,9 @@ class CredentialProvider:
     
     def clear_user_context(self, context_id: str):
         """Clear user context when workflow execution ends"""
-        if context_id in self.user_contexts:
-            del self.user_contexts[context_id]
-            
-        # Also clear related cache entries
-        to_remove = [key for key in self.cache.keys() if key.startswith(f"{context_id}:")]
-        for key in to_remove:
-            del self.cache[key]
-            del self.cache_timestamps[key]
+        # Cached credentials are keyed by user and outlive the context; they
+        # expire by TTL and are invalidated when the credential changes.
+        self.user_contexts.pop(context_id, None)
     
     async def get_credential(
         self, 
@@ -91,16 +85,10 @@ class CredentialProvider:
         if not user_id:
             raise ValueError(f"No user context found for context_id: {context_id}")
         
-        cache_key = f"{context_id}:{credential_name_or_id}"
-        
         # Check cache first
-        if cache_key in self.cache:
-            if self._is_cache_valid(cache_key):
-                return self.cache[cache_key]
-            else:
-                # Remove expired cache entry
-                del self.cache[cache_key]
-                del self.cache_timestamps[cache_key]
+        cached = self._cached(user_id, str(credential_name_or_id))
+        if cached and (not service_type or cached["service_type"] == service_type):
+            return cached
         
         # Fetch from database
         try:
@@ -113,20 +101,21 @@ class CredentialProvider:
             if credential:
                 # Decrypt and cache
                 decrypted_data = decrypt_data(credential["encrypted_data"])
+                self.cache.put(user_id, {
+                    "id": credential["id"],
+                    "name": credential["name"],
+                    "service_type": credential["service_type"],
+                    "updated_at": credential.get("updated_at"),
+                    "secret": decrypted_data,
+                })
                 
                 # Add metadata for easier access
-                result = {
+                return {
                     "id": credential["id"],
                     "name": credential["name"],
                     "service_type": credential["service_type"],
                     **decrypted_data
                 }
-                
-                # Cache the result
-                self.cache[cache_key] = result
-                self.cache_timestamps[cache_key] = datetime.now()
-                
-                return result
             
             return None
             
@@ -211,29 +200,29 @@ class CredentialProvider:
         
         return None
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cache entry is still valid"""
-        if cache_key not in self.cache_timestamps:
-            return False
-        
-        return datetime.now() - self.cache_timestamps[cache_key] < self.cache_ttl
+    def _cached(self, user_id: str, credential_name_or_id: str) -> Optional[Dict[str, Any]]:
+        """Look a credential up in the shared cache by ID or name"""
+        try:
+            uuid.UUID(credential_name_or_id)
+            entry = self.cache.get(user_id, credential_name_or_id)
+        except ValueError:
+            entry = self.cache.get_by_name(user_id, credential_name_or_id)
+        if entry is None:
+            return None
+        return {
+            "id": entry["id"],
+            "name": entry["name"],
+            "service_type": entry["service_type"],
+            **entry["secret"]
+        }
     
     def clear_cache(self):
         """Clear all cached credentials"""
         self.cache.clear()
-        self.cache_timestamps.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics for monitoring"""
-        total_entries = len(self.cache)
-        valid_entries = sum(1 for key in self.cache.keys() if self._is_cache_valid(key))
-        
-        return {
-            "total_entries": total_entries,
-            "valid_entries": valid_entries,
-            "expired_entries": total_entries - valid_entries,
-            "cache_ttl_minutes": self.cache_ttl.total_seconds() / 60
-        }
+        return self.cache.stats()
 
 
 # Global singleton instance
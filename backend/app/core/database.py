@@ -1,11 +1,17 @@
+import logging
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, NullPool
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+POOL_MODES = ("null", "queue")
+
 # Connection pooling configuration optimized for Supabase + Vercel
 sync_connection_args = {
     "pool_size": settings.DB_POOL_SIZE,
@@ -18,26 +24,57 @@ sync_connection_args = {
     "connect_args": {"application_name": "kai-fusion"},
 }
 
-async_connection_args = {
-    "poolclass": NullPool,  # Use NullPool for async connections
-    "echo": False,  # Disable in production for performance
-    "connect_args": {
-        "server_settings": {"application_name": "kai-fusion"},
-        "statement_cache_size": 0,  # Disable prepared statements for pgbouncer
-    },
-}
+
+def async_connection_args(mode: Optional[str] = None) -> Dict[str, Any]:
+    """Engine arguments for the async engine in the given pool mode.
+
+    ``null``  – no pooling and no prepared statements; every session opens its own
+                connection (pgbouncer transaction mode, serverless).
+    ``queue`` – a per-process ``AsyncAdaptedQueuePool`` with asyncpg's statement
+                cache enabled, for long-running pods talking to Postgres directly.
+    """
+    mode = (mode or settings.DB_POOL_MODE).lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"Invalid DB_POOL_MODE '{mode}', expected one of {POOL_MODES}")
+
+    if mode == "null":
+        return {
+            "poolclass": NullPool,
+            "echo": False,  # Disable in production for performance
+            "connect_args": {
+                "server_settings": {"application_name": "kai-fusion"},
+                "statement_cache_size": 0,  # Disable prepared statements for pgbouncer
+            },
+        }
+
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "echo": False,
+        "connect_args": {
+            "server_settings": {"application_name": "kai-fusion"},
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+def create_async_db_engine(url: Optional[str] = None, mode: Optional[str] = None) -> AsyncEngine:
+    """Create an async engine for ``url`` (default: ASYNC_DATABASE_URL) in the given pool mode."""
+    return create_async_engine(url or settings.ASYNC_DATABASE_URL, **async_connection_args(mode))
+
 
 # Create a synchronous engine for tasks that require it (e.g., migrations)
 sync_engine = create_engine(
-    settings.DATABASE_URL, 
+    settings.DATABASE_URL,
     **sync_connection_args
 )
 
 # Create an asynchronous engine for the main application
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL, 
-    **async_connection_args
-)
+async_engine = create_async_db_engine()
 
 # Create a sessionmaker for asynchronous sessions
 AsyncSessionLocal = sessionmaker(
@@ -53,8 +90,29 @@ async def get_db_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
+# Extensions the ORM schema depends on (trigram indexes for workflow search).
+REQUIRED_EXTENSIONS = ("pg_trgm",)
+
+async def create_extensions(conn) -> None:
+    """Create required Postgres extensions on an open async connection."""
+    for extension in REQUIRED_EXTENSIONS:
+        await conn.exec_driver_sql(f'CREATE EXTENSION IF NOT EXISTS "{extension}"')
+
 async def create_tables():
     """Create all tables in the database."""
     from app.models.base import Base
+    from app.core.partitioning import maintain_partitions
     async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all) 
\ No newline at end of file
+        await create_extensions(conn)
+        await conn.run_sync(Base.metadata.create_all)
+    # Own transaction: a maintenance failure must not undo the schema, and the beat task retries it
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(maintain_partitions)
+    except Exception as e:
+        logger.error(f"Partition maintenance on startup failed: {e}")
+
+async def dispose_engines():
+    """Close pooled connections on shutdown (no-op for NullPool)."""
+    await async_engine.dispose()
+    sync_engine.dispose()
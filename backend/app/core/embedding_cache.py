@@ -0,0 +1,257 @@
+"""Content-addressed cache for embedding vectors.
+
+Embedding nodes wrap their model in :class:`CachedEmbeddings`, so identical
+text is embedded once per model – re-ingesting unchanged documents or
+re-asking a question costs a cache lookup instead of an API call or a
+forward pass.
+
+* Keys are ``sha256(model id, kind, text)``.  ``kind`` separates document
+  and query embeddings (some models embed them differently); the text is
+  Unicode-normalized (NFC) and stripped first.
+* Vectors live in a local SQLite file (``EMBEDDING_CACHE_PATH``, WAL mode),
+  packed as float16 by default (``EMBEDDING_CACHE_FLOAT16``) – half the space
+  of float32 at a precision loss far below what similarity search notices.
+* With ``EMBEDDING_CACHE_REDIS`` a Redis tier is consulted after SQLite and
+  filled on writes, so workers share vectors.  Redis errors are logged and
+  the tier is skipped.
+* A batch is deduplicated before the model sees it; only distinct misses are
+  embedded.
+
+Hit/miss counters are in :meth:`EmbeddingCacheStore.stats`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CachedEmbeddings", "EmbeddingCacheStore", "cached_embeddings", "embedding_model_id", "get_embedding_cache"]
+
+_REDIS_PREFIX = "kai:emb:"
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 500
+
+
+def embedding_model_id(embeddings: Any) -> str:
+    """Stable id of an embedding model: class plus model name, dimensions and encode options where known."""
+    parts = [type(embeddings).__name__]
+    for attr in ("model", "model_name", "dimensions"):
+        value = getattr(embeddings, attr, None)
+        if value:
+            parts.append(f"{attr}={value}")
+    encode_kwargs = getattr(embeddings, "encode_kwargs", None)
+    if encode_kwargs:
+        # e.g. normalized and raw vectors of the same model must not share entries
+        parts.append("encode=" + ",".join(f"{k}={v}" for k, v in sorted(encode_kwargs.items())))
+    return "|".join(parts)
+
+
+def _cache_key(model_id: str, kind: str, text: str) -> bytes:
+    normalized = unicodedata.normalize("NFC", text).strip()
+    return hashlib.sha256(f"{model_id}\0{kind}\0{normalized}".encode("utf-8")).digest()
+
+
+def _pack(vector: Sequence[float], float16: bool) -> bytes:
+    code = "e" if float16 else "f"
+    return code.encode("ascii") + struct.pack(f"<{len(vector)}{code}", *vector)
+
+
+def _unpack(blob: bytes) -> List[float]:
+    code = chr(blob[0])
+    count = (len(blob) - 1) // struct.calcsize(code)
+    return list(struct.unpack(f"<{count}{code}", blob[1:]))
+
+
+# ----------------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------------
+
+class EmbeddingCacheStore:
+    """SQLite (plus optional Redis) mapping of cache key -> packed vector."""
+
+    def __init__(self, path: str, *, float16: bool = True, redis_url: Optional[str] = None, redis_ttl: int = 0):
+        self.path = path
+        self.float16 = float16
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._redis = None
+        self._redis_ttl = redis_ttl
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(redis_url)
+            except ImportError as e:
+                logger.warning("Embedding cache Redis tier unavailable (%s); using SQLite only", e)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, List[float]]:
+        found: Dict[bytes, List[float]] = {}
+        conn = self._connection()
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk):
+                found[bytes(key)] = _unpack(blob)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self._redis is not None:
+            try:
+                blobs = self._redis.mget([_REDIS_PREFIX + key.hex() for key in missing])
+                promoted = {key: blob for key, blob in zip(missing, blobs) if blob}
+                for key, blob in promoted.items():
+                    found[key] = _unpack(blob)
+                if promoted:
+                    self._write_local(promoted)
+                    with self._stats_lock:
+                        self.redis_hits += len(promoted)
+            except Exception as e:
+                logger.warning("Embedding cache Redis read failed: %s", e)
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, vectors: Dict[bytes, Sequence[float]]) -> None:
+        if not vectors:
+            return
+        packed = {key: _pack(vector, self.float16) for key, vector in vectors.items()}
+        self._write_local(packed)
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                for key, blob in packed.items():
+                    pipe.set(_REDIS_PREFIX + key.hex(), blob, ex=self._redis_ttl or None)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Embedding cache Redis write failed: %s", e)
+
+    def _write_local(self, packed: Dict[bytes, bytes]) -> None:
+        conn = self._connection()
+        with self._write_lock:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", packed.items())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "float16": self.float16,
+                "redis": self._redis is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "redis_hits": self.redis_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache: Optional[EmbeddingCacheStore] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCacheStore:
+    """Get the process-wide embedding cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = EmbeddingCacheStore(
+                settings.EMBEDDING_CACHE_PATH,
+                float16=settings.EMBEDDING_CACHE_FLOAT16,
+                redis_url=settings.REDIS_URL if settings.EMBEDDING_CACHE_REDIS else None,
+                redis_ttl=settings.EMBEDDING_CACHE_REDIS_TTL_SECONDS,
+            )
+    return _cache
+
+
+# ----------------------------------------------------------------------------
+# Embeddings wrapper
+# ----------------------------------------------------------------------------
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that read through :class:`EmbeddingCacheStore` before calling ``underlying``."""
+
+    def __init__(self, underlying: Embeddings, model_id: Optional[str] = None, store: Optional[EmbeddingCacheStore] = None):
+        self.underlying = underlying
+        self.model_id = model_id or embedding_model_id(underlying)
+        self.store = store or get_embedding_cache()
+
+    def __getattr__(self, name: str) -> Any:
+        # Model attributes (model, dimensions, ...) read through to the wrapped model
+        if name == "underlying":
+            raise AttributeError(name)
+        return getattr(self.underlying, name)
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [_cache_key(self.model_id, kind, text) for text in texts]
+        try:
+            cached = self.store.get_many(list(dict.fromkeys(keys)))
+        except Exception as e:
+            logger.warning("Embedding cache read failed: %s", e)
+            cached = {}
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            if kind == "query":
+                computed = [self.underlying.embed_query(text) for text in missing.values()]
+            else:
+                computed = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing, computed))
+            try:
+                self.store.put_many(fresh)
+            except Exception as e:
+                logger.warning("Embedding cache write failed: %s", e)
+            cached.update(fresh)
+        return [list(cached[key]) for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(list(texts), "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+
+def cached_embeddings(embeddings: Embeddings, enabled: bool = True) -> Embeddings:
+    """Wrap ``embeddings`` in the shared cache unless disabled here or by ``EMBEDDING_CACHE_ENABLED``."""
+    if not enabled or not get_settings().EMBEDDING_CACHE_ENABLED or isinstance(embeddings, CachedEmbeddings):
+        return embeddings
+    try:
+        return CachedEmbeddings(embeddings)
+    except Exception as e:
+        logger.warning("Embedding cache unavailable (%s); embedding without cache", e)
+        return embeddings
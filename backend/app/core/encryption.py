@@ -1,60 +1,99 @@
 import os
 import json
 import base64
-from typing import Dict, Any, Union, Optional
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Dict, Any, List, Sequence, Union, Optional
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-class CredentialEncryption:
+from app.core.config import get_settings
+
+
+@lru_cache(maxsize=16)
+def derive_fernet_key(master_key: str) -> bytes:
     """
-    Handles encryption and decryption of sensitive credential data using Fernet
+    Fernet key for a master key. PBKDF2 runs once per distinct master key per
+    process; the result is cached.
     """
-    
-    def __init__(self, master_key: Optional[str] = None):
+    if not master_key:
+        raise ValueError("Master key is required")
+    # If master key is already a valid Fernet key
+    if len(master_key) == 44 and master_key.endswith('='):
+        return master_key.encode()
+    # Derive key from master key using PBKDF2
+    salt = b'salt_'  # In production, use a random salt stored separately
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(master_key.encode()))
+
+
+class KeyRing:
+    """
+    Ordered set of master key versions. The first (primary) key encrypts;
+    every key is tried on decrypt, so data written under a previous key stays
+    readable until it has been re-encrypted.
+    """
+
+    def __init__(self, master_keys: Sequence[str]):
+        keys = [key for key in master_keys if key]
+        if not keys:
+            raise ValueError("At least one master key is required")
+        try:
+            self.fernets: List[Fernet] = [Fernet(derive_fernet_key(key)) for key in keys]
+        except Exception as e:
+            raise ValueError(f"Invalid encryption key: {e}")
+        self.master_keys = keys
+        self.primary = self.fernets[0]
+        self.multi = MultiFernet(self.fernets)
+
+    @classmethod
+    def from_env(cls, master_key: Optional[str] = None) -> "KeyRing":
         """
-        Initialize encryption with a master key
-        If no key provided, uses environment variable or generates one
+        Primary key from ``master_key`` or CREDENTIAL_MASTER_KEY, older keys
+        from the comma-separated CREDENTIAL_PREVIOUS_KEYS.
         """
-        if master_key:
-            self.master_key = master_key
-        else:
-            self.master_key = os.getenv("CREDENTIAL_MASTER_KEY")
-            
-        if not self.master_key:
+        settings = get_settings()
+        primary = master_key or settings.CREDENTIAL_MASTER_KEY
+        if not primary:
             # Generate a new key if none exists (for development)
             # In production, this should be provided via environment
-            self.master_key = base64.urlsafe_b64encode(os.urandom(32)).decode()
+            primary = base64.urlsafe_b64encode(os.urandom(32)).decode()
             print("⚠️  Generated new encryption key. Set CREDENTIAL_MASTER_KEY environment variable!")
-        
-        # Create Fernet cipher
-        self.cipher = self._create_cipher()
-    
-    def _create_cipher(self) -> Fernet:
-        """Create Fernet cipher from master key"""
+        previous = [key.strip() for key in (settings.CREDENTIAL_PREVIOUS_KEYS or "").split(",") if key.strip()]
+        return cls([primary, *[key for key in previous if key != primary]])
+
+    def is_current(self, token: bytes) -> bool:
+        """True if ``token`` was encrypted with the primary key."""
         try:
-            # Ensure master_key is not None
-            if not self.master_key:
-                raise ValueError("Master key is required")
-                
-            # If master key is already a valid Fernet key
-            if len(self.master_key) == 44 and self.master_key.endswith('='):
-                key = self.master_key.encode()
-            else:
-                # Derive key from master key using PBKDF2
-                salt = b'salt_'  # In production, use a random salt stored separately
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=salt,
-                    iterations=100000,
-                )
-                key = base64.urlsafe_b64encode(kdf.derive(self.master_key.encode()))
-            
-            return Fernet(key)
-            
-        except Exception as e:
-            raise ValueError(f"Invalid encryption key: {e}")
+            self.primary.decrypt(token)
+            return True
+        except InvalidToken:
+            return False
+
+    def rotate(self, token: bytes) -> bytes:
+        """Re-encrypt ``token`` under the primary key without parsing the payload."""
+        return self.multi.rotate(token)
+
+
+class CredentialEncryption:
+    """
+    Handles encryption and decryption of sensitive credential data using Fernet
+    """
+    
+    def __init__(self, master_key: Optional[str] = None, key_ring: Optional[KeyRing] = None):
+        """
+        Initialize encryption with a master key or key ring
+        If neither is provided, uses environment variables or generates a key
+        """
+        self.key_ring = key_ring or KeyRing.from_env(master_key)
+        self.master_key = self.key_ring.master_keys[0]
+        # Encrypts with the primary key, decrypts with any key of the ring
+        self.cipher = self.key_ring.multi
     
     def encrypt(self, data: Union[Dict[str, Any], str]) -> bytes:
         """
@@ -109,29 +148,21 @@ class CredentialEncryption:
         """
         Re-encrypt data with a new master key
         
+        Does not change this instance; for bulk rotation put the new key first
+        in the key ring and run ``app.core.credential_rotation`` instead.
+        
         Args:
             new_master_key: New encryption key
-            old_encrypted_data: Data encrypted with old key
+            old_encrypted_data: Data encrypted with any key of this ring
             
         Returns:
             Data encrypted with new key
         """
-        # Decrypt with old key
-        decrypted_data = self.decrypt(old_encrypted_data)
-        
-        # Create new cipher with new key
-        old_master_key = self.master_key
-        self.master_key = new_master_key
-        self.cipher = self._create_cipher()
-        
+        ring = KeyRing([new_master_key, *self.key_ring.master_keys])
         try:
-            # Encrypt with new key
-            return self.encrypt(decrypted_data)
-        except Exception as e:
-            # Restore old key on failure
-            self.master_key = old_master_key
-            self.cipher = self._create_cipher()
-            raise e
+            return ring.rotate(old_encrypted_data)
+        except InvalidToken as e:
+            raise ValueError(f"Decryption failed: {e}")
 
 
 # Global encryption instance
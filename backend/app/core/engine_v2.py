@@ -13,8 +13,13 @@ cohesive API for building, validating and executing workflows.
 from __future__ import annotations
 
 import abc
+import logging
 from typing import Any, AsyncGenerator, Dict, Optional, Union
 
+from app.core.profiler import profile_span
+
+logger = logging.getLogger(__name__)
+
 
 JSONType = Dict[str, Any]
 StreamEvent = Dict[str, Any]
@@ -134,15 +139,15 @@ class LangGraphWorkflowEngine(BaseWorkflowEngine):
 
         # Single, standardized node discovery
         if not node_registry.nodes:
-            print("🔍 Discovering nodes...")
+            logger.info("Discovering nodes...")
             node_registry.discover_nodes()
 
         # Ensure we have nodes
         if not node_registry.nodes:
-            print("⚠️  No nodes discovered! Creating minimal fallback registry...")
+            logger.warning("No nodes discovered! Creating minimal fallback registry...")
             self._create_minimal_fallback_registry(node_registry)
 
-        print(f"✅ Engine initialized with {len(node_registry.nodes)} nodes")
+        logger.info("Engine initialized with %d nodes", len(node_registry.nodes))
         
         # Choose MemorySaver automatically (GraphBuilder handles this)
         self._builder = GraphBuilder(node_registry.nodes)
@@ -155,9 +160,9 @@ class LangGraphWorkflowEngine(BaseWorkflowEngine):
             from app.nodes.test_node import TestHelloNode, TestProcessorNode
             registry.register_node(TestHelloNode)
             registry.register_node(TestProcessorNode)
-            print("✅ Registered fallback nodes: TestHello, TestProcessor")
+            logger.info("Registered fallback nodes: TestHello, TestProcessor")
         except Exception as e:
-            print(f"⚠️  Could not register fallback nodes: {e}")
+            logger.warning("Could not register fallback nodes: %s", e)
 
     # ------------------------------------------------------------------
     # Validation
@@ -255,38 +260,37 @@ class LangGraphWorkflowEngine(BaseWorkflowEngine):
     # ------------------------------------------------------------------
     def build(self, flow_data: JSONType, *, user_context: Optional[JSONType] = None) -> None:  # noqa: D401
         """Enhanced build with better error handling and logging"""
-        print("🔨 Building workflow...")
-        
         # Enhanced validation before build
-        validation_result = self.validate(flow_data)
+        with profile_span("validate"):
+            validation_result = self.validate(flow_data)
         if not validation_result["valid"]:
             error_msg = f"Cannot build workflow: {'; '.join(validation_result['errors'])}"
-            print(f"❌ Build validation failed: {error_msg}")
+            logger.warning("Build validation failed: %s", error_msg)
             raise ValueError(error_msg)
         
         # Log warnings if any
         if validation_result["warnings"]:
             for warning in validation_result["warnings"]:
-                print(f"⚠️  {warning}")
+                logger.debug("Build warning: %s", warning)
 
         try:
             # Log build details
             nodes = flow_data.get("nodes", [])
             edges = flow_data.get("edges", [])
-            print(f"📊 Building workflow with {len(nodes)} nodes and {len(edges)} edges")
+            logger.debug("Building workflow with %d nodes and %d edges", len(nodes), len(edges))
             
-            # For now we only pass user_id if available
+            # user_id, plus the flow's credentials when the caller prefetched them
             user_id = user_context.get("user_id") if user_context else None  # type: ignore[attr-defined]
-            if user_id:
-                print(f"👤 Building for user: {user_id}")
+            credentials = user_context.get("credentials") if user_context else None  # type: ignore[attr-defined]
             
-            self._builder.build_from_flow(flow_data, user_id=user_id)
+            with profile_span("build_from_flow"):
+                self._builder.build_from_flow(flow_data, user_id=user_id, credentials=credentials)
             self._built = True
-            print("✅ Workflow build completed successfully")
+            logger.debug("Workflow build completed for user %s", user_id)
             
         except Exception as e:
             error_msg = f"Workflow build failed: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error(error_msg)
             raise ValueError(error_msg) from e
 
     # ------------------------------------------------------------------
@@ -306,29 +310,29 @@ class LangGraphWorkflowEngine(BaseWorkflowEngine):
         inputs = inputs or {}
         user_id = user_context.get("user_id") if user_context else None  # type: ignore[attr-defined]
         workflow_id = user_context.get("workflow_id") if user_context else None  # type: ignore[attr-defined]
+        session_id = user_context.get("session_id") if user_context else None  # type: ignore[attr-defined]
 
-        print(f"🚀 Starting workflow execution (stream={stream})")
-        if user_id:
-            print(f"👤 Executing for user: {user_id}")
-        if workflow_id:
-            print(f"🔗 Workflow ID: {workflow_id}")
-        print(f"📥 Inputs: {list(inputs.keys()) if isinstance(inputs, dict) else type(inputs)}")
+        logger.debug(
+            "Starting workflow execution (stream=%s, user=%s, workflow=%s, inputs=%s)",
+            stream, user_id, workflow_id, list(inputs) if isinstance(inputs, dict) else type(inputs),
+        )
 
         try:
             # GraphBuilder.execute manages streaming vs sync
             result = await self._builder.execute(
                 inputs,
+                session_id=session_id,
                 user_id=user_id,
                 workflow_id=workflow_id,
                 stream=stream,
             )
             
-            print("✅ Workflow execution completed successfully")
+            logger.debug("Workflow execution %s", "stream started" if stream else "completed")
             return result
             
         except Exception as e:
             error_msg = f"Workflow execution failed: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error(error_msg, exc_info=True)
             
             # Return structured error result
             if stream:
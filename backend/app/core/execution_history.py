@@ -0,0 +1,133 @@
+"""Batched, off-hot-path writer for execution history records.
+
+Executions call :func:`record_execution` once they finish: the streaming
+``/workflows/execute`` endpoint with ``source="api"`` and the Celery workflow
+tasks with ``source="celery"``.  The call only builds a compact row
+and hands it to a :class:`~app.core.batch_writer.BatchInsertWriter`, which
+inserts rows into ``workflow_executions`` in batches off the request path.
+
+If the queue is full (database down or far behind) records are dropped and
+counted rather than blocking executions.  Pending rows are flushed at
+interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Union
+
+from app.core.batch_writer import BatchInsertWriter
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ExecutionHistoryWriter", "get_history_writer", "record_execution"]
+
+
+def _to_uuid(value: Union[str, uuid.UUID, None]) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _truncate(value: Any, limit: int) -> Any:
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + "…"
+    return value
+
+
+def _execution_table():
+    from app.models.execution import WorkflowExecution
+
+    return WorkflowExecution.__table__
+
+
+class ExecutionHistoryWriter(BatchInsertWriter):
+    """Batch writer for ``workflow_executions`` rows."""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0, max_queue: int = 10000):
+        super().__init__(
+            _execution_table,
+            name="execution-history-writer",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+        )
+
+
+_writer: Optional[ExecutionHistoryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _shutdown_writer() -> None:
+    if _writer is not None:
+        _writer.stop()
+
+
+def get_history_writer() -> ExecutionHistoryWriter:
+    """Get the process-wide writer (started lazily on first record)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            settings = get_settings()
+            _writer = ExecutionHistoryWriter(
+                batch_size=settings.EXECUTION_HISTORY_BATCH_SIZE,
+                flush_interval=settings.EXECUTION_HISTORY_FLUSH_INTERVAL,
+                max_queue=settings.EXECUTION_HISTORY_QUEUE_SIZE,
+            )
+            atexit.register(_shutdown_writer)
+    return _writer
+
+
+def record_execution(
+    *,
+    execution_id: Union[str, uuid.UUID],
+    user_id: Union[str, uuid.UUID],
+    status: str,
+    started_at: datetime,
+    completed_at: Optional[datetime] = None,
+    workflow_id: Union[str, uuid.UUID, None] = None,
+    inputs: Optional[Dict[str, Any]] = None,
+    output: Any = None,
+    error: Optional[str] = None,
+    node_count: Optional[int] = None,
+    source: str = "api",
+) -> bool:
+    """Queue a compact history record for a finished execution.
+
+    ``output`` is truncated to ``EXECUTION_HISTORY_MAX_OUTPUT_CHARS``; node
+    outputs and intermediate state are deliberately not stored.
+    """
+    settings = get_settings()
+    if not settings.EXECUTION_HISTORY_ENABLED:
+        return False
+    user_uuid = _to_uuid(user_id)
+    if user_uuid is None:
+        return False
+
+    completed_at = completed_at or datetime.now(timezone.utc)
+    limit = settings.EXECUTION_HISTORY_MAX_OUTPUT_CHARS
+    row = {
+        "id": _to_uuid(execution_id) or uuid.uuid4(),
+        "workflow_id": _to_uuid(workflow_id),
+        "user_id": user_uuid,
+        "status": status,
+        "source": source,
+        "inputs": {key: _truncate(value, limit) for key, value in (inputs or {}).items()},
+        "outputs": {"output": _truncate(output if isinstance(output, str) else str(output), limit)}
+        if output is not None else None,
+        "error_message": _truncate(error, limit),
+        "node_count": node_count,
+        "duration_ms": int((completed_at - started_at).total_seconds() * 1000),
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "created_at": started_at,
+    }
+    return get_history_writer().submit(row)
@@ -0,0 +1,486 @@
+"""Process-wide store of managed local FAISS indexes.
+
+``FaissVectorStoreNode`` used to reload its index from disk on every
+execution and never saved it.  Indexes now live in a :class:`FaissIndexStore`
+keyed by their resolved location: loaded once per process and shared by the
+executions of one user that name them.
+
+* **Locations** – ``folder_path`` and ``index_name`` come from flow data, so
+  they are resolved under ``FAISS_ROOT_DIR/<user id>/`` (see
+  :mod:`app.core.storage_paths`).  Absolute paths, ``..`` and path separators
+  in index names are rejected, so nothing outside a user's own directory is
+  ever read, unpickled or written.
+
+* **Index types** – ``flat`` (exact), ``ivf`` (inverted lists, searches
+  ``FAISS_IVF_NPROBE`` of them) and ``hnsw`` (graph, ``FAISS_HNSW_M`` links,
+  ``FAISS_HNSW_EF_SEARCH``).  An IVF index searches exactly (flat) until it
+  holds 39 vectors per list of ``FAISS_IVF_NLIST``, then trains on all of
+  them and switches to IVF.
+* **Memory mapping** – index files of ``FAISS_MMAP_THRESHOLD_MB`` or more are
+  opened with ``IO_FLAG_MMAP`` (read-only), so a large index is paged in on
+  demand instead of read up front.  The first write copies it into memory.
+* **Incremental writes** – ``add_texts`` embeds and adds in batches of
+  ``FAISS_ADD_BATCH_SIZE``; ``delete`` removes vectors in place from flat
+  indexes.  HNSW cannot remove and IVF would leave gaps in its labels, so
+  those are rebuilt from the stored vectors (IVF keeps its training).  Writers hold a
+  write lock per index, searches a read lock, so searches run concurrently
+  and never see a half-applied batch.
+* **Snapshots** – indexes with ``persist=True`` that changed are saved every
+  ``FAISS_SNAPSHOT_INTERVAL_SECONDS`` and at exit, in the ``load_local``
+  layout (``<name>.faiss`` + ``<name>.pkl``).  Files are written to temporary
+  names and renamed into place; the loader refuses a pair whose vector and
+  document counts disagree.
+* **Cached searches** – ``similarity_search`` goes through
+  :mod:`app.core.retrieval_cache`; every add and delete invalidates the
+  index's cached results.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import pickle
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.faiss import dependable_faiss_import
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.retrieval_cache import CachedRetrieval, invalidate_collection
+from app.core.storage_paths import safe_name, user_storage_path
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["INDEX_TYPES", "FaissIndexStore", "ManagedFAISS", "get_faiss_store"]
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# Minimum training vectors per IVF list (below this faiss warns about poor centroids)
+_IVF_POINTS_PER_LIST = 39
+
+
+class _ReadWriteLock:
+    """Many readers or one writer; writers are not starved by a stream of readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+def _new_index(index_type: str, dimension: int) -> Any:
+    faiss = dependable_faiss_import()
+    settings = get_settings()
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, settings.FAISS_HNSW_M)
+        index.hnsw.efSearch = settings.FAISS_HNSW_EF_SEARCH
+        return index
+    # IVF starts flat and is replaced by a trained IVF index once enough vectors exist
+    return faiss.IndexFlatL2(dimension)
+
+
+def _tune(index: Any, index_type: str) -> None:
+    """Apply search-time parameters to a freshly created or loaded index."""
+    faiss = dependable_faiss_import()
+    settings = get_settings()
+    if index_type == "ivf":
+        try:
+            ivf = faiss.extract_index_ivf(index)
+        except RuntimeError:
+            return  # not (yet) an IVF index
+        ivf.nprobe = settings.FAISS_IVF_NPROBE
+        # MMR and deletes reconstruct vectors by label, which IVF only supports with a direct map
+        ivf.make_direct_map()
+    elif index_type == "hnsw" and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = settings.FAISS_HNSW_EF_SEARCH
+
+
+class ManagedFAISS(CachedRetrieval, FAISS):
+    """LangChain ``FAISS`` with locking, batched adds, change tracking for snapshots and cached searches."""
+
+    def __init__(self, *args: Any, index_type: str = "flat", mmapped: bool = False, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.index_type = index_type
+        self._mmapped = mmapped
+        self._rw = _ReadWriteLock()
+        self._version = 0
+        self._saved_version = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self._version != self._saved_version
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def similarity_search_with_score_by_vector(self, *args: Any, **kwargs: Any):
+        self._rw.acquire_read()
+        try:
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+        finally:
+            self._rw.release_read()
+
+    def max_marginal_relevance_search_with_score_by_vector(self, *args: Any, **kwargs: Any):
+        self._rw.acquire_read()
+        try:
+            return super().max_marginal_relevance_search_with_score_by_vector(*args, **kwargs)
+        finally:
+            self._rw.release_read()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _ensure_writable(self, vectors: Optional[List[List[float]]] = None) -> None:
+        # Caller holds the write lock.
+        faiss = dependable_faiss_import()
+        if self._mmapped:
+            self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+            self._mmapped = False
+            _tune(self.index, self.index_type)
+        if self.index_type == "ivf" and vectors and isinstance(self.index, faiss.IndexFlat):
+            self._train_ivf(vectors)
+
+    def _train_ivf(self, vectors: List[List[float]]) -> None:
+        """Switch a flat ``ivf`` index to IVF once it can train ``FAISS_IVF_NLIST`` lists.
+
+        Until the stored plus incoming vectors reach ``_IVF_POINTS_PER_LIST``
+        per list the index stays flat (exact search), so the list count never
+        gets fixed by a small first batch.  Training then uses every vector,
+        and the stored ones move over in order, keeping their labels.
+        """
+        # Caller holds the write lock.
+        import numpy as np
+
+        faiss = dependable_faiss_import()
+        nlist = max(1, get_settings().FAISS_IVF_NLIST)
+        if self.index.ntotal + len(vectors) < nlist * _IVF_POINTS_PER_LIST:
+            return
+        stored = self.index.reconstruct_n(0, self.index.ntotal) if self.index.ntotal else None
+        incoming = np.asarray(vectors, dtype=np.float32)
+        training = incoming if stored is None else np.vstack([stored, incoming])
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(self.index.d), self.index.d, nlist)
+        index.train(training)
+        if stored is not None:
+            index.add(stored)
+        _tune(index, "ivf")
+        self.index = index
+        logger.info("Trained IVF index with %d lists on %d vectors", nlist, len(training))
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[Iterable[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+        self._rw.acquire_write()
+        try:
+            self._ensure_writable([vector for _, vector in text_embeddings])
+            added = super().add_embeddings(text_embeddings, metadatas=metadatas, ids=ids, **kwargs)
+            self._version += 1
+            invalidate_collection(self.cache_namespace)
+            return added
+        finally:
+            self._rw.release_write()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[Iterable[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Embed and add in batches; searches can run between batches."""
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else None
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        batch_size = max(1, get_settings().FAISS_ADD_BATCH_SIZE)
+        added: List[str] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            vectors = self._embed_documents(batch)  # outside the lock
+            added.extend(self.add_embeddings(
+                zip(batch, vectors),
+                metadatas=metadatas[start:start + batch_size] if metadatas is not None else None,
+                ids=ids[start:start + batch_size],
+                **kwargs,
+            ))
+        return added
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+        self._rw.acquire_write()
+        try:
+            missing = set(ids).difference(self.index_to_docstore_id.values())
+            if missing:
+                raise ValueError(f"Some specified ids do not exist in the current store. Ids not found: {missing}")
+            self._ensure_writable()
+            doomed = set(ids)
+            positions = {i for i, doc_id in self.index_to_docstore_id.items() if doc_id in doomed}
+            self._remove_positions(positions)
+            self.docstore.delete(ids)
+            remaining = [doc_id for i, doc_id in sorted(self.index_to_docstore_id.items()) if i not in positions]
+            self.index_to_docstore_id = {i: doc_id for i, doc_id in enumerate(remaining)}
+            self._version += 1
+            invalidate_collection(self.cache_namespace)
+            return True
+        finally:
+            self._rw.release_write()
+
+    def _remove_positions(self, positions: set) -> None:
+        import numpy as np
+
+        faiss = dependable_faiss_import()
+        if isinstance(self.index, faiss.IndexFlat):
+            # Flat indexes renumber the remaining vectors, matching index_to_docstore_id
+            self.index.remove_ids(np.fromiter(positions, dtype=np.int64))
+            return
+        # HNSW graphs cannot drop nodes, and IVF lists keep the old labels of the
+        # survivors (leaving gaps): rebuild from the remaining vectors so labels
+        # stay the contiguous positions the docstore mapping assumes.
+        if self.index_type == "ivf":
+            faiss.extract_index_ivf(self.index).make_direct_map()
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        keep = np.array([i not in positions for i in range(self.index.ntotal)], dtype=bool)
+        if self.index_type == "ivf":
+            index = faiss.clone_index(self.index)  # keeps the trained centroids
+            index.reset()
+        else:
+            index = _new_index(self.index_type, self.index.d)
+        if keep.any():
+            index.add(vectors[keep])
+        _tune(index, self.index_type)
+        self.index = index
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self, folder_path: str, index_name: str) -> None:
+        """Write the index atomically in the ``load_local`` layout."""
+        faiss = dependable_faiss_import()
+        self._rw.acquire_read()
+        try:
+            version = self._version
+            index_bytes = faiss.serialize_index(self.index).tobytes()
+            payload = pickle.dumps((self.docstore, self.index_to_docstore_id))
+        finally:
+            self._rw.release_read()
+
+        os.makedirs(folder_path, exist_ok=True)
+        targets = [
+            (os.path.join(folder_path, f"{index_name}.faiss"), index_bytes),
+            (os.path.join(folder_path, f"{index_name}.pkl"), payload),
+        ]
+        for path, data in targets:
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        for path, _ in targets:
+            os.replace(path + ".tmp", path)
+        self._saved_version = version
+
+
+def _load(folder_path: str, index_name: str, embeddings: Embeddings, index_type: str) -> ManagedFAISS:
+    faiss = dependable_faiss_import()
+    index_path = os.path.join(folder_path, f"{index_name}.faiss")
+    with open(os.path.join(folder_path, f"{index_name}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    threshold = get_settings().FAISS_MMAP_THRESHOLD_MB * 1024 * 1024
+    mmapped = threshold > 0 and os.path.getsize(index_path) >= threshold
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmapped else 0
+    index = faiss.read_index(index_path, flags)
+    if index.ntotal != len(index_to_docstore_id):
+        raise ValueError(
+            f"FAISS index '{index_name}' in {folder_path} is inconsistent: "
+            f"{index.ntotal} vectors but {len(index_to_docstore_id)} documents"
+        )
+    _tune(index, index_type)
+    return ManagedFAISS(
+        embeddings, index, docstore, index_to_docstore_id, index_type=index_type, mmapped=mmapped
+    )
+
+
+# ----------------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------------
+
+_Key = Tuple[str, str]  # (resolved folder path under FAISS_ROOT_DIR, index name)
+
+
+class FaissIndexStore:
+    """Shared ``ManagedFAISS`` indexes plus the background snapshot thread."""
+
+    def __init__(self, snapshot_interval: float = 60.0):
+        self.snapshot_interval = snapshot_interval
+        self._indexes: Dict[_Key, ManagedFAISS] = {}
+        self._persistent: Dict[_Key, bool] = {}
+        self._loading: Dict[_Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(
+        self,
+        embeddings: Embeddings,
+        folder_path: str,
+        index_name: str = "faiss_index",
+        *,
+        user_id: Optional[str] = None,
+        index_type: str = "flat",
+        persist: bool = False,
+    ) -> ManagedFAISS:
+        """Shared index ``index_name`` in ``user_id``'s ``folder_path``, loaded or created on first use.
+
+        ``folder_path`` is relative to the user's directory under
+        ``FAISS_ROOT_DIR``.  ``index_type`` only applies when the index is
+        created.  ``persist`` turns on periodic snapshots for the index (it
+        stays on once set).
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type '{index_type}'; expected one of {', '.join(INDEX_TYPES)}")
+        folder = user_storage_path(get_settings().FAISS_ROOT_DIR, user_id, folder_path)
+        key = (folder, safe_name(index_name, "FAISS index name"))
+        with self._lock:
+            store = self._indexes.get(key)
+            if store is None:
+                load_lock = self._loading.setdefault(key, threading.Lock())
+        if store is None:
+            # Load or probe outside the store lock so other indexes stay available meanwhile
+            with load_lock:
+                with self._lock:
+                    store = self._indexes.get(key)
+                if store is None:
+                    store = self._open(key, embeddings, index_type)
+                    with self._lock:
+                        self._indexes[key] = store
+                        self._loading.pop(key, None)
+        with self._lock:
+            # Executions build fresh embedding objects; searches use the latest one
+            store.embedding_function = embeddings
+            if persist and not self._persistent.get(key):
+                self._persistent[key] = True
+                self._start()
+        return store
+
+    @staticmethod
+    def _open(key: _Key, embeddings: Embeddings, index_type: str) -> ManagedFAISS:
+        folder_path, index_name = key
+        if os.path.exists(os.path.join(folder_path, f"{index_name}.faiss")):
+            # A broken index must fail loudly: replacing it with an empty one
+            # would overwrite the real files at the next snapshot.
+            store = _load(folder_path, index_name, embeddings, index_type)
+            logger.info("Loaded FAISS index %s/%s (%d vectors)", folder_path, index_name, store.index.ntotal)
+        else:
+            dimension = len(embeddings.embed_query("dimension probe"))
+            store = ManagedFAISS(
+                embeddings, _new_index(index_type, dimension), InMemoryDocstore(), {}, index_type=index_type
+            )
+        store.cache_namespace = f"faiss:{folder_path}/{index_name}"
+        return store
+
+    def snapshot(self) -> List[str]:
+        """Save every changed persistent index; return the saved index names."""
+        with self._lock:
+            targets = [(key, self._indexes[key]) for key in self._persistent if key in self._indexes]
+        saved = []
+        for (folder_path, index_name), store in targets:
+            if not store.dirty:
+                continue
+            try:
+                store.snapshot(folder_path, index_name)
+                saved.append(index_name)
+            except Exception as e:
+                logger.error("Snapshot of FAISS index %s/%s failed: %s", folder_path, index_name, e)
+        return saved
+
+    def _start(self) -> None:
+        # Caller holds the lock.
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="faiss-snapshots", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.snapshot_interval):
+            self.snapshot()
+
+    def stop(self) -> None:
+        """Stop the snapshot thread and save pending changes."""
+        self._stop.set()
+        self.snapshot()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "indexes": [
+                    {
+                        "folder_path": folder_path,
+                        "index_name": index_name,
+                        "index_type": store.index_type,
+                        "vectors": store.index.ntotal,
+                        "persist": self._persistent.get((folder_path, index_name), False),
+                        "dirty": store.dirty,
+                    }
+                    for (folder_path, index_name), store in self._indexes.items()
+                ],
+                "snapshot_interval": self.snapshot_interval,
+            }
+
+
+_store: Optional[FaissIndexStore] = None
+_store_lock = threading.Lock()
+
+
+def _shutdown_store() -> None:
+    if _store is not None:
+        _store.stop()
+
+
+def get_faiss_store() -> FaissIndexStore:
+    """Get the process-wide FAISS index store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FaissIndexStore(snapshot_interval=get_settings().FAISS_SNAPSHOT_INTERVAL_SECONDS)
+            atexit.register(_shutdown_store)
+    return _store
@@ -13,17 +13,35 @@ from enum import Enum
 import uuid
 import asyncio
 import os
+import time
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import Runnable, RunnableConfig
 
+from app.core.logging_config import get_execution_logger, begin_execution_logging, end_execution_logging
+from app.core.metrics import (
+    TokenUsageCallbackHandler,
+    begin_execution_metrics,
+    end_execution_metrics,
+    enter_node,
+    exit_node,
+    record_node_execution,
+)
+from app.core.profiler import profile_span
 from app.core.state import FlowState
 from app.nodes.base import BaseNode
+from app.services.credential_service import credential_key, node_credential_ref, resolve_flow_credentials
+
+logger = get_execution_logger(__name__)
 
 __all__ = ["GraphBuilder", "NodeConnection", "GraphNodeInstance", "ControlFlowType"]
 
+# Processor categories whose nodes supply an object (memory, vector store) to
+# the processor they are connected to, rather than running on their own.
+_SUPPLIER_CATEGORIES = {"Memory", "Vector Stores"}
+
 
 @dataclass
 class NodeConnection:
@@ -71,8 +89,17 @@ class GraphBuilder:
     # ---------------------------------------------------------------------
     # Public API
     # ---------------------------------------------------------------------
-    def build_from_flow(self, flow_data: Dict[str, Any], user_id: Optional[str] = None) -> CompiledStateGraph:
-        """Given the JSON sent from the frontend, construct LangGraph."""
+    def build_from_flow(
+        self,
+        flow_data: Dict[str, Any],
+        user_id: Optional[str] = None,
+        credentials: Optional[List[Dict[str, Any]]] = None,
+    ) -> CompiledStateGraph:
+        """Given the JSON sent from the frontend, construct LangGraph.
+
+        ``credentials`` are the flow's prefetched credentials; with them the
+        build never queries the database.
+        """
         nodes = flow_data.get("nodes", [])
         edges = flow_data.get("edges", [])
 
@@ -92,7 +119,7 @@ class GraphBuilder:
         
         # Create virtual EndNode if none exists for better UX
         if not end_nodes:
-            print("⚠️  No EndNode found. Creating virtual EndNode for workflow completion.")
+            logger.info("No EndNode found. Creating virtual EndNode for workflow completion.")
             virtual_end_node = {
                 "id": "virtual-end-node",
                 "type": "EndNode",
@@ -121,7 +148,7 @@ class GraphBuilder:
                     "targetHandle": "input"
                 }
                 edges.append(virtual_edge)
-                print(f"🔗 Auto-connected {node_id} -> virtual-end-node")
+                logger.debug("Auto-connected %s -> virtual-end-node", node_id)
             
         start_node_ids = {n["id"] for n in start_nodes}
         end_node_ids = {n["id"] for n in end_nodes}
@@ -139,11 +166,16 @@ class GraphBuilder:
         
         self._parse_connections(edges)
         self._identify_control_flow_nodes(regular_nodes)
-        self._instantiate_nodes(regular_nodes)
+        # One cached, batched lookup for every credential the flow references
+        with profile_span("resolve_credentials"):
+            credentials = resolve_flow_credentials(flow_data, user_id, prefetched=credentials)
+        with profile_span("instantiate_nodes"):
+            self._instantiate_nodes(regular_nodes, credentials)
         
         # Store EndNodes separately for connection tracking
         self.end_nodes_for_connections = {n["id"]: n for n in end_nodes_for_processing}
-        self.graph = self._build_langgraph()
+        with profile_span("compile_graph"):
+            self.graph = self._build_langgraph()
         return self.graph
 
     async def execute(
@@ -166,7 +198,10 @@ class GraphBuilder:
             workflow_id=workflow_id,
             variables=inputs,
         )
-        config: RunnableConfig = {"configurable": {"thread_id": init_state.session_id}}
+        config: RunnableConfig = {
+            "configurable": {"thread_id": init_state.session_id},
+            "callbacks": [TokenUsageCallbackHandler()],
+        }
 
         if stream:
             return self._execute_stream(init_state, config)
@@ -199,7 +234,7 @@ class GraphBuilder:
                     data_type=data_type,
                 )
                 self.connections.append(conn)
-                print(f"[DEBUG] Parsed connection: {source}[{source_handle}] -> {target}[{target_handle}]")
+                logger.debug("Parsed connection: %s[%s] -> %s[%s]", source, source_handle, target, target_handle)
 
     def _identify_control_flow_nodes(self, nodes: List[Dict[str, Any]]):
         """Detect control-flow constructs like conditional, loop, parallel."""
@@ -216,8 +251,11 @@ class GraphBuilder:
                     "data": node_def.get("data", {}),
                 }
 
-    def _instantiate_nodes(self, nodes: List[Dict[str, Any]]):
+    def _instantiate_nodes(
+        self, nodes: List[Dict[str, Any]], credentials: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
         """Instantiate nodes and build proper connection mappings with source handle support."""
+        credentials = credentials or {}
         for node_def in nodes:
             node_id = node_def["id"]
             node_type = node_def["type"]
@@ -228,7 +266,7 @@ class GraphBuilder:
 
             node_cls = self.node_registry.get(node_type)
             if not node_cls:
-                print(f"[WARNING] Unknown node type: {node_type}. Available types: {list(self.node_registry.keys())}")
+                logger.warning("Unknown node type: %s. Available types: %s", node_type, list(self.node_registry.keys()))
                 raise ValueError(f"Unknown node type: {node_type}")
 
             instance = node_cls()
@@ -246,7 +284,7 @@ class GraphBuilder:
                         "source_handle": conn.source_handle,
                         "data_type": conn.data_type
                     }
-                    print(f"[DEBUG] Input mapping: {node_id}.{conn.target_handle} <- {conn.source_node_id}.{conn.source_handle}")
+                    logger.debug("Input mapping: %s.%s <- %s.%s", node_id, conn.target_handle, conn.source_node_id, conn.source_handle)
                 
                 # Find all connections from this node (outputs)
                 if conn.source_node_id == node_id:
@@ -257,7 +295,7 @@ class GraphBuilder:
                         "target_handle": conn.target_handle,
                         "data_type": conn.data_type
                     })
-                    print(f"[DEBUG] Output mapping: {node_id}.{conn.source_handle} -> {conn.target_node_id}.{conn.target_handle}")
+                    logger.debug("Output mapping: %s.%s -> %s.%s", node_id, conn.source_handle, conn.target_node_id, conn.target_handle)
 
             # 🔥 CRITICAL: Set connection mappings on the node instance
             instance._input_connections = input_connections
@@ -265,10 +303,18 @@ class GraphBuilder:
             
             # Store user configuration from frontend
             instance.user_data = user_data
+
+            # Inject the referenced credential (resolved once per build)
+            credential_ref = node_credential_ref(user_data)
+            if credential_ref:
+                instance.credential = credentials.get(credential_key(credential_ref))
+                if instance.credential is None:
+                    # Node falls back to inline config / environment keys
+                    logger.warning("Credential '%s' referenced by node %s was not found", credential_ref, node_id)
             
             # Log user data for debugging
             if user_data:
-                print(f"[DEBUG] Node {node_id} user data: {list(user_data.keys())}")
+                logger.debug("Node %s user data: %s", node_id, list(user_data.keys()))
 
             # Create GraphNodeInstance
             self.nodes[node_id] = GraphNodeInstance(
@@ -279,7 +325,7 @@ class GraphBuilder:
                 user_data=user_data,
             )
             
-            print(f"[DEBUG] ✅ Instantiated node '{node_id}' ({node_type}) with {len(input_connections)} inputs, {len(output_connections)} outputs")
+            logger.debug("Instantiated node '%s' (%s) with %d inputs, %d outputs", node_id, node_type, len(input_connections), len(output_connections))
 
     # ------------------------------------------------------------------
     # Internal – Graph building
@@ -306,18 +352,31 @@ class GraphBuilder:
         """Wrapper that merges user data and calls the node function"""
         
         def wrapper(state: FlowState) -> Dict[str, Any]:  # noqa: D401
+            """Time the node and report it to the execution metrics."""
+            node_token = enter_node(node_id, gnode.type)
+            started = time.perf_counter()
+            try:
+                with profile_span(f"node:{node_id}"):
+                    result = run_node(state)
+            finally:
+                exit_node(node_token)
+            record_node_execution(node_id, gnode.type, time.perf_counter() - started, result)
+            return result
+
+        def run_node(state: FlowState) -> Dict[str, Any]:
             """Enhanced wrapper that provides better context and error handling."""
             try:
-                print(f"[DEBUG] Executing node: {node_id} ({gnode.type})")
+                logger.debug("Executing node: %s (%s)", node_id, gnode.type)
                 
                 # Merge user data into node instance before execution
                 gnode.node_instance.user_data.update(gnode.user_data)
+                gnode.node_instance.user_id = state.user_id
                 
                 # 🔥 ENHANCED: Pass session information to ReAct Agents
                 if gnode.type in ['ReactAgent', 'ToolAgentNode'] and hasattr(gnode.node_instance, 'session_id'):
                     session_id = state.session_id or f"session_{node_id}"
                     gnode.node_instance.session_id = session_id
-                    print(f"[DEBUG] Set session_id for {node_id}: {session_id}")
+                    logger.debug("Set session_id for %s: %s", node_id, session_id)
                 
                 # 🔥 SPECIAL HANDLING for ProcessorNodes (ReactAgent)
                 if gnode.node_instance.metadata.node_type.value == "processor":
@@ -325,8 +384,10 @@ class GraphBuilder:
                     user_inputs = self._extract_user_inputs_for_processor(gnode, state)
                     connected_nodes = self._extract_connected_node_instances(gnode, state)
                     
-                    print(f"[DEBUG] Processor {node_id} - User inputs: {list(user_inputs.keys())}")
-                    print(f"[DEBUG] Processor {node_id} - Connected nodes: {list(connected_nodes.keys())}")
+                    logger.debug(
+                        "Processor %s - user inputs: %s, connected nodes: %s",
+                        node_id, list(user_inputs), list(connected_nodes),
+                    )
                     
                     # Call execute directly with connected node instances
                     result = gnode.node_instance.execute(user_inputs, connected_nodes)
@@ -354,19 +415,18 @@ class GraphBuilder:
                         "executed_nodes": updated_executed_nodes,
                         "last_output": last_output
                     }
-                    print(f"[DEBUG] Node {node_id} returning state update: {result_dict}")
-                    print(f"[DEBUG] State after update - last_output: '{state.last_output}'")
+                    logger.debug("Node %s completed successfully", node_id)
                     return result_dict
                 else:
                     # For other node types, use the standard graph node function
                     node_func = gnode.node_instance.to_graph_node()
                     result = node_func(state)
-                    print(f"[DEBUG] Node {node_id} completed successfully")
+                    logger.debug("Node %s completed successfully", node_id)
                     return result
                 
             except Exception as e:
                 error_msg = f"Node {node_id} execution failed: {str(e)}"
-                print(f"[ERROR] {error_msg}")
+                logger.error(error_msg, exc_info=True)
                 if hasattr(state, 'add_error'):
                     state.add_error(error_msg)
                 return {
@@ -383,9 +443,10 @@ class GraphBuilder:
         
         for input_spec in gnode.node_instance.metadata.inputs:
             if not input_spec.is_connection:
-                # Check user_data first (from frontend form)
-                if input_spec.name in gnode.node_instance.user_data:
-                    inputs[input_spec.name] = gnode.node_instance.user_data[input_spec.name]
+                found, value = gnode.node_instance.resolve_input(input_spec.name)
+                # Check user_data and the credential first
+                if found:
+                    inputs[input_spec.name] = value
                 # Then check state variables
                 elif input_spec.name in state.variables:
                     inputs[input_spec.name] = state.get_variable(input_spec.name)
@@ -419,17 +480,33 @@ class GraphBuilder:
                         
                         # For provider nodes, we need to execute them to get the instance
                         if source_node_instance.metadata.node_type.value == "provider":
+                            # Session-scoped providers (memory) key their state by user and session
+                            source_node_instance.session_id = state.session_id
+                            source_node_instance.user_id = state.user_id
                             try:
                                 # Execute the provider node to get the actual instance
                                 provider_inputs = self._extract_user_inputs_for_processor(self.nodes[source_node_id], state)
                                 node_instance = source_node_instance.execute(**provider_inputs)
                                 connected[input_spec.name] = node_instance
-                                print(f"[DEBUG] Connected {input_spec.name} -> {source_node_id} instance: {type(node_instance).__name__}")
+                                logger.debug("Connected %s -> %s instance: %s", input_spec.name, source_node_id, type(node_instance).__name__)
+                            except Exception as e:
+                                logger.error("Failed to get instance from %s: %s", source_node_id, e)
+                        elif source_node_instance.metadata.category in _SUPPLIER_CATEGORIES:
+                            # Memory / vector store processors build their object from their own connections
+                            source_node_instance.session_id = state.session_id
+                            source_node_instance.user_id = state.user_id
+                            try:
+                                source_gnode = self.nodes[source_node_id]
+                                source_gnode.node_instance.user_data.update(source_gnode.user_data)
+                                connected[input_spec.name] = source_node_instance.execute(
+                                    self._extract_user_inputs_for_processor(source_gnode, state),
+                                    self._extract_connected_node_instances(source_gnode, state),
+                                )
                             except Exception as e:
-                                print(f"[ERROR] Failed to get instance from {source_node_id}: {e}")
+                                logger.error("Failed to get memory from %s: %s", source_node_id, e)
                         else:
                             connected[input_spec.name] = source_node_instance
-                            print(f"[DEBUG] Connected {input_spec.name} -> {source_node_id} instance: {type(source_node_instance).__name__}")
+                            logger.debug("Connected %s -> %s instance: %s", input_spec.name, source_node_id, type(source_node_instance).__name__)
         
         return connected
 
@@ -438,13 +515,12 @@ class GraphBuilder:
         # For processor nodes, if result is a Runnable, execute it with the user input
         if isinstance(result, Runnable):
             try:
-                print(f"[DEBUG] Executing Runnable for {node_id} with input: {state.current_input}")
+                logger.debug("Executing Runnable for %s", node_id)
                 # Execute the Runnable with the user input
                 executed_result = result.invoke(state.current_input)
-                print(f"[DEBUG] Runnable execution result: {executed_result}")
                 return executed_result
             except Exception as e:
-                print(f"[ERROR] Failed to execute Runnable for {node_id}: {e}")
+                logger.error("Failed to execute Runnable for %s: %s", node_id, e)
                 return {"error": str(e)}
         
         # For other types, ensure JSON-serializable
@@ -552,8 +628,6 @@ class GraphBuilder:
 
     # ---------------- Regular edges & START/END ------------
     def _add_regular_edges(self, graph: StateGraph):
-        print(f"[DEBUG] Adding regular edges:")
-        
         # Group connections by target node to handle multi-input nodes properly
         target_groups = {}
         for c in self.connections:
@@ -569,9 +643,8 @@ class GraphBuilder:
             if target_node in self.end_nodes_for_connections:
                 continue
 
-            print(f"[DEBUG] Target {target_node} depends on: {source_nodes}")
             for source_node in source_nodes:
-                print(f"[DEBUG]   {source_node} -> {target_node}")
+                logger.debug("Edge %s -> %s", source_node, target_node)
                 graph.add_edge(source_node, target_node)
 
     def _add_start_end_connections(self, graph: StateGraph):
@@ -580,28 +653,26 @@ class GraphBuilder:
         and connects nodes linked to EndNode to END.
         This method replaces the old auto-detection logic.
         """
-        print("[DEBUG] Connecting START and END nodes based on explicit connections.")
-        
         # 1. Connect START to the nodes that follow StartNode
         if not self.explicit_start_nodes:
             raise ValueError("StartNode is not connected to any other node.")
             
         for start_target_id in self.explicit_start_nodes:
             if start_target_id in self.nodes or start_target_id in self.control_flow_nodes:
-                print(f"[DEBUG]   START -> {start_target_id}")
+                logger.debug("Edge START -> %s", start_target_id)
                 graph.add_edge(START, start_target_id)
             elif start_target_id in self.end_nodes_for_connections:
                 # Special case: StartNode connects directly to EndNode
-                print(f"[DEBUG]   START -> END (via {start_target_id})")
+                logger.debug("Edge START -> END (via %s)", start_target_id)
                 graph.add_edge(START, END)
             else:
-                print(f"[WARNING] StartNode is connected to a non-existent node: {start_target_id}")
+                logger.warning("StartNode is connected to a non-existent node: %s", start_target_id)
 
         # 2. Connect nodes that lead into an EndNode to the graph's END
         end_connections = [c for c in self.connections if c.target_node_id in getattr(self, 'end_nodes_for_connections', {})]
         
         if not end_connections:
-            print("⚠️  No nodes connected to EndNode. Connecting all terminal nodes to END.")
+            logger.info("No nodes connected to EndNode. Connecting all terminal nodes to END.")
             # Find terminal nodes (nodes that don't have outgoing connections to other regular nodes)
             all_targets = {c.target_node_id for c in self.connections if c.target_node_id in self.nodes}
             all_sources = {c.source_node_id for c in self.connections if c.source_node_id in self.nodes}
@@ -609,16 +680,16 @@ class GraphBuilder:
             
             for terminal_node in terminal_nodes:
                 if terminal_node in self.nodes:
-                    print(f"[DEBUG]   {terminal_node} -> END (terminal node)")
+                    logger.debug("Edge %s -> END (terminal node)", terminal_node)
                     graph.add_edge(terminal_node, END)
         else:
             end_source_ids = {conn.source_node_id for conn in end_connections}
             for end_source_id in end_source_ids:
                 if end_source_id in self.nodes or end_source_id in self.control_flow_nodes:
-                    print(f"[DEBUG]   {end_source_id} -> END")
+                    logger.debug("Edge %s -> END", end_source_id)
                     graph.add_edge(end_source_id, END)
                 else:
-                    print(f"[WARNING] A non-existent node is connected to EndNode: {end_source_id}")
+                    logger.warning("A non-existent node is connected to EndNode: %s", end_source_id)
 
     def _connect_orphan_start_nodes(self, graph: StateGraph):
         # This method is now obsolete and will not be called.
@@ -629,6 +700,18 @@ class GraphBuilder:
     # Internal – Execution helpers
     # ------------------------------------------------------------------
     async def _execute_sync(self, init_state: FlowState, config: RunnableConfig) -> Dict[str, Any]:
+        log_token = begin_execution_logging(session_id=init_state.session_id, workflow_id=init_state.workflow_id)
+        metrics, metrics_token = begin_execution_metrics(init_state.workflow_id)
+        result: Dict[str, Any] = {"success": False}
+        try:
+            result = await self._invoke_graph(init_state, config)
+            result["metrics"] = metrics.summary()
+            return result
+        finally:
+            end_execution_metrics(metrics, metrics_token, "success" if result.get("success") else "error")
+            end_execution_logging(log_token)
+
+    async def _invoke_graph(self, init_state: FlowState, config: RunnableConfig) -> Dict[str, Any]:
         try:
             # Prefer async interface if implemented
             result_state = await self.graph.ainvoke(init_state, config=config)  # type: ignore[arg-type]
@@ -720,11 +803,26 @@ class GraphBuilder:
             return str(obj)
 
     async def _execute_stream(self, init_state: FlowState, config: RunnableConfig):
+        log_token = begin_execution_logging(session_id=init_state.session_id, workflow_id=init_state.workflow_id)
+        metrics, metrics_token = begin_execution_metrics(init_state.workflow_id)
+        status = "error"
+        try:
+            async for event in self._stream_graph(init_state, config):
+                if event.get("type") == "complete":
+                    event["metrics"] = metrics.summary()
+                    status = "success"
+                yield event
+        finally:
+            end_execution_metrics(metrics, metrics_token, status)
+            end_execution_logging(log_token)
+
+    async def _stream_graph(self, init_state: FlowState, config: RunnableConfig):
         try:
             yield {"type": "start", "session_id": init_state.session_id, "message": "Starting workflow execution"}
             async for ev in self.graph.astream_events(init_state, config=config):  # type: ignore[arg-type]
                 # Make entire event serializable before processing
-                ev = self._make_serializable(ev)
+                with profile_span("serialize_event"):
+                    ev = self._make_serializable(ev)
                 
                 ev_type = ev.get("event", "")
                 if ev_type == "on_chain_start":
@@ -735,18 +833,15 @@ class GraphBuilder:
                     yield {"type": "node_end", "node_id": ev.get("name", "unknown"), "output": output_data}
                 elif ev_type == "on_llm_new_token":
                     yield {"type": "token", "content": ev.get("data", {}).get("chunk", "")}
+                elif ev_type == "on_custom_event":
+                    # Progress reported by long-running nodes (e.g. document ingestion)
+                    yield {"type": "progress", "name": ev.get("name", ""), "data": ev.get("data", {})}
                 elif ev_type == "on_chain_error":
                     yield {"type": "error", "error": str(ev.get("data", {}).get("error", "Unknown error"))}
             final_state = await self.graph.aget_state(config)  # type: ignore[arg-type]
-            print(f"[DEBUG] Final state: {final_state}")
-            print(f"[DEBUG] Final state values: {getattr(final_state, 'values', 'No values')}")
-            
             # Convert FlowState to serializable format using helper
             if hasattr(final_state, 'values') and final_state.values:
                 state_values = final_state.values
-                print(f"[DEBUG] State values type: {type(state_values)}")
-                print(f"[DEBUG] State values keys: {list(state_values.keys()) if isinstance(state_values, dict) else 'Not a dict'}")
-                
                 # Handle both dict and object access patterns
                 if isinstance(state_values, dict):
                     last_output = state_values.get("last_output", "")
@@ -759,18 +854,15 @@ class GraphBuilder:
                     node_outputs = getattr(state_values, "node_outputs", {})
                     session_id = getattr(state_values, "session_id", init_state.session_id)
                 
-                print(f"[DEBUG] Extracted last_output: '{last_output}'")
-                print(f"[DEBUG] Extracted executed_nodes: {executed_nodes}")
-                print(f"[DEBUG] Extracted node_outputs: {node_outputs}")
-                
-                serializable_result = self._make_serializable({
-                    "last_output": last_output,
-                    "executed_nodes": executed_nodes,
-                    "node_outputs": node_outputs,
-                    "session_id": session_id
-                })
+                with profile_span("serialize_result"):
+                    serializable_result = self._make_serializable({
+                        "last_output": last_output,
+                        "executed_nodes": executed_nodes,
+                        "node_outputs": node_outputs,
+                        "session_id": session_id
+                    })
             else:
-                print("[DEBUG] No final state values found")
+                logger.debug("No final state values found")
                 serializable_result = {
                     "last_output": "",
                     "executed_nodes": [],
@@ -785,7 +877,7 @@ class GraphBuilder:
                 "node_outputs": serializable_result.get("node_outputs", {}),
                 "session_id": serializable_result.get("session_id", init_state.session_id),
             }
-            print(f"🎯 Sending complete event: {complete_event}")
+            logger.debug("Sending complete event for session %s", complete_event["session_id"])
             yield complete_event
         except Exception as e:
             yield {"type": "error", "error": str(e), "error_type": type(e).__name__} 
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Token-budgeted window over a conversation history.
+
+Agents format the chat history into every prompt, so with a plain buffer
+memory prompt size – and LLM latency and cost – grows with the length of the
+conversation.  :class:`TokenWindowMemory` keeps the full history in its chat
+store but only hands out the newest whole turns that fit ``max_token_limit``.
+
+Token counts are computed once per distinct message and cached
+(:func:`message_tokens`), so building the window each turn costs a walk over
+the newest messages, not a re-tokenization of the conversation.  Counting
+uses ``tiktoken`` when it is installed (it ships with ``langchain-openai``)
+and a four-characters-per-token estimate otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import BaseMessage, get_buffer_string
+
+__all__ = ["TokenWindowMemory", "count_tokens", "message_tokens", "split_window"]
+
+# Role/formatting overhead added to each message's content tokens
+_MESSAGE_OVERHEAD = 4
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # not installed, or the encoding cannot be loaded offline
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in ``text`` (estimated when ``tiktoken`` is unavailable)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+@lru_cache(maxsize=20000)
+def _cached_tokens(message_type: str, content: str) -> int:
+    return count_tokens(content) + _MESSAGE_OVERHEAD
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Token count of one message, cached by type and content."""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    return _cached_tokens(message.type, content)
+
+
+def _turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a human message."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if message.type == "human" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def split_window(messages: Sequence[BaseMessage], max_tokens: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """Split ``messages`` into ``(evicted, kept)``.
+
+    ``kept`` is the newest run of whole turns whose tokens fit ``max_tokens``;
+    ``evicted`` is everything older.  ``max_tokens <= 0`` keeps everything.
+    """
+    if max_tokens <= 0:
+        return [], list(messages)
+    turns = _turns(messages)
+    used = 0
+    start = len(turns)
+    while start > 0:
+        cost = sum(message_tokens(m) for m in turns[start - 1])
+        if used + cost > max_tokens:
+            break
+        used += cost
+        start -= 1
+    evicted = [m for turn in turns[:start] for m in turn]
+    kept = [m for turn in turns[start:] for m in turn]
+    return evicted, kept
+
+
+class TokenWindowMemory(ConversationBufferMemory):
+    """Buffer memory that exposes only the newest turns within ``max_token_limit`` tokens.
+
+    The underlying ``chat_memory`` keeps the whole conversation; only what is
+    loaded into prompts is windowed.
+    """
+
+    max_token_limit: int = 2000
+
+    @property
+    def buffer_as_messages(self) -> List[BaseMessage]:
+        return split_window(self.chat_memory.messages, self.max_token_limit)[1]
+
+    @property
+    def buffer_as_str(self) -> str:
+        return get_buffer_string(
+            self.buffer_as_messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix
+        )
+
+    def window_stats(self) -> Dict[str, Any]:
+        evicted, kept = split_window(self.chat_memory.messages, self.max_token_limit)
+        return {
+            "kept_messages": len(kept),
+            "evicted_messages": len(evicted),
+            "kept_tokens": sum(message_tokens(m) for m in kept),
+            "max_token_limit": self.max_token_limit,
+        }
@@ -0,0 +1,228 @@
+"""Batched document ingestion: load → split → embed → upsert.
+
+:class:`IngestionPipeline` streams documents from any loader into a vector
+store with every stage overlapped:
+
+* **Load** – ``lazy_load()`` where the loader has it, so large sources are
+  never held in memory at once.
+* **Split** – documents go to a process pool in groups of
+  ``INGESTION_SPLIT_BATCH`` (splitting is CPU-bound Python, so threads would
+  serialize on the GIL).  With ``split_workers <= 1`` splitting runs inline.
+* **Embed** – chunks are packed into batches of at most ``embed_batch_size``
+  chunks and ``max_batch_tokens`` tokens, and at most ``max_concurrency``
+  batches are embedded at once on a thread pool.
+* **Upsert** – each embedded batch is written in one call
+  (``add_embeddings`` where the store has it, else ``add_texts``) from the
+  calling thread, so stores need not be thread-safe.
+
+Chunk ids are derived from the source and content, so re-ingesting a
+document upserts the same ids instead of duplicating it; chunks already in a
+FAISS index are skipped before embedding.  ``progress`` is called after every
+upserted batch with the running counters, which include docs/sec and
+tokens/sec.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.history_window import count_tokens
+from app.core.metrics import record_ingestion
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["IngestionPipeline", "iter_documents"]
+
+_Chunk = Tuple[str, str, Dict[str, Any], int]  # (id, text, metadata, tokens)
+
+# Namespace for chunk ids (uuid5 of source + content; valid ids for Qdrant too)
+_CHUNK_NAMESPACE = uuid.UUID("0f6c1d2e-8b4a-4f3e-9c21-5a7d3b9e4c10")
+
+
+def iter_documents(source: Any) -> Iterator[Document]:
+    """Documents from a loader (``lazy_load``/``load``), a runnable, or an iterable of documents."""
+    if hasattr(source, "lazy_load"):
+        try:
+            yield from source.lazy_load()
+            return
+        except NotImplementedError:
+            pass
+    if hasattr(source, "load"):
+        yield from source.load()
+        return
+    if hasattr(source, "invoke"):
+        source = source.invoke(None)
+    if isinstance(source, Document):
+        yield source
+        return
+    for item in source or ():
+        if isinstance(item, Document):
+            yield item
+        elif isinstance(item, str):
+            yield Document(page_content=item)
+        elif isinstance(item, dict) and "content" in item:
+            yield Document(page_content=item["content"], metadata=item.get("metadata") or {})
+
+
+def _split_batch(splitter: Any, documents: List[Document]) -> List[Document]:
+    # Runs in a worker process; must stay a module-level function to be picklable.
+    return splitter.split_documents(documents)
+
+
+def _chunk_id(chunk: Document) -> str:
+    source = str(chunk.metadata.get("source", ""))
+    return str(uuid.uuid5(_CHUNK_NAMESPACE, f"{source}\0{chunk.page_content}"))
+
+
+class IngestionPipeline:
+    """One ingestion run into ``vectorstore``; create a new pipeline per run."""
+
+    def __init__(
+        self,
+        vectorstore: Any,
+        splitter: Any,
+        *,
+        embeddings: Optional[Embeddings] = None,
+        embed_batch_size: int = 128,
+        max_batch_tokens: int = 50000,
+        max_concurrency: int = 4,
+        split_workers: int = 0,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.vectorstore = vectorstore
+        self.splitter = splitter
+        self.embeddings = embeddings or getattr(vectorstore, "embeddings", None)
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.split_workers = split_workers
+        self.progress = progress
+        self.stats = {"documents": 0, "chunks": 0, "skipped": 0, "upserted": 0, "tokens": 0, "batches": 0}
+        self._seen: Set[str] = set()
+        self._existing: Set[str] = set(getattr(vectorstore, "index_to_docstore_id", {}).values())
+        self._started = 0.0
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _split(self, documents: Iterable[Document]) -> Iterator[Document]:
+        group_size = max(1, get_settings().INGESTION_SPLIT_BATCH)
+
+        def groups() -> Iterator[List[Document]]:
+            group: List[Document] = []
+            for document in documents:
+                self.stats["documents"] += 1
+                group.append(document)
+                if len(group) >= group_size:
+                    yield group
+                    group = []
+            if group:
+                yield group
+
+        if self.split_workers <= 1:
+            for group in groups():
+                yield from self.splitter.split_documents(group)
+            return
+
+        # spawn, not fork: this runs on executor threads of a multi-threaded server
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.split_workers, mp_context=context) as pool:
+            pending: Set[Future] = set()
+            for group in groups():
+                # Bound in-flight groups so a fast loader cannot fill memory
+                if len(pending) >= self.split_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                pending.add(pool.submit(_split_batch, self.splitter, group))
+            for future in pending:
+                yield from future.result()
+
+    def _batches(self, chunks: Iterable[Document]) -> Iterator[List[_Chunk]]:
+        batch: List[_Chunk] = []
+        batch_tokens = 0
+        for chunk in chunks:
+            if not chunk.page_content.strip():
+                continue
+            chunk_id = _chunk_id(chunk)
+            if chunk_id in self._seen or chunk_id in self._existing:
+                self.stats["skipped"] += 1
+                continue
+            self._seen.add(chunk_id)
+            self.stats["chunks"] += 1
+            tokens = count_tokens(chunk.page_content)
+            if batch and (
+                len(batch) >= self.embed_batch_size
+                or (self.max_batch_tokens and batch_tokens + tokens > self.max_batch_tokens)
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append((chunk_id, chunk.page_content, chunk.metadata, tokens))
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _embed(self, batch: List[_Chunk]) -> Tuple[List[_Chunk], Optional[List[List[float]]]]:
+        if self.embeddings is None or not hasattr(self.vectorstore, "add_embeddings"):
+            return batch, None  # the store embeds in add_texts
+        return batch, self.embeddings.embed_documents([text for _, text, _, _ in batch])
+
+    def _upsert(self, batch: List[_Chunk], vectors: Optional[List[List[float]]]) -> None:
+        ids = [chunk_id for chunk_id, _, _, _ in batch]
+        texts = [text for _, text, _, _ in batch]
+        metadatas = [metadata for _, _, metadata, _ in batch]
+        if vectors is not None:
+            self.vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+        else:
+            self.vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+        self.stats["upserted"] += len(batch)
+        self.stats["tokens"] += sum(tokens for _, _, _, tokens in batch)
+        self.stats["batches"] += 1
+        if self.progress is not None:
+            try:
+                self.progress(self.report())
+            except Exception as e:
+                logger.debug("Ingestion progress callback failed: %s", e)
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        return {
+            **self.stats,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(self.stats["documents"] / elapsed, 2),
+            "chunks_per_sec": round(self.stats["upserted"] / elapsed, 2),
+            "tokens_per_sec": round(self.stats["tokens"] / elapsed, 2),
+        }
+
+    def run(self, documents: Iterable[Document]) -> Dict[str, Any]:
+        """Ingest ``documents``; return the final counters and throughput."""
+        self._started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ingestion-embed") as pool:
+            pending: Set[Future] = set()
+            for batch in self._batches(self._split(documents)):
+                if len(pending) >= self.max_concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._upsert(*future.result())
+                pending.add(pool.submit(self._embed, batch))
+            for future in pending:
+                self._upsert(*future.result())
+
+        report = self.report()
+        record_ingestion(report["documents"], report["upserted"], report["tokens"], report["seconds"])
+        logger.info("Ingestion finished: %s", report)
+        return report
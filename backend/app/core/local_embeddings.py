@@ -0,0 +1,268 @@
+"""Shared local embedding models with micro-batched inference.
+
+``HuggingFaceEmbeddingsNode`` used to construct ``HuggingFaceEmbeddings`` –
+loading a sentence-transformers model from disk – on every execution.  Now:
+
+* :class:`LocalModelRegistry` loads each ``(model, cache folder, device)``
+  once per process; concurrent first requests wait for the same load.  Model
+  names come from flow data, so at most ``LOCAL_EMBEDDING_MAX_MODELS`` stay
+  loaded: the least recently used one is evicted and its workers stopped
+  (embeddings still holding it encode inline until they are dropped).
+* Each loaded model gets a :class:`MicroBatcher`.  Callers enqueue their texts
+  and block on a future; worker threads (``LOCAL_EMBEDDING_WORKERS``) wait up
+  to ``LOCAL_EMBEDDING_BATCH_WAIT_MS`` for more requests, then encode up to
+  ``LOCAL_EMBEDDING_MAX_BATCH`` texts in one ``encode`` call.  Torch releases
+  the GIL while encoding, so several workers use several cores.
+* Queue depth and batch sizes are exported as Prometheus metrics and in
+  :meth:`MicroBatcher.stats`.
+
+:class:`BatchedHuggingFaceEmbeddings` is the LangChain ``Embeddings`` facade
+the node returns.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.metrics import record_embedding_batch
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BatchedHuggingFaceEmbeddings", "LocalModelRegistry", "MicroBatcher", "get_model_registry"]
+
+_ModelKey = Tuple[str, Optional[str], Optional[str]]  # (model name, cache folder, device)
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    options: Dict[str, Any]  # encode kwargs
+    future: Future = field(default_factory=Future)
+
+    @property
+    def group(self) -> str:
+        # Option values come from node data (lists, dicts, ...); JSON makes any of them a key
+        return json.dumps(self.options, sort_keys=True, default=str)
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests for one model into shared batches."""
+
+    def __init__(self, model: Any, name: str, *, workers: int = 1, max_batch: int = 64, wait_ms: float = 5.0):
+        self.model = model
+        self.name = name
+        self.max_batch = max(1, max_batch)
+        self.wait = wait_ms / 1000
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()  # None stops a worker
+        self._stopped = False
+        self._submit_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self._stats_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"embed-{name}-{i}", daemon=True) for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, texts: List[str], **encode_kwargs: Any) -> Future:
+        request = _Request(list(texts), dict(encode_kwargs))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        with self._submit_lock:
+            if not self._stopped:
+                self._queue.put(request)
+                return request.future
+        # Evicted from the registry: no workers left, encode in the caller's thread
+        self._encode([request], request.options)
+        return request.future
+
+    def stop(self) -> None:
+        """Stop the workers once the requests already queued are encoded."""
+        with self._submit_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            for _ in self._workers:
+                self._queue.put(None)
+
+    def encode(self, texts: List[str], **encode_kwargs: Any) -> List[List[float]]:
+        return self.submit(texts, **encode_kwargs).result()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _collect(self) -> Optional[List[_Request]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # leave the stop signal for this worker's next round
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                groups: Dict[str, List[_Request]] = {}
+                for request in batch:
+                    groups.setdefault(request.group, []).append(request)
+                for requests in groups.values():
+                    self._encode(requests, requests[0].options)
+            except Exception as e:
+                # A worker must never die: callers would wait on their futures forever
+                logger.error("Embedding batch for %s failed: %s", self.name, e)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _encode(self, requests: List[_Request], options: Dict[str, Any]) -> None:
+        texts = [text for request in requests for text in request.texts]
+        try:
+            vectors = self.model.encode(texts, **options)
+            vectors = vectors.tolist() if hasattr(vectors, "tolist") else [list(v) for v in vectors]
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+        offset = 0
+        for request in requests:
+            request.future.set_result(vectors[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+        with self._stats_lock:
+            self.batches += 1
+            self.texts += len(texts)
+        record_embedding_batch(self.name, len(texts), self._queue.qsize())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "model": self.name,
+                "queue_depth": self._queue.qsize(),
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "workers": len(self._workers),
+            }
+
+
+class LocalModelRegistry:
+    """Loads each local sentence-transformers model once and hands out its batcher."""
+
+    def __init__(self, max_models: int = 4):
+        self.max_models = max(1, max_models)
+        self._batchers: "OrderedDict[_ModelKey, MicroBatcher]" = OrderedDict()
+        self._loading: Dict[_ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, cache_folder: Optional[str] = None, device: Optional[str] = None) -> MicroBatcher:
+        key = (model_name, cache_folder, device)
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is not None:
+                self._batchers.move_to_end(key)
+                return batcher
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        # Load outside the registry lock so other models stay available meanwhile
+        with load_lock:
+            with self._lock:
+                batcher = self._batchers.get(key)
+            if batcher is not None:
+                return batcher
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError(
+                    "sentence-transformers is required for local HuggingFace embeddings: "
+                    "pip install sentence-transformers"
+                ) from e
+            started = time.perf_counter()
+            model = SentenceTransformer(model_name, cache_folder=cache_folder, device=device)
+            logger.info("Loaded embedding model %s in %.1fs", model_name, time.perf_counter() - started)
+            settings = get_settings()
+            batcher = MicroBatcher(
+                model,
+                model_name,
+                workers=settings.LOCAL_EMBEDDING_WORKERS,
+                max_batch=settings.LOCAL_EMBEDDING_MAX_BATCH,
+                wait_ms=settings.LOCAL_EMBEDDING_BATCH_WAIT_MS,
+            )
+            evicted = []
+            with self._lock:
+                self._batchers[key] = batcher
+                self._loading.pop(key, None)
+                while len(self._batchers) > self.max_models:
+                    evicted.append(self._batchers.popitem(last=False))
+            for (name, _, _), old in evicted:
+                old.stop()
+                logger.info("Unloaded embedding model %s (LOCAL_EMBEDDING_MAX_MODELS=%d)", name, self.max_models)
+            return batcher
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [batcher.stats() for batcher in self._batchers.values()]
+
+
+_registry: Optional[LocalModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> LocalModelRegistry:
+    """Get the process-wide local model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LocalModelRegistry(max_models=get_settings().LOCAL_EMBEDDING_MAX_MODELS)
+    return _registry
+
+
+class BatchedHuggingFaceEmbeddings(Embeddings):
+    """LangChain embeddings served by a shared, micro-batched local model."""
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        cache_folder: Optional[str] = None,
+        device: Optional[str] = None,
+        encode_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.model_name = model_name
+        self.encode_kwargs = dict(encode_kwargs or {})
+        self._batcher = get_model_registry().get(model_name, cache_folder, device)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [text.replace("\n", " ") for text in texts]
+        return self._batcher.encode(texts, **self.encode_kwargs)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,184 @@
+"""Structured, level-aware logging for the workflow execution path.
+
+The graph builder, nodes and engine used to ``print`` debug lines for every
+node (including whole state dumps), synchronously, on every request.  This
+module replaces that with standard :mod:`logging` plus three additions:
+
+* an optional JSON formatter so log lines can be shipped as structured records,
+* a queue-backed handler so emitting a record never blocks the event loop on
+  stdout I/O,
+* an execution-scoped *sampling* switch used by the per-node hot path.  In
+  ``production`` mode, hot-path debug records are only emitted for a sampled
+  fraction of executions; warnings and errors are always emitted.
+
+Hot-path code should use :func:`get_execution_logger` and pass arguments for
+lazy ``%``-formatting instead of building f-strings::
+
+    logger = get_execution_logger(__name__)
+    logger.debug("Executing node %s (%s)", node_id, node_type)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "StructuredFormatter",
+    "ExecutionLoggerAdapter",
+    "configure_logging",
+    "get_execution_logger",
+    "begin_execution_logging",
+    "end_execution_logging",
+    "is_execution_sampled",
+]
+
+# Execution-scoped logging context.  ``None`` means "not inside an execution"
+# (e.g. build-time code called directly), which falls back to the global mode.
+_execution_sampled: ContextVar[Optional[bool]] = ContextVar("execution_log_sampled", default=None)
+_execution_context: ContextVar[Dict[str, Any]] = ContextVar("execution_log_context", default={})
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: D401
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class ExecutionLoggerAdapter(logging.LoggerAdapter):
+    """Logger adapter for the per-node hot path.
+
+    Records below WARNING are dropped unless the current execution is sampled,
+    *before* any message formatting happens.  Execution context (session and
+    workflow ids) is attached to every record that does get emitted.
+    """
+
+    def isEnabledFor(self, level: int) -> bool:  # noqa: N802 – logging API
+        if level < logging.WARNING and not is_execution_sampled():
+            return False
+        return self.logger.isEnabledFor(level)
+
+    def process(self, msg, kwargs):
+        context = _execution_context.get()
+        if context:
+            extra = dict(context)
+            extra.update(kwargs.get("extra") or {})
+            kwargs["extra"] = extra
+        return msg, kwargs
+
+
+def _settings():
+    from app.core.config import get_settings  # local import to avoid cycles
+
+    return get_settings()
+
+
+def is_execution_sampled() -> bool:
+    """Return True if hot-path debug logging is enabled for this execution."""
+    sampled = _execution_sampled.get()
+    if sampled is not None:
+        return sampled
+    return _settings().EXECUTION_LOG_MODE.lower() != "production"
+
+
+def begin_execution_logging(**context: Any) -> Token:
+    """Decide whether the current execution is sampled and bind its context.
+
+    Returns a token that must be passed to :func:`end_execution_logging`.
+    """
+    settings = _settings()
+    if settings.EXECUTION_LOG_MODE.lower() == "production":
+        sampled = random.random() < settings.EXECUTION_LOG_SAMPLE_RATE
+    else:
+        sampled = True
+    _execution_context.set({k: v for k, v in context.items() if v is not None})
+    return _execution_sampled.set(sampled)
+
+
+def end_execution_logging(token: Token) -> None:
+    """Restore the logging state captured by :func:`begin_execution_logging`."""
+    try:
+        _execution_sampled.reset(token)
+    except ValueError:
+        # Async generators may finish in a different context than they started.
+        _execution_sampled.set(None)
+    _execution_context.set({})
+
+
+def get_execution_logger(name: str) -> ExecutionLoggerAdapter:
+    """Return a sampling-aware logger for hot-path code."""
+    return ExecutionLoggerAdapter(logging.getLogger(name), {})
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background log writer, if one is running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+
+def configure_logging(settings, stream: Optional[Any] = None) -> None:
+    """Configure root logging from application settings.
+
+    Safe to call more than once; previously installed handlers are replaced.
+    ``stream`` defaults to stdout.
+    """
+    global _queue_listener
+
+    level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    if settings.LOG_FORMAT.lower() == "json":
+        formatter: logging.Formatter = StructuredFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _stop_queue_listener()
+
+    if settings.LOG_ASYNC:
+        # Emitting only enqueues the record; a listener thread does the I/O.
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _queue_listener.start()
+    else:
+        root.addHandler(stream_handler)
+    root.setLevel(level)
+
+    logging.getLogger("uvicorn").setLevel(logging.INFO)
+    logging.getLogger("fastapi").setLevel(logging.INFO)
+    if settings.DEBUG:
+        logging.getLogger("app").setLevel(logging.DEBUG)
@@ -0,0 +1,268 @@
+"""Per-node execution metrics.
+
+Every node wrapped by :class:`~app.core.graph_builder.GraphBuilder` reports its
+latency, whether it failed, the size of its output and the LLM tokens it
+consumed.  Measurements go to two places:
+
+* process-wide Prometheus histograms/counters labelled by node type and
+  workflow, exposed on ``/metrics`` (requires ``prometheus_client``),
+* an :class:`ExecutionMetrics` collector bound to the current execution, whose
+  summary is attached to the final ``complete`` stream event / sync result.
+
+The collector is carried in a context variable, so node functions running in
+LangGraph's executor threads (which copy the caller's context) report into the
+right execution without any extra plumbing.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+    _PROMETHEUS_AVAILABLE = True
+except ImportError:
+    _PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+__all__ = [
+    "ExecutionMetrics",
+    "TokenUsageCallbackHandler",
+    "begin_execution_metrics",
+    "end_execution_metrics",
+    "current_execution_metrics",
+    "enter_node",
+    "exit_node",
+    "record_node_execution",
+    "record_ingestion",
+    "record_embedding_batch",
+    "render_metrics",
+    "CONTENT_TYPE_LATEST",
+]
+
+ADHOC_WORKFLOW = "adhoc"
+
+# Node latencies range from sub-millisecond pass-throughs to multi-second LLM calls.
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+if _PROMETHEUS_AVAILABLE:
+    NODE_DURATION = Histogram(
+        "kai_node_duration_seconds",
+        "Wall-clock time spent executing a workflow node",
+        ["node_type", "workflow_id"],
+        buckets=_LATENCY_BUCKETS,
+    )
+    NODE_ERRORS = Counter(
+        "kai_node_errors_total",
+        "Workflow node executions that raised or returned an error",
+        ["node_type", "workflow_id"],
+    )
+    NODE_OUTPUT_SIZE = Histogram(
+        "kai_node_output_chars",
+        "Size of a node's last_output in characters",
+        ["node_type", "workflow_id"],
+        buckets=_SIZE_BUCKETS,
+    )
+    NODE_TOKENS = Counter(
+        "kai_node_llm_tokens_total",
+        "LLM tokens consumed while executing a node",
+        ["node_type", "workflow_id", "kind"],
+    )
+    WORKFLOW_DURATION = Histogram(
+        "kai_workflow_duration_seconds",
+        "Wall-clock time of a whole workflow execution",
+        ["workflow_id", "status"],
+        buckets=_LATENCY_BUCKETS,
+    )
+    INGESTED = Counter(
+        "kai_ingestion_total",
+        "Items processed by document ingestion pipelines",
+        ["workflow_id", "kind"],
+    )
+    INGESTION_DURATION = Histogram(
+        "kai_ingestion_duration_seconds",
+        "Wall-clock time of a document ingestion run",
+        ["workflow_id"],
+        buckets=_LATENCY_BUCKETS,
+    )
+    EMBEDDING_QUEUE_DEPTH = Gauge(
+        "kai_local_embedding_queue_depth",
+        "Requests waiting for a local embedding model",
+        ["model"],
+    )
+    EMBEDDING_BATCH_SIZE = Histogram(
+        "kai_local_embedding_batch_texts",
+        "Texts encoded per local embedding model batch",
+        ["model"],
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+    )
+
+
+class ExecutionMetrics:
+    """Collects node measurements for a single workflow execution."""
+
+    def __init__(self, workflow_id: Optional[str] = None):
+        self.workflow_id = str(workflow_id) if workflow_id else ADHOC_WORKFLOW
+        self.started = time.perf_counter()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.tokens = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def _entry(self, node_id: str, node_type: str) -> Dict[str, Any]:
+        return self.nodes.setdefault(
+            node_id,
+            {"node_type": node_type, "calls": 0, "duration_ms": 0.0, "errors": 0,
+             "output_chars": 0, "prompt_tokens": 0, "completion_tokens": 0},
+        )
+
+    def record_node(self, node_id: str, node_type: str, duration: float, error: bool, output_size: int) -> None:
+        with self._lock:
+            entry = self._entry(node_id, node_type)
+            entry["calls"] += 1
+            entry["duration_ms"] += duration * 1000
+            entry["errors"] += int(error)
+            entry["output_chars"] = output_size
+
+    def record_tokens(self, node_id: Optional[str], node_type: str, prompt: int, completion: int) -> None:
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+            if node_id:
+                entry = self._entry(node_id, node_type)
+                entry["prompt_tokens"] += prompt
+                entry["completion_tokens"] += completion
+
+    def summary(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view, slowest nodes first."""
+        with self._lock:
+            nodes = {
+                node_id: {**entry, "duration_ms": round(entry["duration_ms"], 3)}
+                for node_id, entry in sorted(self.nodes.items(), key=lambda kv: -kv[1]["duration_ms"])
+            }
+            return {
+                "total_duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+                "nodes": nodes,
+                "tokens": dict(self.tokens),
+                "errors": sum(entry["errors"] for entry in nodes.values()),
+            }
+
+
+_current_metrics: ContextVar[Optional[ExecutionMetrics]] = ContextVar("execution_metrics", default=None)
+# Node currently executing in this context; used to attribute LLM token usage.
+_current_node: ContextVar[Optional[Tuple[str, str]]] = ContextVar("execution_metrics_node", default=None)
+
+
+def begin_execution_metrics(workflow_id: Optional[str] = None) -> Tuple[ExecutionMetrics, Token]:
+    """Bind a fresh collector to the current execution context."""
+    metrics = ExecutionMetrics(workflow_id)
+    return metrics, _current_metrics.set(metrics)
+
+
+def end_execution_metrics(metrics: ExecutionMetrics, token: Token, status: str = "success") -> None:
+    """Publish workflow-level metrics and unbind the collector."""
+    if _PROMETHEUS_AVAILABLE:
+        WORKFLOW_DURATION.labels(metrics.workflow_id, status).observe(time.perf_counter() - metrics.started)
+    try:
+        _current_metrics.reset(token)
+    except ValueError:
+        # Async generators may finish in a different context than they started.
+        _current_metrics.set(None)
+
+
+def current_execution_metrics() -> Optional[ExecutionMetrics]:
+    """Return the collector bound to the current execution, if any."""
+    return _current_metrics.get()
+
+
+def enter_node(node_id: str, node_type: str) -> Token:
+    """Mark ``node_id`` as the node whose LLM calls are being made."""
+    return _current_node.set((node_id, node_type))
+
+
+def exit_node(token: Token) -> None:
+    _current_node.reset(token)
+
+
+def record_node_execution(node_id: str, node_type: str, duration: float, result: Any) -> None:
+    """Record one node execution given the state update it returned."""
+    error = isinstance(result, dict) and "errors" in result
+    last_output = result.get("last_output") if isinstance(result, dict) else None
+    output_size = len(last_output) if isinstance(last_output, str) else 0
+
+    metrics = _current_metrics.get()
+    workflow_id = metrics.workflow_id if metrics else ADHOC_WORKFLOW
+    if metrics is not None:
+        metrics.record_node(node_id, node_type, duration, error, output_size)
+
+    if _PROMETHEUS_AVAILABLE:
+        NODE_DURATION.labels(node_type, workflow_id).observe(duration)
+        NODE_OUTPUT_SIZE.labels(node_type, workflow_id).observe(output_size)
+        if error:
+            NODE_ERRORS.labels(node_type, workflow_id).inc()
+
+
+def record_ingestion(documents: int, chunks: int, tokens: int, duration: float) -> None:
+    """Record one finished ingestion run (documents loaded, chunks upserted, tokens embedded)."""
+    if not _PROMETHEUS_AVAILABLE:
+        return
+    metrics = _current_metrics.get()
+    workflow_id = metrics.workflow_id if metrics else ADHOC_WORKFLOW
+    INGESTED.labels(workflow_id, "documents").inc(documents)
+    INGESTED.labels(workflow_id, "chunks").inc(chunks)
+    INGESTED.labels(workflow_id, "tokens").inc(tokens)
+    INGESTION_DURATION.labels(workflow_id).observe(duration)
+
+
+def record_embedding_batch(model: str, texts: int, queue_depth: int) -> None:
+    """Record one micro-batch encoded by a local embedding model."""
+    if not _PROMETHEUS_AVAILABLE:
+        return
+    EMBEDDING_BATCH_SIZE.labels(model).observe(texts)
+    EMBEDDING_QUEUE_DEPTH.labels(model).set(queue_depth)
+
+
+def _extract_token_usage(response: LLMResult) -> Tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage") or {}
+    if usage:
+        return int(usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0), int(
+            usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+        )
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += int(usage_metadata.get("input_tokens", 0) or 0)
+            completion += int(usage_metadata.get("output_tokens", 0) or 0)
+    return prompt, completion
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """Attribute LLM token usage to the workflow node that made the call."""
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt, completion = _extract_token_usage(response)
+        if not prompt and not completion:
+            return
+        node = _current_node.get()
+        node_id, node_type = node if node else (None, "unknown")
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.record_tokens(node_id, node_type, prompt, completion)
+        if _PROMETHEUS_AVAILABLE:
+            workflow_id = metrics.workflow_id if metrics else ADHOC_WORKFLOW
+            NODE_TOKENS.labels(node_type, workflow_id, "prompt").inc(prompt)
+            NODE_TOKENS.labels(node_type, workflow_id, "completion").inc(completion)
+
+
+def render_metrics() -> Optional[bytes]:
+    """Return the Prometheus text exposition, or None if unavailable."""
+    if not _PROMETHEUS_AVAILABLE:
+        return None
+    return generate_latest()
@@ -0,0 +1,253 @@
+"""Monthly range partitions for append-heavy history tables.
+
+``workflow_executions`` (by ``created_at``) and ``login_activity`` (by
+``attempted_at``) are declared ``PARTITION BY RANGE`` in the ORM.  This module
+keeps their partitions in shape:
+
+* :func:`ensure_partitions` creates the current month and ``months_ahead``
+  future months (``<table>_pYYYY_MM``) plus a ``<table>_default`` catch-all,
+  so inserts never hit a missing partition.  If maintenance fell behind and
+  the default partition already holds rows for a month being created, the
+  default is detached, the month created, its rows moved over and the
+  default re-attached.
+* :func:`drop_expired_partitions` enforces retention by dropping whole
+  monthly partitions older than the retention window – a metadata operation
+  instead of row-by-row ``DELETE`` and the vacuum debt that follows it.
+
+:func:`maintain_partitions` runs both for every registered table, each in its
+own savepoint so one failing table does not undo the others.  It is
+called from ``create_tables`` on startup, by the ``maintain_partitions``
+Celery beat task, and can be run by hand::
+
+    python -m app.core.partitioning [--dry-run]
+
+All functions take a synchronous SQLAlchemy ``Connection`` (use
+``conn.run_sync`` from async code) and are no-ops on databases other than
+Postgres or tables that are not partitioned yet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "PARTITIONED_TABLES",
+    "partition_name",
+    "ensure_partitions",
+    "drop_expired_partitions",
+    "maintain_partitions",
+]
+
+# Partitioned table -> settings attribute holding its retention in months (0 = keep forever)
+PARTITIONED_TABLES: Dict[str, str] = {
+    "workflow_executions": "EXECUTION_RETENTION_MONTHS",
+    "login_activity": "LOGIN_ACTIVITY_RETENTION_MONTHS",
+}
+
+# Rows in other tables that reference a partition's rows without an FK and
+# must go before the partition is dropped ({partition} is the quoted name).
+_DEPENDENT_CLEANUP: Dict[str, str] = {
+    "workflow_executions": (
+        "DELETE FROM execution_checkpoints c USING {partition} p WHERE c.execution_id = p.id"
+    ),
+}
+
+_PARTITION_RE = re.compile(r"_p(\d{4})_(\d{2})$")
+_RANGE_KEY_RE = re.compile(r"^RANGE \((\w+)\)$")
+
+
+# ----------------------------------------------------------------------------
+# Month arithmetic
+# ----------------------------------------------------------------------------
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the partition holding ``month`` (e.g. ``workflow_executions_p2026_10``)."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+# ----------------------------------------------------------------------------
+# Catalog helpers
+# ----------------------------------------------------------------------------
+
+def _is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar())
+
+
+def _partitions(conn: Connection, table: str) -> List[str]:
+    return list(conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars())
+
+
+def _partition_key(conn: Connection, table: str) -> Optional[str]:
+    definition = conn.execute(
+        text("SELECT pg_get_partkeydef(to_regclass(:table))"), {"table": table}
+    ).scalar()
+    match = _RANGE_KEY_RE.match(definition or "")
+    return match[1] if match else None
+
+
+def _monthly_partitions(conn: Connection, table: str) -> List[Tuple[str, date]]:
+    partitions = []
+    for name in _partitions(conn, table):
+        match = _PARTITION_RE.search(name)
+        if match and name == partition_name(table, date(int(match[1]), int(match[2]), 1)):
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+# ----------------------------------------------------------------------------
+# Maintenance
+# ----------------------------------------------------------------------------
+
+def ensure_partitions(
+    conn: Connection, table: str, *, months_ahead: int = 2, today: Optional[date] = None
+) -> List[str]:
+    """Create missing monthly partitions from this month to ``months_ahead``; return created names."""
+    if not _is_partitioned(conn, table):
+        return []
+    children = set(_partitions(conn, table))
+    default = f"{table}_default"
+    key = _partition_key(conn, table)
+    created = []
+    month = _month_start(today or _today())
+    for offset in range(months_ahead + 1):
+        start = _add_months(month, offset)
+        name = partition_name(table, start)
+        if name in children:
+            continue
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_add_months(start, 1).isoformat()}')"
+        if default in children and key and _default_has_rows(conn, default, key, start):
+            # Maintenance fell behind: creating the month directly would fail on the
+            # default's rows, so move them into the new partition while it is detached.
+            _create_from_default(conn, table, name, bounds, key, start)
+        else:
+            conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'))
+        created.append(name)
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{default}" PARTITION OF "{table}" DEFAULT'))
+    return created
+
+
+def _default_has_rows(conn: Connection, default: str, key: str, start: date) -> bool:
+    return conn.execute(
+        text(f'SELECT 1 FROM "{default}" WHERE "{key}" >= :start AND "{key}" < :end LIMIT 1'),
+        {"start": start, "end": _add_months(start, 1)},
+    ).first() is not None
+
+
+def _create_from_default(conn: Connection, table: str, name: str, bounds: str, key: str, start: date) -> None:
+    default = f"{table}_default"
+    window = {"start": start, "end": _add_months(start, 1)}
+    conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}'))
+    moved = conn.execute(
+        text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE "{key}" >= :start AND "{key}" < :end'),
+        window,
+    ).rowcount
+    conn.execute(text(f'DELETE FROM "{default}" WHERE "{key}" >= :start AND "{key}" < :end'), window)
+    conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.warning("Created partition %s late; moved %s rows out of %s", name, moved, default)
+
+
+def drop_expired_partitions(
+    conn: Connection,
+    table: str,
+    *,
+    retention_months: int,
+    today: Optional[date] = None,
+    dry_run: bool = False,
+) -> List[str]:
+    """Drop monthly partitions entirely older than ``retention_months``; return their names.
+
+    With a retention of 6 in October, partitions up to and including March
+    are dropped.  ``retention_months <= 0`` keeps everything.
+    """
+    if retention_months <= 0 or not _is_partitioned(conn, table):
+        return []
+    cutoff = _add_months(_month_start(today or _today()), -retention_months)
+    expired = [name for name, month in _monthly_partitions(conn, table) if month < cutoff]
+    if dry_run:
+        return expired
+    for name in expired:
+        cleanup = _DEPENDENT_CLEANUP.get(table)
+        if cleanup:
+            conn.execute(text(cleanup.format(partition=f'"{name}"')))
+        conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+        logger.info("Dropped expired partition %s", name)
+    return expired
+
+
+def maintain_partitions(
+    conn: Connection, *, today: Optional[date] = None, dry_run: bool = False
+) -> Dict[str, Dict[str, List[str]]]:
+    """Create upcoming and drop expired partitions for every table in ``PARTITIONED_TABLES``."""
+    settings = get_settings()
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for table, retention_setting in PARTITIONED_TABLES.items():
+        if not _is_partitioned(conn, table):
+            logger.debug("Skipping partition maintenance for %s: not a partitioned table", table)
+            continue
+        try:
+            # Savepoint per table: a failure rolls back this table only
+            with conn.begin_nested():
+                created = [] if dry_run else ensure_partitions(
+                    conn, table, months_ahead=settings.PARTITION_MONTHS_AHEAD, today=today
+                )
+                dropped = drop_expired_partitions(
+                    conn, table, retention_months=getattr(settings, retention_setting), today=today, dry_run=dry_run
+                )
+        except Exception as e:
+            logger.error("Partition maintenance for %s failed: %s", table, e)
+            report[table] = {"created": [], "dropped": [], "error": [str(e)]}
+            continue
+        report[table] = {"created": created, "dropped": dropped}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired history partitions.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report partitions that would be dropped")
+    args = parser.parse_args()
+
+    from app.core.database import sync_engine
+
+    with sync_engine.begin() as conn:
+        print(json.dumps(maintain_partitions(conn, dry_run=args.dry_run), indent=2))
+
+
+if __name__ == "__main__":
+    main()
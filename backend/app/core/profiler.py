@@ -0,0 +1,304 @@
+"""Opt-in sampling profiler for a single workflow execution.
+
+A profiled execution gets an :class:`ExecutionProfiler` which
+
+* samples the Python stacks of the threads taking part in the execution (the
+  event-loop thread plus whichever executor threads run its nodes) from a
+  background thread, and
+* records named wall-clock spans – build, compile, each node, serialization –
+  via :func:`profile_span`.
+
+The result is written as a `speedscope <https://www.speedscope.app>`_ file
+(one sampled and one evented profile per thread) to ``PROFILE_DIR/<user id>``
+and can be fetched by execution id by that user only.  Files older than
+``PROFILE_RETENTION_HOURS`` are pruned by :func:`prune_profiles` – on every
+save and by a periodic Celery task.  Note that the event-loop thread is shared, so its
+samples may include other requests served concurrently; the spans and the
+executor-thread samples are specific to the profiled execution.
+
+When no profiler is active :func:`profile_span` costs one context-variable
+lookup, so the spans can stay in the hot path.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "ExecutionProfiler",
+    "profile_span",
+    "current_profiler",
+    "get_profile_path",
+    "prune_profiles",
+]
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+_MAX_STACK_DEPTH = 256
+logger = logging.getLogger(__name__)
+
+_EXECUTION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_PROFILE_SUFFIX = ".speedscope.json"
+
+_current_profiler: ContextVar[Optional["ExecutionProfiler"]] = ContextVar("execution_profiler", default=None)
+
+
+def _profile_dir() -> str:
+    from app.core.config import get_settings  # local import to avoid cycles
+
+    return get_settings().PROFILE_DIR
+
+
+def _profile_path(execution_id: str, user_id: Optional[Any]) -> str:
+    from app.core.storage_paths import user_storage_path
+
+    return user_storage_path(_profile_dir(), user_id, f"{execution_id}{_PROFILE_SUFFIX}")
+
+
+def get_profile_path(execution_id: str, user_id: Optional[Any]) -> Optional[str]:
+    """Return the stored profile path for ``user_id``'s ``execution_id``, if it exists."""
+    if not _EXECUTION_ID_RE.match(execution_id):
+        return None
+    try:
+        path = _profile_path(execution_id, user_id)
+    except ValueError:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def prune_profiles(max_age_hours: Optional[float] = None) -> int:
+    """Delete stored profiles older than ``max_age_hours`` (default ``PROFILE_RETENTION_HOURS``).
+
+    Returns the number of files removed; ``0`` hours keeps everything.
+    """
+    if max_age_hours is None:
+        from app.core.config import get_settings
+
+        max_age_hours = get_settings().PROFILE_RETENTION_HOURS
+    root = _profile_dir()
+    if max_age_hours <= 0 or not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.endswith((_PROFILE_SUFFIX, f"{_PROFILE_SUFFIX}.tmp")):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # removed concurrently
+    return removed
+
+
+class ExecutionProfiler:
+    """Sample stacks and record spans for one execution."""
+
+    def __init__(self, execution_id: str, interval_ms: Optional[float] = None, *, user_id: Optional[Any] = None):
+        if not _EXECUTION_ID_RE.match(execution_id):
+            raise ValueError(f"Invalid execution id for profiling: {execution_id!r}")
+        if interval_ms is None:
+            from app.core.config import get_settings
+
+            interval_ms = get_settings().PROFILE_SAMPLE_INTERVAL_MS
+        self.execution_id = execution_id
+        self.user_id = user_id
+        self.interval = max(interval_ms, 0.1) / 1000
+        self._threads: Dict[int, int] = {}  # thread ident -> nesting depth
+        self._threads_lock = threading.Lock()
+        self._frames: List[Dict[str, Any]] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self._samples: Dict[int, List[Tuple[Tuple[int, ...], float]]] = {}
+        self._spans: List[Tuple[int, str, float, float]] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._ended = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> "ExecutionProfiler":
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.execution_id}", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        self._ended = time.perf_counter()
+
+    def activate(self) -> Token:
+        """Make this profiler current and sample the calling thread."""
+        self.attach_thread()
+        return _current_profiler.set(self)
+
+    def deactivate(self, token: Token) -> None:
+        self.detach_thread()
+        try:
+            _current_profiler.reset(token)
+        except ValueError:
+            _current_profiler.set(None)
+
+    def attach_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._threads_lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def detach_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._threads_lock:
+            depth = self._threads.get(ident, 0) - 1
+            if depth > 0:
+                self._threads[ident] = depth
+            else:
+                self._threads.pop(ident, None)
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+    def _frame_id(self, key: Tuple[str, str, int]) -> int:
+        index = self._frame_index.get(key)
+        if index is None:
+            index = len(self._frames)
+            self._frame_index[key] = index
+            name, filename, line = key
+            frame: Dict[str, Any] = {"name": name}
+            if filename:
+                frame["file"] = filename
+                frame["line"] = line
+            self._frames.append(frame)
+        return index
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight = now - last
+            last = now
+            with self._threads_lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack: List[int] = []
+                while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(self._frame_id((code.co_name, code.co_filename, code.co_firstlineno)))
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples.setdefault(ident, []).append((tuple(stack), weight))
+            del frames
+
+    def record_span(self, name: str, start: float, end: float) -> None:
+        self._spans.append((threading.get_ident(), name, start, end))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def _ms(self, t: float) -> float:
+        return round((t - self._started) * 1000, 4)
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        end_ms = self._ms(self._ended or time.perf_counter())
+        profiles: List[Dict[str, Any]] = []
+
+        for ident, samples in self._samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": f"samples (thread {ident})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": end_ms,
+                "samples": [list(stack) for stack, _ in samples],
+                "weights": [round(weight * 1000, 4) for _, weight in samples],
+            })
+
+        spans_by_thread: Dict[int, List[Tuple[str, float, float]]] = {}
+        for ident, name, start, end in self._spans:
+            spans_by_thread.setdefault(ident, []).append((name, start, end))
+        for ident, spans in spans_by_thread.items():
+            # (at, order, tiebreak, kind, frame): at equal timestamps closes sort
+            # before opens, outer spans open first and inner spans close first.
+            events: List[Tuple[float, int, float, str, int]] = []
+            for name, start, end in spans:
+                frame = self._frame_id((name, "", 0))
+                events.append((self._ms(start), 1, -end, "O", frame))
+                events.append((self._ms(end), 0, -start, "C", frame))
+            events.sort(key=lambda e: e[:3])
+            profiles.append({
+                "type": "evented",
+                "name": f"spans (thread {ident})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": end_ms,
+                "events": [{"type": kind, "frame": frame, "at": at} for at, _, _, kind, frame in events],
+            })
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"execution {self.execution_id}",
+            "exporter": "kai-fusion",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+
+    def finish(self) -> Optional[str]:
+        """Stop sampling and save; errors are logged, never raised."""
+        try:
+            self.stop()
+            return self.save()
+        except Exception as e:  # profiling must never fail the execution
+            logger.error("Failed to save profile for execution %s: %s", self.execution_id, e)
+            return None
+
+    def save(self, directory: Optional[str] = None) -> str:
+        """Write the speedscope file (into the user's profile directory by default) and return its path."""
+        if directory:
+            path = os.path.join(directory, f"{self.execution_id}{_PROFILE_SUFFIX}")
+        else:
+            path = _profile_path(self.execution_id, self.user_id)
+            prune_profiles()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self.to_speedscope(), fh)
+        os.replace(tmp_path, path)
+        return path
+
+
+def current_profiler() -> Optional[ExecutionProfiler]:
+    return _current_profiler.get()
+
+
+@contextmanager
+def profile_span(name: str) -> Iterator[None]:
+    """Record a named span (and sample this thread) if profiling is active."""
+    profiler = _current_profiler.get()
+    if profiler is None:
+        yield
+        return
+    profiler.attach_thread()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_span(name, start, time.perf_counter())
+        profiler.detach_thread()
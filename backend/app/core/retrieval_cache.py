@@ -0,0 +1,196 @@
+"""Process-wide cache of retrieval results and query embeddings.
+
+RAG flows ask the same questions again and again, and each execution used to
+embed the query and search the store anew.  Stores that mix in
+:class:`CachedRetrieval` (the shared FAISS, Qdrant and Chroma stores) answer
+``similarity_search`` through :class:`RetrievalCache` instead:
+
+* **Query embeddings** – an in-memory LRU of ``RETRIEVAL_QUERY_VECTOR_CACHE_SIZE``
+  vectors keyed by embedding model and query text, so a repeated question is
+  not embedded again (not even via the persistent embedding cache).
+* **Results** – an LRU of ``RETRIEVAL_CACHE_MAX_ENTRIES`` result lists keyed by
+  ``(collection, collection version, sha256 of the query vector, k, search
+  kwargs)``, with a ``RETRIEVAL_CACHE_TTL_SECONDS`` lifetime.
+* **Invalidation** – stores call :func:`invalidate_collection` on every write,
+  which bumps the collection's version so older entries are never served
+  again (they age out of the LRU).  Writes made by other processes – e.g. to
+  a Qdrant server – are only picked up once the TTL expires.
+
+Results are deep-copied in and out of the cache, so callers may modify the
+documents they get.  Hit/miss counters are in :meth:`RetrievalCache.stats`.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.embedding_cache import embedding_model_id
+
+__all__ = ["CachedRetrieval", "RetrievalCache", "get_retrieval_cache", "invalidate_collection"]
+
+_ResultKey = Tuple[str, int, str, int, str]  # (collection, version, vector hash, k, search kwargs)
+
+
+def _vector_hash(vector: Sequence[float]) -> str:
+    return hashlib.sha256(struct.pack(f"<{len(vector)}f", *vector)).hexdigest()
+
+
+class RetrievalCache:
+    """Thread-safe LRU + TTL cache of search results, plus an LRU of query vectors."""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0, max_vectors: int = 4096):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_vectors = max_vectors
+        self._results: "OrderedDict[_ResultKey, Tuple[float, List[Document]]]" = OrderedDict()
+        self._vectors: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.vector_hits = 0
+        self.vector_misses = 0
+
+    # ------------------------------------------------------------------
+    # Collection versions
+    # ------------------------------------------------------------------
+
+    def version(self, collection: str) -> int:
+        with self._lock:
+            return self._versions.get(collection, 0)
+
+    def invalidate(self, collection: str) -> None:
+        """Stop serving cached results of ``collection`` (call after every write)."""
+        with self._lock:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def query_vector(self, embeddings: Embeddings, query: str) -> List[float]:
+        """Embedding of ``query``, computed once per model and text."""
+        model_id = getattr(embeddings, "model_id", None) or embedding_model_id(embeddings)
+        key = (model_id, query)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+                self.vector_hits += 1
+                return vector
+            self.vector_misses += 1
+        vector = list(embeddings.embed_query(query))
+        if self.max_vectors > 0:
+            with self._lock:
+                self._vectors[key] = vector
+                while len(self._vectors) > self.max_vectors:
+                    self._vectors.popitem(last=False)
+        return vector
+
+    def search(
+        self,
+        collection: str,
+        vector: Sequence[float],
+        k: int,
+        search_kwargs: Dict[str, Any],
+        run: Callable[[], List[Document]],
+    ) -> List[Document]:
+        """Cached result of ``run()`` – the search for ``vector`` with ``k`` and ``search_kwargs``."""
+        options = json.dumps(search_kwargs, sort_keys=True, default=str)
+        with self._lock:
+            key = (collection, self._versions.get(collection, 0), _vector_hash(vector), k, options)
+            entry = self._results.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._results[key]
+            self.misses += 1
+
+        documents = run()
+        if self.max_entries > 0:
+            stored = copy.deepcopy(documents)
+            with self._lock:
+                # A write during the search moved the version on; the entry is then never read
+                self._results[key] = (time.monotonic() + self.ttl_seconds, stored)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return documents
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._results),
+                "query_vectors": len(self._vectors),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "query_vector_hits": self.vector_hits,
+                "query_vector_misses": self.vector_misses,
+            }
+
+
+_cache: Optional[RetrievalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the process-wide retrieval cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = RetrievalCache(
+                max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+                max_vectors=settings.RETRIEVAL_QUERY_VECTOR_CACHE_SIZE,
+            )
+    return _cache
+
+
+def invalidate_collection(collection: Optional[str]) -> None:
+    """Bump the version of ``collection`` so its cached results are dropped."""
+    if collection:
+        get_retrieval_cache().invalidate(collection)
+
+
+class CachedRetrieval:
+    """Vector store mixin answering ``similarity_search`` from :class:`RetrievalCache`.
+
+    ``cache_namespace`` names the collection (set by the owning store); stores
+    without one, or without embeddings, search uncached.
+    """
+
+    cache_namespace: Optional[str] = None
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        embeddings = getattr(self, "embeddings", None)
+        if not self.cache_namespace or embeddings is None or not get_settings().RETRIEVAL_CACHE_ENABLED:
+            return super().similarity_search(query, k=k, **kwargs)  # type: ignore[misc]
+        cache = get_retrieval_cache()
+        vector = cache.query_vector(embeddings, query)
+        return cache.search(
+            self.cache_namespace,
+            vector,
+            k,
+            kwargs,
+            lambda: self.similarity_search_by_vector(vector, k=k, **kwargs),  # type: ignore[attr-defined]
+        )
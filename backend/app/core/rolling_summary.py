@@ -0,0 +1,143 @@
+"""Incremental rolling summary memory with off-path summarization.
+
+``ConversationSummaryMemory`` re-summarizes the conversation with a blocking
+LLM call on every turn.  :class:`RollingSummaryMemory` instead:
+
+* keeps the newest whole turns within ``max_token_limit`` verbatim (see
+  :mod:`app.core.history_window`) and prepends a summary of everything older;
+* summarizes only when turns fall out of that window, and then only the
+  newly evicted messages, folded into the previous summary;
+* runs the summarization LLM call on a small background pool after
+  ``save_context`` – i.e. after the response has been produced – so it never
+  adds latency to the user's turn.  Until a summarization finishes, prompts
+  use the previous summary.
+
+Summaries are cached per session in the session memory store (next to the
+conversation itself), so they follow its backend, TTL and eviction, and a
+Redis-backed store shares them across processes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain.memory.prompt import SUMMARY_PROMPT
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+
+from app.core.config import get_settings
+from app.core.history_window import TokenWindowMemory, split_window
+from app.core.session_memory import get_session_memory_store
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RollingSummaryMemory", "summary_key"]
+
+# additional_kwargs field recording how many history messages the summary covers
+_COVERED = "summarized_messages"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_in_flight: Set[str] = set()
+_in_flight_lock = threading.Lock()
+
+
+def summary_key(history_key: str) -> str:
+    """Session memory store key holding the summary of ``history_key``."""
+    return f"{history_key}:summary"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().SUMMARY_MEMORY_WORKERS, thread_name_prefix="summary-memory"
+            )
+    return _executor
+
+
+def _load_summary(key: str) -> Tuple[str, int]:
+    """``(summary, covered message count)`` cached for ``key``."""
+    stored = get_session_memory_store().messages(summary_key(key))
+    if not stored:
+        return "", 0
+    message = stored[-1]
+    return str(message.content), int(message.additional_kwargs.get(_COVERED, 0))
+
+
+def _save_summary(key: str, summary: str, covered: int) -> None:
+    store = get_session_memory_store()
+    store.clear(summary_key(key))
+    store.append(summary_key(key), [SystemMessage(content=summary, additional_kwargs={_COVERED: covered})])
+
+
+def _summarize(llm: BaseLanguageModel, key: str, history: List[BaseMessage], target: int) -> None:
+    """Fold ``history[covered:target]`` into the cached summary (background thread)."""
+    try:
+        summary, covered = _load_summary(key)
+        if covered > len(history):
+            summary, covered = "", 0  # the history was cleared meanwhile
+        if target <= covered:
+            return
+        new_lines = get_buffer_string(history[covered:target])
+        response = llm.invoke(SUMMARY_PROMPT.format(summary=summary, new_lines=new_lines))
+        summary = response.content if hasattr(response, "content") else str(response)
+        _save_summary(key, summary, target)
+        logger.debug("Summary for %s now covers %d messages", key, target)
+    except Exception as e:
+        logger.warning("Summarizing %s failed: %s", key, e)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(key)
+
+
+class RollingSummaryMemory(TokenWindowMemory):
+    """Recent turns verbatim within ``max_token_limit`` plus a rolling summary of older ones.
+
+    ``history_key`` is the session memory store key of ``chat_memory``; the
+    summary is cached under :func:`summary_key` of it.
+    """
+
+    llm: BaseLanguageModel
+    history_key: str
+
+    def _split(self) -> Tuple[List[BaseMessage], List[BaseMessage], List[BaseMessage]]:
+        history = self.chat_memory.messages
+        evicted, kept = split_window(history, self.max_token_limit)
+        return history, evicted, kept
+
+    @property
+    def buffer_as_messages(self) -> List[BaseMessage]:
+        history, _, kept = self._split()
+        summary, covered = _load_summary(self.history_key)
+        if not summary or covered > len(history):
+            return kept
+        return [SystemMessage(content=f"Summary of the earlier conversation: {summary}")] + kept
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        super().save_context(inputs, outputs)
+        history, evicted, _ = self._split()
+        if not evicted:
+            return
+        _, covered = _load_summary(self.history_key)
+        if covered >= len(evicted) and covered <= len(history):
+            return
+        with _in_flight_lock:
+            # One summarization per conversation at a time; a later turn picks up the rest
+            if self.history_key in _in_flight:
+                return
+            _in_flight.add(self.history_key)
+        try:
+            _get_executor().submit(_summarize, self.llm, self.history_key, history, len(evicted))
+        except RuntimeError as e:  # executor shut down at interpreter exit
+            with _in_flight_lock:
+                _in_flight.discard(self.history_key)
+            logger.debug("Summary for %s not scheduled: %s", self.history_key, e)
+
+    def clear(self) -> None:
+        super().clear()
+        get_session_memory_store().clear(summary_key(self.history_key))
@@ -0,0 +1,62 @@
+"""Full-text search over workflow and template names/descriptions.
+
+Models opt in by exposing a generated ``search_vector`` tsvector column (GIN
+indexed) and a trigram GIN index on ``name`` – see
+:mod:`app.models.workflow`.  A query matches when either
+
+* every word of the search text is a prefix of a word in the document
+  (``to_tsquery('simple', 'foo:* & bar:*')``), or
+* the name is trigram-similar to the search text (typo tolerance, ``%``),
+
+and results are ranked by ``ts_rank_cd`` plus name similarity.  On databases
+other than Postgres, and for search text without any word characters, the
+helpers fall back to an unranked ``ILIKE`` match so SQLite-backed tools keep
+working and such searches still filter.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import ColumnElement, Select, func, literal_column, or_
+
+__all__ = ["build_prefix_tsquery", "apply_text_search"]
+
+SEARCH_CONFIG = "simple"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(text: str) -> Optional[str]:
+    """Turn free text into a prefix tsquery string (``None`` if it has no words).
+
+    Only ``\\w`` runs survive, so tsquery operators in user input cannot be injected.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def apply_text_search(
+    query: Select, model: Any, text: str, dialect_name: str = "postgresql"
+) -> Tuple[Select, Optional[ColumnElement]]:
+    """Filter ``query`` to rows matching ``text``; return it with a rank expression.
+
+    The rank is ``None`` when the search cannot be ranked (non-Postgres, or
+    text without words, which both use the ``ILIKE`` fallback); callers then
+    keep their default order.
+    """
+    tsquery_text = build_prefix_tsquery(text)
+    if dialect_name != "postgresql" or tsquery_text is None:
+        # Text without words ("C++", "--") still has to filter, just unranked
+        return query.filter(or_(model.name.icontains(text), model.description.icontains(text))), None
+
+    tsquery = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), tsquery_text)
+    matches = or_(
+        model.search_vector.op("@@")(tsquery),
+        model.name.op("%")(text),
+    )
+    rank = func.ts_rank_cd(model.search_vector, tsquery) + func.similarity(model.name, text)
+    return query.filter(matches), rank
@@ -1,4 +1,7 @@
-from typing import Optional
+import hashlib
+import hmac
+import secrets
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -55,4 +58,33 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+# API keys look like ``kai_<prefix>_<secret>``.  The prefix is stored in an
+# indexed column so a key is found with one lookup; the secret is verified
+# against an HMAC-SHA256 digest (keyed with API_KEY_HASH_SECRET).  API keys are
+# high-entropy random strings, so a slow password hash adds nothing but latency.
+API_KEY_SCHEME = "kai"
+API_KEY_PREFIX_LENGTH = 10
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """Return ``(full_key, prefix, secret)`` for a new API key."""
+    prefix = secrets.token_hex(API_KEY_PREFIX_LENGTH // 2)
+    secret = secrets.token_urlsafe(32)
+    return f"{API_KEY_SCHEME}_{prefix}_{secret}", prefix, secret
+
+def parse_api_key(api_key: str) -> Optional[Tuple[str, str]]:
+    """Split a presented key into ``(prefix, secret)``; ``None`` if malformed."""
+    parts = api_key.split("_", 2)
+    if len(parts) != 3 or parts[0] != API_KEY_SCHEME or len(parts[1]) != API_KEY_PREFIX_LENGTH or not parts[2]:
+        return None
+    return parts[1], parts[2]
+
+def hash_api_key(secret: str) -> str:
+    """Keyed digest of an API key secret."""
+    key = (settings.API_KEY_HASH_SECRET or settings.SECRET_KEY).encode()
+    return hmac.new(key, secret.encode(), hashlib.sha256).hexdigest()
+
+def verify_api_key(secret: str, hashed_key: str) -> bool:
+    """Constant-time comparison of a secret against its stored digest."""
+    return hmac.compare_digest(hash_api_key(secret), hashed_key)
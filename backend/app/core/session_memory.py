@@ -0,0 +1,286 @@
+"""Process-wide store for conversation memory, keyed by user and session.
+
+Memory nodes used to keep ``{session_id: memory}`` dicts on node instances.
+``GraphBuilder`` creates new instances on every build, so history was lost
+between requests, and a reused builder kept every session forever.  Nodes
+now wrap a :class:`SessionChatMessageHistory` around this store, and the
+store owns lifetime and size.
+
+Backends (``SESSION_MEMORY_BACKEND``):
+
+* ``memory`` – per-process LRU.  Sessions idle longer than
+  ``SESSION_TTL_MINUTES`` expire.  The least recently used sessions are
+  evicted beyond ``MAX_SESSIONS`` sessions or ``SESSION_MEMORY_MAX_MB`` of
+  message content.
+* ``redis``  – one list per session under ``REDIS_URL``, expiring after
+  ``SESSION_TTL_MINUTES`` without access, so conversations survive restarts
+  and are shared across pods.  Redis errors are logged; reads then return an
+  empty history rather than failing the execution.
+
+Further backends implement ``messages`` / ``append`` / ``clear`` / ``stats``
+and are registered in :data:`BACKENDS`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "SessionMemoryStore",
+    "SessionChatMessageHistory",
+    "get_session_memory_store",
+    "session_memory_key",
+]
+
+_REDIS_PREFIX = "kai:memory:"
+
+
+def session_memory_key(session_id: Optional[str], scope: Optional[str] = None, user_id: Optional[str] = None) -> str:
+    """Store key for one memory of a user's session; ``scope`` separates memories (usually the node id).
+
+    Session ids and node ids come from the client, so the authenticated
+    ``user_id`` is part of the key: sending another user's session id never
+    reaches their conversation.
+    """
+    key = f"{user_id or 'anonymous'}:{session_id or 'default_session'}"
+    return f"{key}:{scope}" if scope else key
+
+
+def _message_bytes(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    return len(content.encode("utf-8"))
+
+
+# ----------------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------------
+
+@dataclass
+class _Session:
+    messages: List[BaseMessage] = field(default_factory=list)
+    size: int = 0
+    touched: float = field(default_factory=time.monotonic)
+
+
+class _MemoryBackend:
+    name = "memory"
+
+    def __init__(self, ttl_seconds: float, max_sessions: int, max_bytes: int):
+        self._ttl = ttl_seconds
+        self._max_sessions = max_sessions
+        self._max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _live(self, key: str) -> Optional[_Session]:
+        # Caller holds the lock.
+        session = self._sessions.get(key)
+        if session is None:
+            return None
+        if time.monotonic() - session.touched > self._ttl:
+            self._drop(key)
+            return None
+        session.touched = time.monotonic()
+        self._sessions.move_to_end(key)
+        return session
+
+    def _drop(self, key: str) -> None:
+        session = self._sessions.pop(key, None)
+        if session is not None:
+            self._bytes -= session.size
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._sessions:
+            oldest_key, oldest = next(iter(self._sessions.items()))
+            # The byte budget never evicts the session just written (the newest)
+            over_limit = len(self._sessions) > self._max_sessions or (
+                self._max_bytes and self._bytes > self._max_bytes and len(self._sessions) > 1
+            )
+            if not over_limit and now - oldest.touched <= self._ttl:
+                break
+            self._drop(oldest_key)
+            self.evictions += 1
+
+    def messages(self, key: str) -> List[BaseMessage]:
+        with self._lock:
+            session = self._live(key)
+            return list(session.messages) if session else []
+
+    def append(self, key: str, messages: Sequence[BaseMessage]) -> None:
+        with self._lock:
+            session = self._live(key)
+            if session is None:
+                session = self._sessions[key] = _Session()
+            added = sum(_message_bytes(m) for m in messages)
+            session.messages.extend(messages)
+            session.size += added
+            self._bytes += added
+            self._evict()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "sessions": len(self._sessions),
+                "messages": sum(len(s.messages) for s in self._sessions.values()),
+                "content_bytes": self._bytes,
+                "max_sessions": self._max_sessions,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "evictions": self.evictions,
+            }
+
+
+class _RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(int(ttl_seconds), 1)
+
+    def messages(self, key: str) -> List[BaseMessage]:
+        redis_key = _REDIS_PREFIX + key
+        pipe = self._client.pipeline()
+        pipe.lrange(redis_key, 0, -1)
+        pipe.expire(redis_key, self._ttl)
+        raw, _ = pipe.execute()
+        return messages_from_dict([json.loads(item) for item in raw])
+
+    def append(self, key: str, messages: Sequence[BaseMessage]) -> None:
+        if not messages:
+            return
+        redis_key = _REDIS_PREFIX + key
+        pipe = self._client.pipeline()
+        pipe.rpush(redis_key, *[json.dumps(item) for item in messages_to_dict(list(messages))])
+        pipe.expire(redis_key, self._ttl)
+        pipe.execute()
+
+    def clear(self, key: str) -> None:
+        self._client.delete(_REDIS_PREFIX + key)
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = sum(1 for _ in self._client.scan_iter(match=_REDIS_PREFIX + "*", count=1000))
+        return {"backend": self.name, "sessions": sessions, "ttl_seconds": self._ttl}
+
+
+def _memory_backend(settings: Any) -> _MemoryBackend:
+    return _MemoryBackend(
+        ttl_seconds=settings.SESSION_TTL_MINUTES * 60,
+        max_sessions=settings.MAX_SESSIONS,
+        max_bytes=settings.SESSION_MEMORY_MAX_MB * 1024 * 1024,
+    )
+
+
+def _redis_backend(settings: Any) -> _RedisBackend:
+    return _RedisBackend(settings.REDIS_URL, settings.SESSION_TTL_MINUTES * 60)
+
+
+# SESSION_MEMORY_BACKEND value -> factory(settings)
+BACKENDS: Dict[str, Callable[[Any], Any]] = {
+    "memory": _memory_backend,
+    "redis": _redis_backend,
+}
+
+
+# ----------------------------------------------------------------------------
+# Store + LangChain adapter
+# ----------------------------------------------------------------------------
+
+class SessionMemoryStore:
+    """Session key -> message list, delegating to the configured backend."""
+
+    def __init__(self, backend: Any):
+        self._backend = backend
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
+
+    def messages(self, key: str) -> List[BaseMessage]:
+        try:
+            return self._backend.messages(key)
+        except Exception as e:
+            logger.warning("Session memory read failed for %s: %s", key, e)
+            return []
+
+    def append(self, key: str, messages: Sequence[BaseMessage]) -> None:
+        try:
+            self._backend.append(key, messages)
+        except Exception as e:
+            logger.warning("Session memory write failed for %s: %s", key, e)
+
+    def clear(self, key: str) -> None:
+        try:
+            self._backend.clear(key)
+        except Exception as e:
+            logger.warning("Session memory clear failed for %s: %s", key, e)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            return self._backend.stats()
+        except Exception as e:
+            return {"backend": self.backend_name, "error": str(e)}
+
+
+class SessionChatMessageHistory(BaseChatMessageHistory):
+    """LangChain chat history backed by :class:`SessionMemoryStore`."""
+
+    def __init__(self, key: str, store: Optional[SessionMemoryStore] = None):
+        self.key = key
+        self.store = store or get_session_memory_store()
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        return self.store.messages(self.key)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.append(self.key, messages)
+
+    def clear(self) -> None:
+        self.store.clear(self.key)
+
+
+_store: Optional[SessionMemoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_memory_store() -> SessionMemoryStore:
+    """Get the process-wide session memory store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            settings = get_settings()
+            mode = settings.SESSION_MEMORY_BACKEND
+            factory = BACKENDS.get(mode)
+            if factory is None:
+                logger.warning("Unknown SESSION_MEMORY_BACKEND '%s'; using in-process memory", mode)
+                factory = _memory_backend
+            try:
+                backend = factory(settings)
+            except ImportError as e:
+                logger.warning("Session memory backend '%s' unavailable (%s); using in-process memory", mode, e)
+                backend = _memory_backend(settings)
+            _store = SessionMemoryStore(backend)
+    return _store
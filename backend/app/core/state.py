@@ -10,6 +10,20 @@ def merge_node_outputs(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str,
         right = {}
     return {**left, **right}
 
+def merge_unique_list(left: List[Any], right: List[Any]) -> List[Any]:
+    """Reducer that unions lists from parallel nodes, preserving order"""
+    left = list(left or [])
+    seen = set(left)
+    for item in right or []:
+        if item not in seen:
+            left.append(item)
+            seen.add(item)
+    return left
+
+def keep_last_value(left: Any, right: Any) -> Any:
+    """Reducer that accepts several writes in one step; the last one wins"""
+    return right
+
 class FlowState(BaseModel):
     """
     State object for LangGraph workflows
@@ -22,16 +36,16 @@ class FlowState(BaseModel):
     memory: Dict[str, Any] = Field(default_factory=dict, description="General purpose memory storage")
     
     # Last output from any node
-    last_output: Optional[str] = Field(default=None, description="Output from the last executed node")
+    last_output: Annotated[Optional[str], keep_last_value] = Field(default=None, description="Output from the last executed node")
     
     # Current input being processed
     current_input: Optional[str] = Field(default=None, description="Current input being processed")
     
     # Node execution tracking
-    executed_nodes: List[str] = Field(default_factory=list, description="List of node IDs that have been executed")
+    executed_nodes: Annotated[List[str], merge_unique_list] = Field(default_factory=list, description="List of node IDs that have been executed")
     
     # Error tracking
-    errors: List[str] = Field(default_factory=list, description="List of errors encountered during execution")
+    errors: Annotated[List[str], merge_unique_list] = Field(default_factory=list, description="List of errors encountered during execution")
     
     # Session metadata
     session_id: Optional[str] = Field(default=None, description="Session identifier for persistence")
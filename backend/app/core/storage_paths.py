@@ -0,0 +1,55 @@
+"""Per-user locations for node-managed local storage.
+
+Vector store nodes take folder and index names from flow data, which the
+client controls.  They are never used as filesystem paths directly: they are
+resolved under a configured root, inside a directory of the authenticated
+user, so one user can neither read nor overwrite another user's files nor
+reach anything outside the root.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import uuid
+from typing import Any, Optional
+
+__all__ = ["safe_name", "user_storage_path"]
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+def safe_name(name: str, what: str = "name") -> str:
+    """``name`` if it is a plain file name (letters, digits, ``_ . -``), else ``ValueError``."""
+    if not isinstance(name, str) or not _NAME.match(name) or ".." in name:
+        raise ValueError(f"Invalid {what} '{name}': use letters, digits, '_', '.' and '-' only")
+    return name
+
+
+def _user_dir(user_id: Optional[Any]) -> str:
+    if user_id is None:
+        return "anonymous"
+    try:
+        return str(uuid.UUID(str(user_id)))
+    except ValueError:
+        return safe_name(str(user_id), "user id")
+
+
+def user_storage_path(root: str, user_id: Optional[Any], relative: Optional[str]) -> str:
+    """Absolute path of ``relative`` inside ``user_id``'s directory under ``root``.
+
+    Absolute paths and ``..`` components are rejected; the result is checked
+    to stay inside the user's directory after resolving symlinks.
+    """
+    relative = (relative or "").strip()
+    if os.path.isabs(relative) or os.path.splitdrive(relative)[0]:
+        raise ValueError(f"Storage path '{relative}' must be relative to the storage root")
+    parts = [part for part in re.split(r"[\\/]+", relative) if part not in ("", ".")]
+    if ".." in parts:
+        raise ValueError(f"Storage path '{relative}' must not contain '..'")
+
+    user_root = os.path.realpath(os.path.join(os.path.abspath(root), _user_dir(user_id)))
+    path = os.path.realpath(os.path.join(user_root, *parts))
+    if os.path.commonpath([user_root, path]) != user_root:
+        raise ValueError(f"Storage path '{relative}' leaves the storage root")
+    return path
@@ -0,0 +1,327 @@
+"""Process-wide Qdrant and Chroma clients and collection handles.
+
+``QdrantVectorStoreNode`` used to call ``Qdrant.from_texts([""])`` for a
+local ``path`` on every execution – opening the on-disk database, embedding
+a placeholder text and inserting it – and ``ChromaRetrieverNode`` built a new
+``Chroma`` client per run.  :class:`VectorClientStore` instead keeps:
+
+* one client per location – an embedded Qdrant ``path`` (which only one
+  client per process may open), a Qdrant server ``url`` with its API key, or
+  a Chroma ``persist_directory``;
+* one store per ``(location, collection)``, created on first use; a missing
+  Qdrant collection is created with the embedding dimension instead of being
+  seeded with a placeholder point.
+
+Local paths come from flow data, so they are resolved inside the user's
+directory under ``QDRANT_LOCAL_ROOT_DIR`` / ``CHROMA_ROOT_DIR`` (see
+:mod:`app.core.storage_paths`); users never share or reach each other's
+local databases.  Server clients are keyed by URL and a hash of the API key,
+so a flow never runs with another flow's key.
+
+Executions get a shallow copy of the shared store bound to their own
+embeddings and search defaults, so the client and collection handle are
+reused while per-execution settings never leak between flows.
+
+Both stores upsert in batches of ``VECTOR_STORE_UPSERT_BATCH`` and accept a
+metadata ``filter`` dict in searches and in ``search_kwargs`` of
+``as_retriever``.  ``similarity_search`` goes through
+:mod:`app.core.retrieval_cache`; writes through these stores invalidate the
+collection's cached results.
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import hashlib
+import logging
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_community.vectorstores import Chroma, Qdrant
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.retrieval_cache import CachedRetrieval, invalidate_collection
+from app.core.storage_paths import user_storage_path
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ManagedChroma", "ManagedQdrant", "VectorClientStore", "chroma_where", "get_vector_client_store"]
+
+_Location = Tuple[str, str, str]  # (kind, path or url, API key hash)
+
+
+def chroma_where(filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Chroma ``where`` clause for a flat metadata filter.
+
+    Chroma rejects ``{"a": 1, "b": 2}``; several plain equality keys are
+    combined with ``$and``.  Filters already using operators pass through.
+    """
+    if not filter or len(filter) == 1 or any(key.startswith("$") for key in filter):
+        return filter or None
+    return {"$and": [{key: value} for key, value in filter.items()]}
+
+
+def _batches(items: List[Any], size: int) -> Iterable[Tuple[int, int]]:
+    for start in range(0, len(items), max(1, size)):
+        yield start, min(start + size, len(items))
+
+
+# ----------------------------------------------------------------------------
+# Stores
+# ----------------------------------------------------------------------------
+
+class _Defaults:
+    """Per-execution search defaults merged into ``as_retriever``."""
+
+    search_defaults: Dict[str, Any] = {}
+
+    def as_retriever(self, **kwargs: Any):
+        search_kwargs = {**self.search_defaults, **kwargs.pop("search_kwargs", {})}
+        return super().as_retriever(search_kwargs=search_kwargs, **kwargs)  # type: ignore[misc]
+
+
+class ManagedQdrant(CachedRetrieval, _Defaults, Qdrant):
+    """``Qdrant`` whose upserts are batched by ``VECTOR_STORE_UPSERT_BATCH``."""
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        batch_size = batch_size or get_settings().VECTOR_STORE_UPSERT_BATCH
+        try:
+            return super().add_texts(texts, metadatas=metadatas, ids=ids, batch_size=batch_size, **kwargs)
+        finally:
+            invalidate_collection(self.cache_namespace)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        try:
+            return super().delete(ids=ids, **kwargs)
+        finally:
+            invalidate_collection(self.cache_namespace)
+
+
+class ManagedChroma(CachedRetrieval, _Defaults, Chroma):
+    """``Chroma`` that upserts in batches and accepts flat metadata filters."""
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        added: List[str] = []
+        try:
+            # One upsert per batch keeps requests under Chroma's max batch size
+            for start, end in _batches(texts, get_settings().VECTOR_STORE_UPSERT_BATCH):
+                added.extend(
+                    super().add_texts(
+                        texts[start:end],
+                        metadatas=metadatas[start:end] if metadatas else None,
+                        ids=ids[start:end] if ids else None,
+                        **kwargs,
+                    )
+                )
+        finally:
+            invalidate_collection(self.cache_namespace)
+        return added
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> None:
+        try:
+            super().delete(ids=ids, **kwargs)
+        finally:
+            invalidate_collection(self.cache_namespace)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        return super().similarity_search_with_score(query, k=k, filter=chroma_where(filter), **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        return super().similarity_search_by_vector(embedding, k=k, filter=chroma_where(filter), **kwargs)
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        return super().max_marginal_relevance_search_by_vector(
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=chroma_where(filter), **kwargs
+        )
+
+
+def _bind(store: Any, embeddings: Embeddings, search_defaults: Optional[Dict[str, Any]]) -> Any:
+    """Per-execution view of a shared store: same client and collection, own embeddings and defaults."""
+    view = copy.copy(store)
+    if isinstance(view, Chroma):
+        view._embedding_function = embeddings
+    else:
+        view.embeddings = embeddings
+    view.search_defaults = {key: value for key, value in (search_defaults or {}).items() if value not in (None, {}, "")}
+    return view
+
+
+# ----------------------------------------------------------------------------
+# Client store
+# ----------------------------------------------------------------------------
+
+class VectorClientStore:
+    """Shared clients per location and stores per ``(location, collection)``."""
+
+    def __init__(self):
+        self._clients: Dict[_Location, Any] = {}
+        self._stores: Dict[Tuple[_Location, str], Any] = {}
+        self._opening: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_open(self, cache: Dict[Any, Any], key: Any, open_: Callable[[], Any]) -> Any:
+        """``cache[key]``, opened once by ``open_`` on first use.
+
+        Opening connects to user-supplied locations, so it runs under a lock
+        for ``key`` only; other clients and collections stay available.
+        """
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                return value
+            opening = self._opening.setdefault((id(cache), key), threading.Lock())
+        with opening:
+            with self._lock:
+                value = cache.get(key)
+            if value is None:
+                value = open_()
+                with self._lock:
+                    cache[key] = value
+                    self._opening.pop((id(cache), key), None)
+        return value
+
+    def _client(self, location: _Location, factory: Callable[[], Any]) -> Any:
+        def open_client() -> Any:
+            client = factory()
+            logger.info("Opened %s client for %s", location[0], location[1])
+            return client
+
+        return self._get_or_open(self._clients, location, open_client)
+
+    def qdrant(
+        self,
+        embeddings: Embeddings,
+        collection_name: str,
+        *,
+        path: Optional[str] = None,
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        user_id: Optional[str] = None,
+        search_defaults: Optional[Dict[str, Any]] = None,
+    ) -> ManagedQdrant:
+        """Qdrant store for ``collection_name`` in ``user_id``'s embedded database at ``path`` or on the server at ``url``."""
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        if path:
+            directory = user_storage_path(get_settings().QDRANT_LOCAL_ROOT_DIR, user_id, path)
+            location: _Location = ("qdrant", directory, "")
+            factory = partial(QdrantClient, path=directory)
+        else:
+            url = url or "http://localhost:6333"
+            key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest() if api_key else ""
+            location = ("qdrant", url, key_hash)
+            factory = partial(QdrantClient, url=url, api_key=api_key)
+
+        def open_store() -> ManagedQdrant:
+            client = self._client(location, factory)
+            if not _qdrant_collection_exists(client, collection_name):
+                dimension = len(embeddings.embed_query("dimension probe"))
+                client.create_collection(
+                    collection_name,
+                    vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE),
+                )
+                logger.info("Created Qdrant collection %s (%d dimensions)", collection_name, dimension)
+            store = ManagedQdrant(client=client, collection_name=collection_name, embeddings=embeddings)
+            # The key hash keeps results fetched with one API key from being served to another
+            store.cache_namespace = f"qdrant:{location[1]}:{location[2][:16]}/{collection_name}"
+            return store
+
+        store = self._get_or_open(self._stores, (location, collection_name), open_store)
+        return _bind(store, embeddings, search_defaults)
+
+    def chroma(
+        self,
+        embeddings: Embeddings,
+        collection_name: str,
+        *,
+        persist_directory: Optional[str] = None,
+        user_id: Optional[str] = None,
+        search_defaults: Optional[Dict[str, Any]] = None,
+    ) -> ManagedChroma:
+        """Chroma store for ``collection_name`` in ``persist_directory`` of ``user_id``'s Chroma directory.
+
+        An empty ``persist_directory`` is the user's Chroma directory itself.
+        (Chroma's in-memory clients share one database per process, so they
+        cannot keep users apart.)
+        """
+        import chromadb
+
+        directory = user_storage_path(get_settings().CHROMA_ROOT_DIR, user_id, persist_directory)
+        location: _Location = ("chroma", directory, "")
+
+        def open_store() -> ManagedChroma:
+            client = self._client(location, partial(chromadb.PersistentClient, path=directory))
+            store = ManagedChroma(client=client, collection_name=collection_name, embedding_function=embeddings)
+            store.cache_namespace = f"chroma:{directory}/{collection_name}"
+            return store
+
+        store = self._get_or_open(self._stores, (location, collection_name), open_store)
+        return _bind(store, embeddings, search_defaults)
+
+    def close(self) -> None:
+        """Close the clients that hold files or connections open."""
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+            self._stores.clear()
+        for location, client in clients:
+            close = getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.debug("Closing %s client for %s failed: %s", location[0], location[1], e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": [f"{kind}:{where}" for kind, where, _ in self._clients],
+                "collections": [f"{kind}:{where}/{name}" for (kind, where, _), name in self._stores],
+            }
+
+
+def _qdrant_collection_exists(client: Any, collection_name: str) -> bool:
+    if hasattr(client, "collection_exists"):
+        return client.collection_exists(collection_name)
+    return any(c.name == collection_name for c in client.get_collections().collections)
+
+
+_store: Optional[VectorClientStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_client_store() -> VectorClientStore:
+    """Get the process-wide vector client store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VectorClientStore()
+            atexit.register(_store.close)
+    return _store
@@ -9,14 +9,17 @@ import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, status, Body, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi import APIRouter
 
 # Core imports
-from app.core.config import get_settings
+from app.core.config import get_settings, setup_logging
 from app.core.node_registry import node_registry
 from app.core.engine_v2 import get_engine
-from app.core.database import create_tables, get_db_session
+from app.core.database import create_tables, dispose_engines, get_db_session
+from app.core.metrics import CONTENT_TYPE_LATEST, render_metrics
+from app.core.chat_history import stop_chat_history_writer
+from app.core.execution_history import get_history_writer
 
 # API routers imports
 from app.api.workflows import router as workflows_router
@@ -27,6 +30,7 @@ from app.api.users import router as users_router
 from app.api.auth import router as auth_router
 from app.api.api_key import router as api_key_router
 
+setup_logging(get_settings())
 logger = logging.getLogger(__name__)
 
 
@@ -66,6 +70,9 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("🔄 Shutting down KAI Fusion Backend...")
+    get_history_writer().stop()  # flush queued execution records before the engines close
+    stop_chat_history_writer()  # and queued chat messages
+    await dispose_engines()
     logger.info("✅ Backend shutdown complete")
 
 
@@ -87,6 +94,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Execution-Id"],
 )
 
 # Add exception handlers (only if database is available)
@@ -203,6 +211,18 @@ async def get_info():
             content={"error": "Failed to retrieve application info"}
         )
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-node latency, errors, output size and token usage."""
+    payload = render_metrics()
+    if payload is None:
+        return Response(
+            content="prometheus_client is not installed\n",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            media_type="text/plain",
+        )
+    return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
+
 # Legacy alias for info endpoint with additional fields to maintain backward compatibility
 @app.get("/api/v1/info", tags=["Info"])
 async def get_info_v1():
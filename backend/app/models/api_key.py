@@ -9,6 +9,8 @@ class APIKey(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     key_name = Column(String(255), nullable=False)
+    # Lookup id embedded in the key (``kai_<key_prefix>_<secret>``); NULL for legacy bcrypt keys.
+    key_prefix = Column(String(10), nullable=True, unique=True, index=True)
     hashed_key = Column(String(255), nullable=False, unique=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
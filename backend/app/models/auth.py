@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, UUID, Text, Integer, TIMESTAMP, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 import uuid
 from .base import Base
 
@@ -29,4 +30,8 @@ class LoginActivity(Base):
     username = Column(String, nullable=False)
     activity_code = Column(Integer, nullable=False)
     message = Column(String, nullable=False)
-    attempted_at = Column(TIMESTAMP(timezone=True), default=func.now()) 
\ No newline at end of file
+    # Partition key (monthly ranges, see app.core.partitioning), hence part of the primary key
+    attempted_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False,
+                          default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (attempted_at)"} 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, Text, TIMESTAMP
+from sqlalchemy import Column, ForeignKey, String, UUID, Text, TIMESTAMP, Index
 from sqlalchemy.sql import func
 import uuid
 from .base import Base
@@ -9,6 +9,13 @@ class ChatMessage(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     role = Column(String(255), nullable=False)
     chatflow_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    session_id = Column(String(255))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
     content = Column(Text, nullable=False)
     source_documents = Column(String(255))
-    created_at = Column(TIMESTAMP(timezone=True), default=func.now()) 
\ No newline at end of file
+    created_at = Column(TIMESTAMP(timezone=True), default=func.now())
+
+    # Memory nodes load the newest messages of one conversation (see app.core.chat_history)
+    __table_args__ = (
+        Index("ix_chat_message_user_chatflow_session_created", "user_id", "chatflow_id", "session_id", created_at.desc()),
+    )
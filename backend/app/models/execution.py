@@ -1,36 +1,67 @@
-from sqlalchemy import Column, String, UUID, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, String, UUID, Text, TIMESTAMP, ForeignKey, Integer, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
 import uuid
 from .base import Base
 
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class WorkflowExecution(Base):
     __tablename__ = "workflow_executions"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    workflow_id = Column(UUID(as_uuid=True), ForeignKey('workflows.id', ondelete='CASCADE'), nullable=False, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    # NULL for ad-hoc runs of unsaved flows (POST /workflows/execute without workflow_id)
+    workflow_id = Column(UUID(as_uuid=True), ForeignKey('workflows.id', ondelete='CASCADE'), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     status = Column(String(50), nullable=False, default='pending')
+    source = Column(String(20), default='api')  # where the run came from: "api" or "celery"
     inputs = Column(JSONB)
     outputs = Column(JSONB)
     error_message = Column(Text)
+    node_count = Column(Integer)
+    duration_ms = Column(Integer)
     started_at = Column(TIMESTAMP(timezone=True))
     completed_at = Column(TIMESTAMP(timezone=True))
-    created_at = Column(TIMESTAMP(timezone=True), default=func.now())
+    # Partition key (monthly ranges, see app.core.partitioning), hence part of the primary key
+    created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False, default=_utcnow)
     
     # Relationships
     workflow = relationship("Workflow", back_populates="executions")
     user = relationship("User", back_populates="executions")
-    checkpoint = relationship("ExecutionCheckpoint", back_populates="execution", uselist=False)
+    checkpoint = relationship(
+        "ExecutionCheckpoint",
+        primaryjoin="WorkflowExecution.id == foreign(ExecutionCheckpoint.execution_id)",
+        back_populates="execution",
+        uselist=False,
+    )
+
+    # Listings filter by user (+ status) or workflow and page newest-first; the
+    # composite indexes also serve plain user_id / workflow_id lookups.
+    __table_args__ = (
+        Index("ix_workflow_executions_user_created", "user_id", created_at.desc(), id.desc()),
+        Index("ix_workflow_executions_user_status_created", "user_id", "status", created_at.desc()),
+        Index("ix_workflow_executions_workflow_created", "workflow_id", created_at.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
 class ExecutionCheckpoint(Base):
     __tablename__ = "execution_checkpoints"
     
-    execution_id = Column(UUID(as_uuid=True), ForeignKey('workflow_executions.id', ondelete='CASCADE'), primary_key=True)
+    # No FK: the partitioned parent's key is (id, created_at). Checkpoints are
+    # deleted with their execution and when its partition is dropped.
+    execution_id = Column(UUID(as_uuid=True), primary_key=True)
     checkpoint_data = Column(JSONB, nullable=False)
     parent_checkpoint_id = Column(UUID(as_uuid=True))
     updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationship
-    execution = relationship("WorkflowExecution", back_populates="checkpoint") 
\ No newline at end of file
+    execution = relationship(
+        "WorkflowExecution",
+        primaryjoin="WorkflowExecution.id == foreign(ExecutionCheckpoint.execution_id)",
+        back_populates="checkpoint",
+    ) 
\ No newline at end of file
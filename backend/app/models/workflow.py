@@ -1,10 +1,17 @@
-from sqlalchemy import Column, String, UUID, Text, Boolean, Integer, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Computed, String, UUID, Text, Boolean, Integer, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 import uuid
 from .base import Base
 
+# Weighted full-text document (name ranks above description), maintained by Postgres.
+# The 'simple' config skips stemming so prefix queries behave the same in any language.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
 class Workflow(Base):
     __tablename__ = "workflows"
     
@@ -17,11 +24,21 @@ class Workflow(Base):
     flow_data = Column(JSONB, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
     
     # Relationship
     user = relationship("User", back_populates="workflows")
     executions = relationship("WorkflowExecution", back_populates="workflow")
 
+    # Keyset pagination walks (coalesce(updated_at, created_at), id) newest-first within a
+    # user / the public set; rows without updated_at sort by their creation time
+    __table_args__ = (
+        Index("ix_workflows_user_updated_id", "user_id", func.coalesce(updated_at, created_at).desc(), id.desc()),
+        Index("ix_workflows_public_updated_id", "is_public", func.coalesce(updated_at, created_at).desc(), id.desc()),
+        Index("ix_workflows_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_workflows_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 class WorkflowTemplate(Base):
     __tablename__ = "workflow_templates"
     
@@ -30,4 +47,10 @@ class WorkflowTemplate(Base):
     description = Column(Text)
     category = Column(String(100), default='General')
     flow_data = Column(JSONB, nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=func.now()) 
\ No newline at end of file
+    created_at = Column(TIMESTAMP(timezone=True), default=func.now()) 
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    __table_args__ = (
+        Index("ix_workflow_templates_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_workflow_templates_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
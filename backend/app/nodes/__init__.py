@@ -23,6 +23,9 @@ from .document_loaders.pdf_loader import PDFLoaderNode
 from .document_loaders.text_loader import TextDataLoaderNode, TextLoaderNode
 from .document_loaders.web_loader import WebLoaderNode, SitemapLoaderNode, YoutubeLoaderNode, GitHubLoaderNode
 
+# Ingestion
+from .ingestion.document_ingestion import DocumentIngestionNode
+
 # Embeddings
 from .embeddings.openai_embeddings import OpenAIEmbeddingsNode
 from .embeddings.huggingface_embeddings import HuggingFaceEmbeddingsNode
@@ -98,6 +101,9 @@ __all__ = [
     # Document Loaders
     "PDFLoaderNode", "TextDataLoaderNode", "TextLoaderNode", "WebLoaderNode", "SitemapLoaderNode", "YoutubeLoaderNode", "GitHubLoaderNode",
     
+    # Ingestion
+    "DocumentIngestionNode",
+    
     # Embeddings
     "OpenAIEmbeddingsNode", "HuggingFaceEmbeddingsNode", "CohereEmbeddingsNode",
     
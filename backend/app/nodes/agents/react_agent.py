@@ -8,6 +8,12 @@ from langchain_core.memory import BaseMemory
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.memory import ConversationBufferMemory
 
+from app.core.history_window import TokenWindowMemory
+from app.core.logging_config import get_execution_logger, is_execution_sampled
+from app.core.session_memory import SessionChatMessageHistory, session_memory_key
+
+logger = get_execution_logger(__name__)
+
 class ReactAgentNode(ProcessorNode):
     def __init__(self):
         super().__init__()
@@ -81,6 +87,13 @@ class ReactAgentNode(ProcessorNode):
                     default=True,
                     required=False
                 ),
+                NodeInput(
+                    name="max_history_tokens",
+                    type="int",
+                    description="Token budget for chat history in the prompt (newest turns first); 0 sends the whole history",
+                    default=2000,
+                    required=False
+                ),
             ],
             "outputs": [
                 NodeOutput(
@@ -95,13 +108,10 @@ class ReactAgentNode(ProcessorNode):
                 )
             ]
         }
-        # Persistent memory across calls for the same session
-        self._session_memories: Dict[str, BaseMemory] = {}
 
     def execute(self, inputs: Dict[str, Any], connected_nodes: Dict[str, Runnable]) -> Runnable:
         """Enhanced execute with proper memory management and orchestration"""
-        print(f"🤖 ReAct Agent executing with inputs: {list(inputs.keys())}")
-        print(f"🔗 Connected nodes: {list(connected_nodes.keys())}")
+        logger.debug("ReAct Agent executing with inputs: %s, connected nodes: %s", list(inputs), list(connected_nodes))
         
         # Get connected components (with backward compatibility)
         llm_node = connected_nodes.get("llm") or connected_nodes.get("chat_model")
@@ -116,6 +126,7 @@ class ReactAgentNode(ProcessorNode):
             "If you have access to memory, use it to maintain conversation context. "
             "Always provide helpful and informative responses.")
         enable_memory = self.user_data.get("enable_memory", True)
+        max_history_tokens = int(self.user_data.get("max_history_tokens", 2000) or 0)
         
         # Validate required components
         if not llm_node:
@@ -124,8 +135,6 @@ class ReactAgentNode(ProcessorNode):
         if not isinstance(llm_node, BaseLanguageModel):
             raise TypeError("LLM connection must be a BaseLanguageModel")
 
-        print(f"✅ LLM validated: {type(llm_node).__name__}")
-
         # Handle tools - can be empty list
         tools_list = []
         if tools_node:
@@ -134,50 +143,30 @@ class ReactAgentNode(ProcessorNode):
             elif isinstance(tools_node, (list, tuple)):
                 tools_list = list(tools_node)
             else:
-                print(f"⚠️  Tools type not recognized: {type(tools_node)}, ignoring")
+                logger.warning("Tools type not recognized: %s, ignoring", type(tools_node))
         
-        print(f"🔧 Tools available: {len(tools_list)}")
-        for tool in tools_list:
-            print(f"  - {tool.name}: {tool.description}")
+        logger.debug("Tools available: %s", [tool.name for tool in tools_list])
 
         # Handle memory with session persistence
         memory = None
         session_id = getattr(self, 'session_id', 'default_session')
-        print(f"🔍 ReactAgent session_id: {session_id}")
-        print(f"🔍 Enable memory: {enable_memory}")
-        print(f"🔍 Memory node: {memory_node}")
-        print(f"🔍 Memory node type: {type(memory_node)}")
-        
         if enable_memory:
             if memory_node and isinstance(memory_node, BaseMemory):
                 # Use connected memory - but ensure it's session-aware
                 memory = memory_node
-                print(f"💭 Using connected memory: {type(memory).__name__}")
-                
-                # Debug memory content
-                if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
-                    print(f"💭 Connected memory has {len(memory.chat_memory.messages)} messages")
-                    for i, msg in enumerate(memory.chat_memory.messages):
-                        print(f"  {i}: {getattr(msg, 'type', 'unknown')}: {getattr(msg, 'content', str(msg))[:100]}")
-                
+                logger.debug("Session %s using connected memory: %s", session_id, type(memory).__name__)
+
             else:
-                # Use persistent session memory
-                if session_id not in self._session_memories:
-                    self._session_memories[session_id] = ConversationBufferMemory(
-                        memory_key="chat_history",
-                        return_messages=True,
-                        input_key="input",
-                        output_key="output"
-                    )
-                    print(f"💭 Created new session memory for: {session_id}")
-                memory = self._session_memories[session_id]
-                print(f"💭 Using persistent session memory: {session_id}")
-                
-                # Debug session memory content
-                if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
-                    print(f"💭 Session memory has {len(memory.chat_memory.messages)} messages")
-                    for i, msg in enumerate(memory.chat_memory.messages):
-                        print(f"  {i}: {getattr(msg, 'type', 'unknown')}: {getattr(msg, 'content', str(msg))[:100]}")
+                # Use persistent session memory from the shared store; only the
+                # newest turns within the token budget go into prompts
+                memory = TokenWindowMemory(
+                    chat_memory=SessionChatMessageHistory(session_memory_key(session_id, self.node_id, self.user_id)),
+                    max_token_limit=max_history_tokens,
+                    memory_key="chat_history",
+                    return_messages=True,
+                    input_key="input",
+                    output_key="output"
+                )
 
         # Create enhanced prompt template
         if tools_list:
@@ -213,71 +202,47 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
 
         try:
             prompt = PromptTemplate.from_template(prompt_template)
-            print(f"📝 Prompt template created")
 
             if tools_list:
                 # Create ReAct agent with tools
                 agent = create_react_agent(llm_node, tools_list, prompt)
-                print(f"🤖 ReAct agent created with {len(tools_list)} tools")
+                logger.debug("ReAct agent created with %d tools", len(tools_list))
             else:
                 # Create simple conversational agent without tools
                 def simple_agent_func(agent_input):
-                    print(f"🔧 simple_agent_func called with: {agent_input}")
-                    
                     # Extract the actual user input
                     current_input = agent_input.get("input", "") if isinstance(agent_input, dict) else str(agent_input)
-                    print(f"🔧 Extracted current_input: '{current_input}'")
                     
-                    # Get chat history from memory safely
+                    # Get chat history from memory; load_memory_variables applies
+                    # the memory's own window (token budget, last k, summary)
                     chat_history = ""
                     if memory:
-                        print(f"🔧 Getting chat history from memory type: {type(memory)}")
-                        
-                        # Try different memory access methods
-                        if hasattr(memory, 'buffer') and memory.buffer:
-                            chat_history = memory.buffer
-                            print(f"🔧 Got buffer: {chat_history[:100]}...")
-                        elif hasattr(memory, 'chat_memory'):
-                            chat_memory = memory.chat_memory
-                            if chat_memory and hasattr(chat_memory, 'messages'):
-                                messages = chat_memory.messages
-                                print(f"🔧 Found {len(messages)} messages in chat_memory")
-                                
-                                # Format messages for prompt
-                                formatted_messages = []
-                                for msg in messages:
-                                    msg_type = getattr(msg, 'type', 'unknown')
-                                    msg_content = getattr(msg, 'content', str(msg))
-                                    if msg_type == 'human':
-                                        formatted_messages.append(f"User: {msg_content}")
-                                    elif msg_type == 'ai':
-                                        formatted_messages.append(f"Assistant: {msg_content}")
-                                    else:
-                                        formatted_messages.append(f"{msg_type}: {msg_content}")
-                                
-                                chat_history = "\n".join(formatted_messages)
-                                print(f"🔧 Formatted chat history: {chat_history}")
+                        history = memory.load_memory_variables({"input": current_input})
+                        history = history.get(getattr(memory, "memory_key", "chat_history"), "")
+                        if isinstance(history, list):
+                            formatted_messages = []
+                            for msg in history:
+                                msg_type = getattr(msg, 'type', 'unknown')
+                                msg_content = getattr(msg, 'content', str(msg))
+                                if msg_type == 'human':
+                                    formatted_messages.append(f"User: {msg_content}")
+                                elif msg_type == 'ai':
+                                    formatted_messages.append(f"Assistant: {msg_content}")
+                                else:
+                                    formatted_messages.append(f"{msg_type}: {msg_content}")
+                            chat_history = "\n".join(formatted_messages)
                         else:
-                            print(f"🔧 Memory has no accessible history format")
-                    
-                    print(f"🔧 Final chat history length: {len(chat_history)}")
-                    if chat_history:
-                        print(f"🔧 Chat history preview: {chat_history[:200]}...")
-                    
+                            chat_history = str(history or "")
+
                     formatted_prompt = prompt.format(
                         chat_history=chat_history,
                         input=current_input
                     )
-                    print(f"🔧 Formatted prompt: '{formatted_prompt[:200]}...'")
-                    
                     response = llm_node.invoke(formatted_prompt)
                     simple_output = response.content if hasattr(response, 'content') else str(response)
-                    
-                    print(f"🔧 LLM response: '{simple_output[:100]}...'")
-                    
+
                     # Update memory if available
                     if memory:
-                        print(f"🔧 Saving to memory: input='{current_input}', output='{simple_output[:50]}...'")
                         memory.save_context(
                             {"input": current_input}, 
                             {"output": simple_output}
@@ -288,20 +253,20 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
                     }
                 
                 agent = RunnableLambda(simple_agent_func)
-                print(f"🤖 Simple conversational agent created (no tools)")
+                logger.debug("Simple conversational agent created (no tools)")
 
             # Create executor
             if tools_list:
                 executor = AgentExecutor(
                     agent=agent,
                     tools=tools_list,
-                    verbose=self.user_data.get("verbose", True),
+                    verbose=self.user_data.get("verbose", is_execution_sampled()),
                     handle_parsing_errors=True,
                     memory=memory,
                     max_iterations=max_iterations,
                     return_intermediate_steps=False,
                 )
-                print(f"⚡ Agent executor created with memory: {memory is not None}")
+                logger.debug("Agent executor created with memory: %s", memory is not None)
             else:
                 executor = agent
 
@@ -309,17 +274,12 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
             def conversation_wrapper(_input) -> Dict[str, Any]:
                 """Wrapper that handles conversation flow and memory management"""
                 try:
-                    print(f"💬 conversation_wrapper called with input type: {type(_input)}")
-                    print(f"💬 conversation_wrapper input: {_input}")
-                    
                     # Extract the actual input text from runtime input (this is what user types)
                     if isinstance(_input, dict):
                         runtime_input = _input.get("input", str(_input))
                     else:
                         runtime_input = str(_input)
-                        
-                    print(f"💬 Processing runtime input: '{runtime_input[:100]}...'")
-                    
+
                     if tools_list:
                         # Use agent executor for tools with runtime input
                         result = executor.invoke({"input": runtime_input})
@@ -329,8 +289,7 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
                         result = executor.invoke({"input": runtime_input})
                         output = result.get("output", str(result))
                     
-                    print(f"✅ Agent response generated: {len(output)} characters")
-                    print(f"🎯 Final output: '{output[:100]}...'")
+                    logger.debug("Agent response generated for session %s: %d characters", session_id, len(output))
                     
                     return {
                         "output": output,
@@ -341,7 +300,7 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
                     
                 except Exception as e:
                     error_msg = f"Agent execution error: {str(e)}"
-                    print(f"❌ {error_msg}")
+                    logger.error(error_msg, exc_info=True)
                     return {
                         "output": f"I apologize, but I encountered an error: {str(e)}",
                         "error": error_msg,
@@ -352,18 +311,26 @@ Assistant: I'll help you with that. Let me provide a helpful response:"""
             
         except Exception as e:
             error_msg = f"Failed to create ReAct agent: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error(error_msg)
             raise ValueError(error_msg) from e
 
     def get_session_memory(self, session_id: str) -> Optional[BaseMemory]:
         """Get memory for a specific session"""
-        return self._session_memories.get(session_id)
+        history = SessionChatMessageHistory(session_memory_key(session_id, self.node_id, self.user_id))
+        if not history.messages:
+            return None
+        return ConversationBufferMemory(
+            chat_memory=history,
+            memory_key="chat_history",
+            return_messages=True,
+            input_key="input",
+            output_key="output"
+        )
     
     def clear_session_memory(self, session_id: str):
         """Clear memory for a specific session"""
-        if session_id in self._session_memories:
-            del self._session_memories[session_id]
-            print(f"🗑️ Cleared session memory: {session_id}")
+        SessionChatMessageHistory(session_memory_key(session_id, self.node_id, self.user_id)).clear()
+        logger.debug("Cleared session memory: %s", session_id)
 
 # Add alias for frontend compatibility
 ToolAgentNode = ReactAgentNode
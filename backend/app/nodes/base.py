@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union, Callable
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 from pydantic import BaseModel, Field, field_validator
 from langchain_core.runnables import Runnable
 from enum import Enum
 
 # Import FlowState for LangGraph compatibility
 from app.core.state import FlowState
+from app.core.logging_config import get_execution_logger
+
+logger = get_execution_logger(__name__)
 
 # 1. Node'un türünü belirten bir Enum tanımlıyoruz.
 class NodeType(str, Enum):
@@ -54,18 +57,24 @@ class BaseNode(ABC):
     node_id: Optional[str]
     context_id: Optional[str]
     session_id: Optional[str]
+    user_id: Optional[str]
     _input_connections: Dict[str, Dict[str, str]]
     _output_connections: Dict[str, List[Dict[str, str]]]
     user_data: Dict[str, Any]
+    credential: Optional[Dict[str, Any]]
     
     def __init__(self):
         self.node_id = None  # Will be set by GraphBuilder
         self.context_id = None  # Credential context for provider
         self.session_id = None  # Session ID for conversation continuity
+        self.user_id = None  # Authenticated user running the flow, set by GraphBuilder
         # 🔥 NEW: Connection mappings set by GraphBuilder
         self._input_connections = {}
         self._output_connections = {}
         self.user_data = {}  # User configuration from frontend
+        # Decrypted credential referenced by user_data, injected by GraphBuilder.
+        # Kept off user_data so secrets never reach FlowState or checkpoints.
+        self.credential = None
     
     @property
     def metadata(self) -> NodeMetadata:
@@ -133,9 +142,10 @@ class BaseNode(ABC):
                     user_inputs = self._extract_user_inputs(state, metadata.inputs)
                     connected_nodes = self._extract_connected_inputs(state, metadata.inputs)
                     
-                    # Log connection details for debugging
-                    print(f"[DEBUG] Processor {node_id} - User inputs: {list(user_inputs.keys())}")
-                    print(f"[DEBUG] Processor {node_id} - Connected inputs: {list(connected_nodes.keys())}")
+                    logger.debug(
+                        "Processor %s - user inputs: %s, connected inputs: %s",
+                        node_id, list(user_inputs), list(connected_nodes),
+                    )
                     
                     result = self.execute(inputs=user_inputs, connected_nodes=connected_nodes)
                     
@@ -177,7 +187,7 @@ class BaseNode(ABC):
             except Exception as e:
                 # Handle errors gracefully
                 error_msg = f"Error in {self.__class__.__name__} ({node_id}): {str(e)}"
-                print(f"[ERROR] {error_msg}")
+                logger.error(error_msg, exc_info=True)
                 state.add_error(error_msg)
                 return {
                     "errors": state.errors,
@@ -215,15 +225,40 @@ class BaseNode(ABC):
         except TypeError:
             return str(result)
     
+    def credential_value(self, name: str) -> Any:
+        """
+        Value for input ``name`` from the injected credential's secret: the
+        field of the same name, or its ``api_key`` for ``*_api_key`` inputs.
+        """
+        secret = (self.credential or {}).get("secret") or {}
+        if name in secret:
+            return secret[name]
+        if name.endswith("api_key"):
+            return secret.get("api_key")
+        return None
+
+    def resolve_input(self, name: str) -> Tuple[bool, Any]:
+        """
+        ``(found, value)`` for input ``name`` from user_data (the frontend
+        form) or, for missing or empty fields, the injected credential.
+        """
+        credential_value = self.credential_value(name)
+        if name in self.user_data and (self.user_data[name] not in (None, "") or credential_value is None):
+            return True, self.user_data[name]
+        if credential_value is not None:
+            return True, credential_value
+        return False, None
+
     def _extract_user_inputs(self, state: FlowState, input_specs: List[NodeInput]) -> Dict[str, Any]:
-        """Extract user-provided inputs from state and user_data"""
+        """Extract user-provided inputs from state, user_data and the injected credential"""
         inputs = {}
         
         for input_spec in input_specs:
             if not input_spec.is_connection:
-                # Check user_data first (from frontend form)
-                if input_spec.name in self.user_data:
-                    inputs[input_spec.name] = self.user_data[input_spec.name]
+                found, value = self.resolve_input(input_spec.name)
+                # Check user_data and the credential first
+                if found:
+                    inputs[input_spec.name] = value
                 # Then check state variables
                 elif input_spec.name in state.variables:
                     inputs[input_spec.name] = state.get_variable(input_spec.name)
@@ -3,6 +3,8 @@ from ..base import ProviderNode, NodeInput, NodeOutput, NodeType
 from langchain_community.embeddings import CohereEmbeddings
 from langchain_core.runnables import Runnable
 
+from app.core.embedding_cache import cached_embeddings
+
 class CohereEmbeddingsNode(ProviderNode):
     """Cohere embeddings model node"""
     
@@ -28,6 +30,13 @@ class CohereEmbeddingsNode(ProviderNode):
                     type="str",
                     description="Cohere API Key",
                     required=False
+                ),
+                NodeInput(
+                    name="cache_embeddings",
+                    type="bool",
+                    description="Reuse cached vectors for text embedded before",
+                    default=True,
+                    required=False
                 )
             ],
             "outputs": [
@@ -46,7 +55,8 @@ class CohereEmbeddingsNode(ProviderNode):
         if not api_key:
             raise ValueError("Cohere API Key is required")
         
-        return CohereEmbeddings(
+        embeddings = CohereEmbeddings(
             model=kwargs.get("model", "embed-english-v2.0"),
             cohere_api_key=api_key
         )
+        return cached_embeddings(embeddings, kwargs.get("cache_embeddings", True))
@@ -1,7 +1,9 @@
 from ..base import ProviderNode, NodeInput, NodeOutput, NodeType
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.runnables import Runnable
 
+from app.core.embedding_cache import cached_embeddings
+from app.core.local_embeddings import BatchedHuggingFaceEmbeddings
+
 class HuggingFaceEmbeddingsNode(ProviderNode):
     """HuggingFace embeddings model node"""
     
@@ -34,6 +36,13 @@ class HuggingFaceEmbeddingsNode(ProviderNode):
                     description="Encoding options",
                     default={"normalize_embeddings": False},
                     required=False
+                ),
+                NodeInput(
+                    name="cache_embeddings",
+                    type="bool",
+                    description="Reuse cached vectors for text embedded before",
+                    default=True,
+                    required=False
                 )
             ],
             "outputs": [
@@ -47,8 +56,10 @@ class HuggingFaceEmbeddingsNode(ProviderNode):
 
     def execute(self, **kwargs) -> Runnable:
         """Execute the HuggingFace embeddings node"""
-        return HuggingFaceEmbeddings(
-            model_name=kwargs.get("model_name", "sentence-transformers/all-MiniLM-L6-v2"),
+        # The model is loaded once per process and shared by every flow using it
+        embeddings = BatchedHuggingFaceEmbeddings(
+            kwargs.get("model_name", "sentence-transformers/all-MiniLM-L6-v2"),
             cache_folder=kwargs.get("cache_folder"),
             encode_kwargs=kwargs.get("encode_kwargs", {"normalize_embeddings": False})
         )
+        return cached_embeddings(embeddings, kwargs.get("cache_embeddings", True))
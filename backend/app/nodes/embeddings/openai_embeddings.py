@@ -4,6 +4,8 @@ from ..base import ProviderNode, NodeInput, NodeOutput, NodeType
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.runnables import Runnable
 
+from app.core.embedding_cache import cached_embeddings
+
 class OpenAIEmbeddingsNode(ProviderNode):
     """OpenAI embeddings model node"""
     
@@ -36,6 +38,13 @@ class OpenAIEmbeddingsNode(ProviderNode):
                     description="Chunk size for embedding",
                     default=1000,
                     required=False
+                ),
+                NodeInput(
+                    name="cache_embeddings",
+                    type="bool",
+                    description="Reuse cached vectors for text embedded before",
+                    default=True,
+                    required=False
                 )
             ],
             "outputs": [
@@ -54,8 +63,9 @@ class OpenAIEmbeddingsNode(ProviderNode):
         if not api_key:
             raise ValueError("OpenAI API Key is required")
         
-        return OpenAIEmbeddings(
+        embeddings = OpenAIEmbeddings(
             model=kwargs.get("model_name", "text-embedding-ada-002"),
             openai_api_key=api_key,
             chunk_size=kwargs.get("chunk_size", 1000)
         )
+        return cached_embeddings(embeddings, kwargs.get("cache_embeddings", True))
@@ -0,0 +1,4 @@
+# Ingestion Nodes
+from .document_ingestion import DocumentIngestionNode
+
+__all__ = ["DocumentIngestionNode"]
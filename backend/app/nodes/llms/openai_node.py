@@ -5,9 +5,12 @@ from langchain_core.runnables import Runnable
 from pydantic import SecretStr
 
 from app.nodes.base import BaseNode, NodeType, NodeInput, NodeOutput
+from app.core.logging_config import get_execution_logger
+
+logger = get_execution_logger(__name__)
 
 class OpenAINode(BaseNode):
-    """OpenAI Chat completion node with direct API key configuration."""
+    """OpenAI Chat completion node using a stored credential or a direct API key."""
     
     def __init__(self):
         super().__init__()
@@ -32,11 +35,17 @@ class OpenAINode(BaseNode):
                     default=0.7,
                     required=False
                 ),
+                NodeInput(
+                    name="credential_id",
+                    type="str",
+                    description="Stored OpenAI credential (id or name); preferred over an inline API key",
+                    required=False
+                ),
                 NodeInput(
                     name="api_key",
                     type="str",
-                    description="OpenAI API Key",
-                    required=True
+                    description="OpenAI API Key (inline; prefer credential_id)",
+                    required=False
                 )
             ],
             "outputs": [
@@ -49,18 +58,16 @@ class OpenAINode(BaseNode):
         }
     
     def execute(self, **kwargs) -> Runnable:
-        """Execute OpenAI node with direct API key access."""
-        print(f"Gelen OpenAI config: {self.user_data}")
-        
-        # Get API key directly from user_data (frontend configuration)
-        api_key = self.user_data.get("api_key")
+        """Execute OpenAI node with the referenced credential or direct API key."""
+        # Inline key from user_data (frontend configuration), then the stored credential
+        api_key = self.user_data.get("api_key") or self.credential_value("api_key")
         
         # Fallback to environment variable
         if not api_key:
             api_key = os.getenv("OPENAI_API_KEY")
         
         if not api_key:
-            raise ValueError("OpenAI API key is required. Please provide it in the node configuration or set OPENAI_API_KEY environment variable.")
+            raise ValueError("OpenAI API key is required. Please reference a credential, provide it in the node configuration or set OPENAI_API_KEY environment variable.")
         
         # Create OpenAI Chat model (without max_tokens as it might not be supported)
         llm = ChatOpenAI(
@@ -69,7 +76,7 @@ class OpenAINode(BaseNode):
             api_key=SecretStr(str(api_key))
         )
         
-        print(f"[DEBUG] OpenAI LLM created successfully with model: {llm.model_name}")
+        logger.debug("OpenAI LLM created with model: %s", llm.model_name)
         return llm
 
 # Add alias for frontend compatibility
@@ -1,7 +1,14 @@
 from ..base import ProviderNode, NodeInput, NodeType
 from langchain.memory import ConversationBufferMemory
 from langchain_core.runnables import Runnable
-from typing import cast, Dict
+from typing import cast
+import logging
+
+from app.core.logging_config import get_execution_logger
+from app.core.chat_history import get_chat_history
+from app.core.history_window import TokenWindowMemory
+
+logger = get_execution_logger(__name__)
 
 class BufferMemoryNode(ProviderNode):
     """Session-aware conversation buffer memory"""
@@ -19,35 +26,39 @@ class BufferMemoryNode(ProviderNode):
                 NodeInput(name="return_messages", type="bool", description="Return as messages", default=True),
                 NodeInput(name="input_key", type="str", description="Input key name", default="input"),
                 NodeInput(name="output_key", type="str", description="Output key name", default="output"),
+                NodeInput(name="storage", type="str", description="Where history is kept: 'session' (session memory store) or 'database' (chat_message table)", default="session"),
+                NodeInput(name="max_messages", type="int", description="Messages loaded per turn with database storage", default=50),
+                NodeInput(name="max_token_limit", type="int", description="Token budget for history loaded into prompts (newest turns first); 0 loads the whole history", default=0),
+                NodeInput(name="chatflow_id", type="str", description="Conversation id for database storage (defaults to this node); reuse it to share history", required=False),
             ]
         }
-        # Session-aware memory storage
-        self._session_memories: Dict[str, ConversationBufferMemory] = {}
 
     def execute(self, **kwargs) -> Runnable:
         """Execute buffer memory node with session persistence"""
         # Get session ID from context (set by graph builder)
-        session_id = getattr(self, 'session_id', 'default_session')
-        print(f"💾 BufferMemoryNode session_id: {session_id}")
-        
-        # Use existing session memory or create new one
-        if session_id not in self._session_memories:
-            self._session_memories[session_id] = ConversationBufferMemory(
-                memory_key=kwargs.get("memory_key", "chat_history"),
-                return_messages=kwargs.get("return_messages", True),
-                input_key=kwargs.get("input_key", "input"),
-                output_key=kwargs.get("output_key", "output")
-            )
-            print(f"💾 Created new BufferMemory for session: {session_id}")
+        session_id = getattr(self, 'session_id', None) or 'default_session'
+        # History lives in the shared session memory store or chat_message, so it outlives this instance
+        chat_history = get_chat_history(
+            kwargs.get("storage") or "session",
+            session_id,
+            self.node_id,
+            chatflow_id=kwargs.get("chatflow_id"),
+            max_messages=int(kwargs.get("max_messages") or 50),
+            user_id=self.user_id,
+        )
+        memory_kwargs = dict(
+            chat_memory=chat_history,
+            memory_key=kwargs.get("memory_key", "chat_history"),
+            return_messages=kwargs.get("return_messages", True),
+            input_key=kwargs.get("input_key", "input"),
+            output_key=kwargs.get("output_key", "output")
+        )
+        max_token_limit = int(kwargs.get("max_token_limit") or 0)
+        if max_token_limit > 0:
+            memory = TokenWindowMemory(max_token_limit=max_token_limit, **memory_kwargs)
         else:
-            print(f"💾 Reusing existing BufferMemory for session: {session_id}")
-            
-        memory = self._session_memories[session_id]
-        
-        # Debug memory content
-        if hasattr(memory, 'chat_memory') and hasattr(memory.chat_memory, 'messages'):
-            print(f"💾 BufferMemory has {len(memory.chat_memory.messages)} messages")
-            for i, msg in enumerate(memory.chat_memory.messages[-3:]):  # Show last 3 messages
-                print(f"  {i}: {getattr(msg, 'type', 'unknown')}: {getattr(msg, 'content', str(msg))[:100]}")
-        
+            memory = ConversationBufferMemory(**memory_kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("BufferMemory for session %s has %d messages", session_id, len(memory.chat_memory.messages))
+
         return cast(Runnable, memory)
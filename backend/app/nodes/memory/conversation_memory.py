@@ -3,6 +3,8 @@ from langchain.memory import ConversationBufferWindowMemory
 from langchain_core.runnables import Runnable
 from typing import cast
 
+from app.core.chat_history import get_chat_history
+
 class ConversationMemoryNode(ProviderNode):
     def __init__(self):
         super().__init__()
@@ -15,7 +17,9 @@ class ConversationMemoryNode(ProviderNode):
             "node_type": NodeType.PROVIDER,
             "inputs": [
                 NodeInput(name="k", type="int", description="The number of messages to keep in the buffer.", default=5),
-                NodeInput(name="memory_key", type="string", description="The key for the memory in the chat history.", default="chat_history")
+                NodeInput(name="memory_key", type="string", description="The key for the memory in the chat history.", default="chat_history"),
+                NodeInput(name="storage", type="string", description="Where history is kept: 'memory' (this instance only) or 'database' (chat_message table).", default="memory"),
+                NodeInput(name="chatflow_id", type="string", description="Conversation id for database storage (defaults to this node).", required=False)
             ]
         }
 
@@ -24,9 +28,21 @@ class ConversationMemoryNode(ProviderNode):
         k = kwargs.get("k", 5)
         memory_key = kwargs.get("memory_key", "chat_history")
         
+        window = {}
+        if kwargs.get("storage") == "database":
+            # Only the last k exchanges are used, so only those are loaded
+            window["chat_memory"] = get_chat_history(
+                "database",
+                getattr(self, "session_id", None),
+                self.node_id,
+                chatflow_id=kwargs.get("chatflow_id"),
+                max_messages=k * 2,
+                user_id=self.user_id,
+            )
         memory = ConversationBufferWindowMemory(
             k=k,
             memory_key=memory_key,
-            return_messages=True
+            return_messages=True,
+            **window
         )
         return cast(Runnable, memory)
@@ -1,10 +1,12 @@
 from typing import Dict, Any
 from ..base import ProcessorNode, NodeInput, NodeType
-from langchain.memory import ConversationSummaryMemory
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.runnables import Runnable
 from typing import cast
 
+from app.core.rolling_summary import RollingSummaryMemory
+from app.core.session_memory import SessionChatMessageHistory, session_memory_key
+
 class SummaryMemoryNode(ProcessorNode):
     """Conversation summary memory"""
     
@@ -14,7 +16,7 @@ class SummaryMemoryNode(ProcessorNode):
             "name": "SummaryMemory",
             "display_name": "Summary Memory",
 
-            "description": "Summarizes conversation history using an LLM",
+            "description": "Keeps recent turns verbatim and summarizes older ones using an LLM",
             "category": "Memory",
             "node_type": NodeType.PROCESSOR,
             "inputs": [
@@ -30,8 +32,14 @@ class SummaryMemoryNode(ProcessorNode):
         if not isinstance(llm, BaseLanguageModel):
             raise ValueError("LLM connection is required")
         
-        return cast(Runnable, ConversationSummaryMemory(
+        # Summaries are built incrementally in the background and cached per session
+        history_key = session_memory_key(self.session_id, self.node_id, self.user_id)
+        return cast(Runnable, RollingSummaryMemory(
             llm=llm,
+            history_key=history_key,
+            chat_memory=SessionChatMessageHistory(history_key),
             memory_key=inputs.get("memory_key", "chat_history"),
-            max_token_limit=inputs.get("max_token_limit", 2000)
+            max_token_limit=int(inputs.get("max_token_limit") or 2000),
+            input_key="input",
+            output_key="output",
         ))
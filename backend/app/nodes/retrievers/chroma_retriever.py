@@ -1,13 +1,14 @@
 from ..base import ProcessorNode, NodeInput, NodeType
-from langchain_community.vectorstores import Chroma
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_core.runnables import Runnable
 from typing import Dict, Any
 
+from app.core.vector_clients import get_vector_client_store
+
 class ChromaRetrieverNode(ProcessorNode):
     def __init__(self):
         super().__init__()
-        self._metadatas = {
+        self._metadata = {
             "name": "ChromaRetriever",
             "display_name": "Chroma Retriever",
 
@@ -25,6 +26,25 @@ class ChromaRetrieverNode(ProcessorNode):
                     type="object",
                     description="The embedding function to use.",
                     is_connection=True
+                ),
+                NodeInput(
+                    name="persist_directory",
+                    type="string",
+                    description="Chroma database folder, relative to your Chroma storage directory.",
+                    required=False
+                ),
+                NodeInput(
+                    name="k",
+                    type="int",
+                    description="The number of documents to retrieve.",
+                    default=4,
+                    required=False
+                ),
+                NodeInput(
+                    name="filter",
+                    type="dict",
+                    description="Metadata filter, e.g. {\"source\": \"handbook.pdf\"}.",
+                    required=False
                 )
             ]
         }
@@ -37,5 +57,12 @@ class ChromaRetrieverNode(ProcessorNode):
         if not embedding_function:
             raise ValueError("Embedding function must be provided as connected node")
         
-        vectorstore = Chroma(collection_name=collection_name, embedding_function=embedding_function)
+        # The client and collection are opened once per process and shared across executions
+        vectorstore = get_vector_client_store().chroma(
+            embedding_function,
+            collection_name,
+            persist_directory=inputs.get("persist_directory"),
+            user_id=self.user_id,
+            search_defaults={"k": inputs.get("k"), "filter": inputs.get("filter")},
+        )
         return vectorstore.as_retriever()
@@ -1,8 +1,9 @@
 from typing import Dict, Any, Optional
 from ..base import ProcessorNode, NodeInput, NodeOutput, NodeType
-from langchain_community.vectorstores import FAISS
 from langchain_core.runnables import Runnable
 
+from app.core.faiss_store import get_faiss_store
+
 class FaissVectorStoreNode(ProcessorNode):
     """FAISS vector store node"""
     
@@ -29,17 +30,24 @@ class FaissVectorStoreNode(ProcessorNode):
                     default="faiss_index",
                     required=False
                 ),
+                NodeInput(
+                    name="index_type",
+                    type="str",
+                    description="Index type for a new index: flat (exact), ivf or hnsw (approximate, for large indexes)",
+                    default="flat",
+                    required=False
+                ),
                 NodeInput(
                     name="save_local",
                     type="bool",
-                    description="Save index to local disk",
+                    description="Periodically snapshot the index to local disk",
                     default=False,
                     required=False
                 ),
                 NodeInput(
                     name="folder_path",
                     type="str",
-                    description="Folder path to save/load index",
+                    description="Folder to save/load the index, relative to your FAISS storage directory",
                     default="./faiss_index",
                     required=False
                 )
@@ -59,19 +67,12 @@ class FaissVectorStoreNode(ProcessorNode):
         if not embeddings:
             raise ValueError("Embeddings connection is required")
         
-        # Try to load existing index
-        if inputs.get("folder_path"):
-            try:
-                return FAISS.load_local(
-                    folder_path=inputs["folder_path"],
-                    embeddings=embeddings,
-                    index_name=inputs.get("index_name", "faiss_index")
-                )
-            except:
-                pass  # If loading fails, create new
-        
-        # Create new FAISS index
-        return FAISS.from_texts(
-            texts=[""],  # Empty initial text
-            embedding=embeddings
+        # Indexes are loaded once per process and shared across executions
+        return get_faiss_store().get(
+            embeddings,
+            inputs.get("folder_path") or "./faiss_index",
+            inputs.get("index_name") or "faiss_index",
+            user_id=self.user_id,
+            index_type=inputs.get("index_type") or "flat",
+            persist=bool(inputs.get("save_local", False)),
         )
@@ -1,8 +1,9 @@
 from typing import Dict, Any, Optional
 from ..base import ProcessorNode, NodeInput, NodeOutput, NodeType
-from langchain_community.vectorstores import Qdrant
 from langchain_core.runnables import Runnable
 
+from app.core.vector_clients import get_vector_client_store
+
 class QdrantVectorStoreNode(ProcessorNode):
     """Qdrant vector store node"""
     
@@ -43,7 +44,20 @@ class QdrantVectorStoreNode(ProcessorNode):
                 NodeInput(
                     name="path",
                     type="str",
-                    description="Local path for Qdrant (alternative to URL)",
+                    description="Local Qdrant database folder, relative to your Qdrant storage directory (alternative to URL)",
+                    required=False
+                ),
+                NodeInput(
+                    name="search_k",
+                    type="int",
+                    description="Documents returned per search by retrievers built from this store",
+                    default=4,
+                    required=False
+                ),
+                NodeInput(
+                    name="search_filter",
+                    type="dict",
+                    description="Metadata filter applied to searches, e.g. {\"source\": \"handbook.pdf\"}",
                     required=False
                 )
             ],
@@ -62,26 +76,13 @@ class QdrantVectorStoreNode(ProcessorNode):
         if not embeddings:
             raise ValueError("Embeddings connection is required")
         
-        # Create Qdrant client
-        if inputs.get("path"):
-            # Local Qdrant
-            return Qdrant.from_texts(
-                texts=[""],  # Empty initial text
-                embedding=embeddings,
-                path=inputs["path"],
-                collection_name=inputs["collection_name"]
-            )
-        else:
-            # Remote Qdrant
-            from qdrant_client import QdrantClient
-            
-            client = QdrantClient(
-                url=inputs.get("url", "http://localhost:6333"),
-                api_key=inputs.get("api_key")
-            )
-            
-            return Qdrant(
-                client=client,
-                collection_name=inputs["collection_name"],
-                embeddings=embeddings
-            )
+        # Clients and collections are opened once per process and shared across executions
+        return get_vector_client_store().qdrant(
+            embeddings,
+            inputs["collection_name"],
+            path=inputs.get("path"),
+            url=inputs.get("url") or "http://localhost:6333",
+            api_key=inputs.get("api_key"),
+            user_id=self.user_id,
+            search_defaults={"k": inputs.get("search_k"), "filter": inputs.get("search_filter")},
+        )
@@ -1,6 +1,6 @@
 import uuid
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 # --- Workflow Schemas ---
@@ -29,11 +29,30 @@ class WorkflowResponse(WorkflowBase):
     user_id: uuid.UUID
     version: int
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+# Slim listing item: everything except flow_data
+class WorkflowSummaryResponse(BaseModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    name: str
+    description: Optional[str] = None
+    is_public: bool = False
+    version: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# One keyset page; pass next_cursor back as ``cursor`` to get the following page
+class WorkflowSummaryPage(BaseModel):
+    items: List[WorkflowSummaryResponse]
+    next_cursor: Optional[str] = None
+
 # --- Workflow Template Schemas ---
 
 # Base schema for workflow template fields
@@ -1,26 +1,30 @@
-import secrets
 import uuid
+from datetime import datetime, timedelta, timezone
 from typing import List, Tuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.security import get_password_hash
+from app.core.security import generate_api_key, hash_api_key, parse_api_key, verify_api_key
 from app.models.api_key import APIKey
 from app.models.user import User
 from app.schemas.api_key import APIKeyCreate, APIKeyUpdate
 from app.services.base import BaseService
 
+# ``last_used_at`` is only written when older than this, so authenticating a
+# busy key does not turn every request into an UPDATE.
+LAST_USED_RESOLUTION = timedelta(minutes=5)
+
 class APIKeyService(BaseService[APIKey]):
     def __init__(self):
         super().__init__(APIKey)
 
     async def create_api_key(self, db: AsyncSession, *, api_key_in: APIKeyCreate, user: User) -> Tuple[str, APIKey]:
-        api_key = secrets.token_urlsafe(32)
-        hashed_key = get_password_hash(api_key)
+        api_key, key_prefix, secret = generate_api_key()
 
         db_api_key = APIKey(
             key_name=api_key_in.key_name,
-            hashed_key=hashed_key,
+            key_prefix=key_prefix,
+            hashed_key=hash_api_key(secret),
             user_id=user.id
         )
         db.add(db_api_key)
@@ -29,6 +33,34 @@ class APIKeyService(BaseService[APIKey]):
         
         return api_key, db_api_key
 
+    async def authenticate(self, db: AsyncSession, api_key: str) -> Optional[User]:
+        """
+        Resolve a presented API key to its owner: one indexed lookup on the key
+        prefix plus an HMAC comparison. Returns ``None`` for unknown or invalid keys.
+        """
+        parsed = parse_api_key(api_key)
+        if parsed is None:
+            return None
+        key_prefix, secret = parsed
+
+        query = (
+            select(self.model, User)
+            .join(User, User.id == self.model.user_id)
+            .filter(self.model.key_prefix == key_prefix)
+        )
+        row = (await db.execute(query)).first()
+        if row is None:
+            return None
+        db_api_key, user = row
+        if not verify_api_key(secret, db_api_key.hashed_key):
+            return None
+
+        now = datetime.now(timezone.utc)
+        if db_api_key.last_used_at is None or now - db_api_key.last_used_at > LAST_USED_RESOLUTION:
+            db_api_key.last_used_at = now
+            await db.commit()
+        return user
+
     async def get_api_keys(self, db: AsyncSession, *, user: User) -> List[APIKey]:
         query = select(self.model).filter(self.model.user_id == user.id)
         result = await db.execute(query)
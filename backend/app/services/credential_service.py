@@ -1,14 +1,174 @@
+import asyncio
+import logging
 import uuid
 import base64
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Set, Tuple
+from sqlalchemy import or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from app.models.user_credential import UserCredential
 from app.services.base import BaseService
 from app.schemas.user_credential import UserCredentialCreate, UserCredentialUpdate
+from app.core.credential_cache import get_credential_cache
 from app.core.encryption import encrypt_data, decrypt_data
 
+logger = logging.getLogger(__name__)
+
+# Node data keys that reference a stored credential
+CREDENTIAL_REF_KEYS = ("credential_id", "credential_name", "credential")
+
+
+def node_credential_ref(data: Dict[str, Any]) -> Optional[str]:
+    """
+    The credential a node's data references (an id or a name), if any.
+    """
+    for key in CREDENTIAL_REF_KEYS:
+        value = (data or {}).get(key)
+        if value and isinstance(value, str):
+            return value
+    return None
+
+
+def _split_ref(ref: str) -> Tuple[Optional[uuid.UUID], str]:
+    try:
+        return uuid.UUID(ref), ref
+    except ValueError:
+        return None, ref
+
+
+def credential_key(ref: str) -> str:
+    """
+    The key ``resolve_flow_credentials`` uses for a reference: the canonical
+    (lower-case, hyphenated) form of an id, or the name unchanged.
+    """
+    credential_id, name = _split_ref(ref)
+    return str(credential_id) if credential_id else name
+
+
+def credential_refs(flow_data: Dict[str, Any]) -> Tuple[Set[uuid.UUID], Set[str]]:
+    """
+    Collect the credential ids and names referenced by a flow's node data.
+    """
+    ids: Set[uuid.UUID] = set()
+    names: Set[str] = set()
+    for node in (flow_data or {}).get("nodes", []):
+        ref = node_credential_ref(node.get("data") or {})
+        if ref:
+            credential_id, name = _split_ref(ref)
+            if credential_id:
+                ids.add(credential_id)
+            else:
+                names.add(name)
+    return ids, names
+
+
+def decrypt_credential(credential: UserCredential) -> Dict[str, Any]:
+    """
+    Decrypted view of a credential row, served from the credential cache
+    while the row's ``updated_at`` matches.
+    """
+    cache = get_credential_cache()
+    cached = cache.get(credential.user_id, credential.id, version=credential.updated_at)
+    if cached is not None:
+        return cached
+
+    metadata = {
+        "id": credential.id,
+        "name": credential.name,
+        "service_type": credential.service_type,
+        "created_at": credential.created_at,
+        "updated_at": credential.updated_at
+    }
+    try:
+        # Convert base64 string back to bytes for decryption
+        encrypted_bytes = base64.b64decode(credential.encrypted_secret.encode('utf-8'))
+        decrypted = {**metadata, "secret": decrypt_data(encrypted_bytes)}
+    except Exception:
+        # Return credential without secret if decryption fails
+        return metadata
+    cache.put(credential.user_id, decrypted)
+    return decrypted
+
+
+def _running_on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def resolve_flow_credentials(
+    flow_data: Dict[str, Any], user_id: Any, prefetched: Optional[Iterable[Dict[str, Any]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Map every credential reference in a flow to its decrypted credential.
+
+    Synchronous, for the graph build. With ``prefetched`` (the result of
+    ``prefetch_flow_credentials``) that list is authoritative and the
+    database is never queried, so async callers never block their event
+    loop. Without it references are served from the credential cache and
+    misses are loaded in a single query on the sync engine. Keys are
+    :func:`credential_key` of the reference. Unknown and undecryptable
+    references are absent from the result and remembered as missing for a
+    short while, so they do not cost a query on every build.
+    """
+    ids, names = credential_refs(flow_data)
+    if not user_id or (not ids and not names):
+        return {}
+    resolved: Dict[str, Dict[str, Any]] = {}
+    if prefetched is not None:
+        for credential in prefetched:
+            if "secret" in credential:
+                resolved[str(credential["id"])] = resolved[credential["name"]] = credential
+        return resolved
+
+    cache = get_credential_cache()
+    for credential_id in ids:
+        hit = cache.get(user_id, credential_id)
+        if hit is not None:
+            resolved[str(credential_id)] = hit
+    for name in names:
+        hit = cache.get_by_name(user_id, name)
+        if hit is not None:
+            resolved[name] = hit
+
+    missing_ids = [i for i in ids if str(i) not in resolved and not cache.is_missing(user_id, str(i))]
+    missing_names = [n for n in names if n not in resolved and not cache.is_missing(user_id, n)]
+    user_uuid = _split_ref(str(user_id))[0]
+    if user_uuid and (missing_ids or missing_names):
+        if _running_on_event_loop():
+            logger.warning(
+                "Resolving %d credentials with a blocking query on the event loop; "
+                "pass prefetch_flow_credentials() results to the build instead",
+                len(missing_ids) + len(missing_names),
+            )
+        from sqlalchemy.orm import Session
+        from app.core.database import sync_engine
+
+        with Session(sync_engine) as session:
+            rows = session.execute(
+                select(UserCredential).filter(
+                    UserCredential.user_id == user_uuid,
+                    or_(UserCredential.id.in_(missing_ids), UserCredential.name.in_(missing_names)),
+                )
+            ).scalars().all()
+            for row in rows:
+                decrypted = decrypt_credential(row)
+                if "secret" in decrypted:
+                    resolved[str(row.id)] = decrypted
+                    resolved[row.name] = decrypted
+        _remember_missing(user_id, missing_ids, missing_names, resolved)
+    return resolved
+
+
+def _remember_missing(
+    user_id: Any, ids: Iterable[uuid.UUID], names: Iterable[str], resolved: Dict[str, Any]
+) -> None:
+    refs = [str(i) for i in ids] + list(names)
+    get_credential_cache().put_missing(user_id, [ref for ref in refs if ref not in resolved])
+
 
 class CredentialService(BaseService[UserCredential]):
     def __init__(self):
@@ -67,6 +227,7 @@ class CredentialService(BaseService[UserCredential]):
         db.add(credential)
         await db.commit()
         await db.refresh(credential)
+        get_credential_cache().invalidate(user_id, credential.id)
         return credential
 
     async def update_credential(
@@ -90,6 +251,7 @@ class CredentialService(BaseService[UserCredential]):
         
         await db.commit()
         await db.refresh(credential)
+        get_credential_cache().invalidate(user_id, credential_id)
         return credential
 
     async def delete_credential(
@@ -104,6 +266,7 @@ class CredentialService(BaseService[UserCredential]):
         
         await db.delete(credential)
         await db.commit()
+        get_credential_cache().invalidate(user_id, credential_id)
         return True
 
     async def get_decrypted_credential(
@@ -115,25 +278,40 @@ class CredentialService(BaseService[UserCredential]):
         credential = await self.get_by_user_and_id(db, user_id, credential_id)
         if not credential:
             return None
-        
-        try:
-            # Convert base64 string back to bytes for decryption
-            encrypted_bytes = base64.b64decode(credential.encrypted_secret.encode('utf-8'))
-            decrypted_secret = decrypt_data(encrypted_bytes)
-            return {
-                "id": credential.id,
-                "name": credential.name,
-                "service_type": credential.service_type,
-                "secret": decrypted_secret,
-                "created_at": credential.created_at,
-                "updated_at": credential.updated_at
-            }
-        except Exception:
-            # Return credential without secret if decryption fails
-            return {
-                "id": credential.id,
-                "name": credential.name,
-                "service_type": credential.service_type,
-                "created_at": credential.created_at,
-                "updated_at": credential.updated_at
-            } 
\ No newline at end of file
+        return decrypt_credential(credential)
+
+    async def get_decrypted_credentials(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        credential_ids: Iterable[uuid.UUID] = (),
+        names: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Load and decrypt several credentials of a user, by id or name, in one query.
+        """
+        credential_ids, names = list(credential_ids), list(names)
+        if not credential_ids and not names:
+            return []
+        query = select(self.model).filter(
+            self.model.user_id == user_id,
+            or_(self.model.id.in_(credential_ids), self.model.name.in_(names)),
+        )
+        result = await db.execute(query)
+        return [decrypt_credential(credential) for credential in result.scalars().all()]
+
+    async def prefetch_flow_credentials(
+        self, db: AsyncSession, user_id: uuid.UUID, flow_data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Warm the credential cache with every credential a flow references,
+        so nodes resolving them at build time do not hit the database.
+        """
+        ids, names = credential_refs(flow_data)
+        credentials = await self.get_decrypted_credentials(db, user_id, ids, names)
+        found: Dict[str, Any] = {}
+        for credential in credentials:
+            if "secret" in credential:
+                found[str(credential["id"])] = found[credential["name"]] = credential
+        _remember_missing(user_id, ids, names, found)
+        return credentials
@@ -1,8 +1,11 @@
 import uuid
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.execution import WorkflowExecution
+from app.models.workflow import Workflow
 from app.services.base import BaseService
 
 
@@ -10,6 +13,26 @@ class ExecutionService(BaseService[WorkflowExecution]):
     def __init__(self):
         super().__init__(WorkflowExecution)
 
+    def _filtered(
+        self,
+        query,
+        user_id: uuid.UUID,
+        workflow_id: Optional[uuid.UUID] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        query = query.filter(self.model.user_id == user_id)
+        if workflow_id:
+            query = query.filter(self.model.workflow_id == workflow_id)
+        if status:
+            query = query.filter(self.model.status == status)
+        if since:
+            query = query.filter(self.model.created_at >= since)
+        if until:
+            query = query.filter(self.model.created_at < until)
+        return query
+
     async def get_workflow_executions(
         self,
         db: AsyncSession,
@@ -29,4 +52,73 @@ class ExecutionService(BaseService[WorkflowExecution]):
             .limit(limit)
         )
         result = await db.execute(query)
-        return result.scalars().all() 
\ No newline at end of file
+        return result.scalars().all()
+
+    async def list_executions(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        *,
+        workflow_id: Optional[uuid.UUID] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Tuple[WorkflowExecution, Optional[str]]]:
+        """
+        Newest-first executions of a user with optional workflow/status/time
+        filters, each paired with its workflow name (``None`` for ad-hoc runs).
+        """
+        query = (
+            select(self.model, Workflow.name)
+            .outerjoin(Workflow, Workflow.id == self.model.workflow_id)
+        )
+        query = self._filtered(query, user_id, workflow_id, status, since, until)
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc()).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return [(execution, name) for execution, name in result.all()]
+
+    async def get_user_execution(
+        self, db: AsyncSession, execution_id: uuid.UUID, user_id: uuid.UUID
+    ) -> Optional[Tuple[WorkflowExecution, Optional[str]]]:
+        """
+        Get one execution of a user with its workflow name.
+        """
+        query = (
+            select(self.model, Workflow.name)
+            .outerjoin(Workflow, Workflow.id == self.model.workflow_id)
+            .filter(self.model.id == execution_id, self.model.user_id == user_id)
+        )
+        row = (await db.execute(query)).first()
+        return (row[0], row[1]) if row else None
+
+    async def summarize(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        *,
+        workflow_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Aggregate counts and average duration in a single SQL query.
+        """
+        status = self.model.status
+        query = select(
+            func.count(),
+            func.count().filter(status == "completed"),
+            func.count().filter(status == "failed"),
+            func.count().filter(status == "running"),
+            func.avg(self.model.duration_ms).filter(status == "completed"),
+        ).select_from(self.model)
+        query = self._filtered(query, user_id, workflow_id, None, since, until)
+        total, completed, failed, running, avg_ms = (await db.execute(query)).one()
+        return {
+            "total_executions": total,
+            "successful_executions": completed,
+            "failed_executions": failed,
+            "running_executions": running,
+            "average_execution_time": round(float(avg_ms) / 1000, 2) if avg_ms is not None else 0.0,
+        }
@@ -5,6 +5,7 @@ from sqlalchemy.future import select
 from typing import Optional
 from app.schemas.auth import UserSignUpData, UserUpdateProfile
 from app.core.security import get_password_hash, verify_password
+from app.auth.user_cache import invalidate_user
 from datetime import datetime, timezone
 
 
@@ -49,6 +50,7 @@ class UserService(BaseService[User]):
         db.add(user)
         await db.commit()
         await db.refresh(user)
+        await invalidate_user(user.email)
         return user
 
     async def create_user(self, db: AsyncSession, user_data: UserSignUpData) -> User:
@@ -1,16 +1,109 @@
 from app.models.workflow import Workflow, WorkflowTemplate
 from app.services.base import BaseService
+from app.core.search import apply_text_search
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, or_, and_, func
-from typing import Optional, List
+from sqlalchemy import desc, or_, and_, func, tuple_
+from sqlalchemy.orm import load_only
+from datetime import datetime
+from typing import Optional, List, Sequence, Tuple
+import base64
+import json
 import uuid
 
 
+# Listing order; updated_at is nullable, so rows never updated sort by created_at
+SORT_TIME = func.coalesce(Workflow.updated_at, Workflow.created_at)
+
+
+def encode_cursor(workflow: Workflow) -> str:
+    """Opaque keyset cursor pointing just past ``workflow`` in (:data:`SORT_TIME`, id) order."""
+    sort_time = workflow.updated_at or workflow.created_at
+    raw = json.dumps([sort_time.isoformat(), str(workflow.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, workflow_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(updated_at), uuid.UUID(workflow_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
 class WorkflowService(BaseService[Workflow]):
+    # Columns loaded for summary listings; flow_data stays in the database.
+    SUMMARY_COLUMNS = (
+        Workflow.id, Workflow.user_id, Workflow.name, Workflow.description,
+        Workflow.is_public, Workflow.version, Workflow.created_at, Workflow.updated_at,
+    )
+
     def __init__(self):
         super().__init__(Workflow)
 
+    def _list_query(
+        self,
+        *,
+        user_id: Optional[uuid.UUID] = None,
+        public_only: bool = False,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+        dialect_name: str = "postgresql",
+    ):
+        """
+        Newest-first listing query. With ``cursor`` the page starts after the
+        cursor position (keyset on ``(coalesce(updated_at, created_at), id)``) and ``skip`` is ignored,
+        so deep pages cost the same as the first one.
+
+        With ``search`` results are full-text matched and ordered by relevance
+        instead; relevance order has no stable keyset, so such pages use ``skip``.
+        """
+        query = select(self.model)
+        if summary:
+            query = query.options(load_only(*self.SUMMARY_COLUMNS))
+        if user_id is not None:
+            query = query.filter(self.model.user_id == user_id)
+        if public_only:
+            query = query.filter(self.model.is_public == True)
+
+        rank = None
+        if search:
+            if cursor:
+                raise ValueError("Cursor pagination is not supported for search results; use skip")
+            query, rank = apply_text_search(query, self.model, search, dialect_name)
+
+        if rank is not None:
+            query = query.order_by(desc(rank), desc(SORT_TIME), desc(self.model.id))
+        else:
+            query = query.order_by(desc(SORT_TIME), desc(self.model.id))
+        if cursor:
+            sort_time, workflow_id = decode_cursor(cursor)
+            query = query.filter(tuple_(SORT_TIME, self.model.id) < tuple_(sort_time, workflow_id))
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    @staticmethod
+    def next_cursor(workflows: Sequence[Workflow], limit: int) -> Optional[str]:
+        """Cursor for the page after ``workflows``, or ``None`` if this was the last one."""
+        if len(workflows) < limit or not workflows:
+            return None
+        return encode_cursor(workflows[-1])
+
+    async def list_workflows(self, db: AsyncSession, **kwargs) -> List[Workflow]:
+        """
+        List workflows; see :meth:`_list_query` for the accepted filters.
+        With ``summary=True`` only :attr:`SUMMARY_COLUMNS` are loaded.
+        """
+        kwargs.setdefault("dialect_name", db.get_bind().dialect.name)
+        result = await db.execute(self._list_query(**kwargs))
+        return result.scalars().all()
+
     async def get_by_id(
         self, db: AsyncSession, workflow_id: uuid.UUID, user_id: Optional[uuid.UUID] = None
     ) -> Optional[Workflow]:
@@ -31,50 +124,30 @@ class WorkflowService(BaseService[Workflow]):
         user_id: uuid.UUID, 
         skip: int = 0, 
         limit: int = 100,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[Workflow]:
         """
         Get all workflows for a specific user with optional search.
         """
-        query = select(self.model).filter_by(user_id=user_id)
-        
-        # Add search filter if provided
-        if search:
-            search_filter = or_(
-                self.model.name.icontains(search),
-                self.model.description.icontains(search)
-            )
-            query = query.filter(search_filter)
-        
-        query = query.order_by(desc(self.model.updated_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await self.list_workflows(
+            db, user_id=user_id, search=search, skip=skip, limit=limit, cursor=cursor
+        )
 
     async def get_public_workflows(
         self, 
         db: AsyncSession, 
         skip: int = 0, 
         limit: int = 100,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[Workflow]:
         """
         Get all public workflows with optional search.
         """
-        query = select(self.model).filter_by(is_public=True)
-        
-        # Add search filter if provided
-        if search:
-            search_filter = or_(
-                self.model.name.icontains(search),
-                self.model.description.icontains(search)
-            )
-            query = query.filter(search_filter)
-        
-        query = query.order_by(desc(self.model.updated_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await self.list_workflows(
+            db, public_only=True, search=search, skip=skip, limit=limit, cursor=cursor
+        )
 
     async def get_accessible_workflow(
         self, db: AsyncSession, workflow_id: uuid.UUID, user_id: Optional[uuid.UUID] = None
@@ -199,20 +272,15 @@ class WorkflowTemplateService(BaseService[WorkflowTemplate]):
         limit: int = 100
     ) -> List[WorkflowTemplate]:
         """
-        Search workflow templates by name or description.
+        Search workflow templates by name or description, best matches first.
         """
-        search_filter = or_(
-            self.model.name.icontains(search_term),
-            self.model.description.icontains(search_term)
-        )
-        
-        query = (
-            select(self.model)
-            .filter(search_filter)
-            .order_by(self.model.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        query, rank = apply_text_search(
+            select(self.model), self.model, search_term, db.get_bind().dialect.name
         )
+        order = [self.model.created_at.desc()]
+        if rank is not None:
+            order.insert(0, desc(rank))
+        query = query.order_by(*order).offset(skip).limit(limit)
         
         result = await db.execute(query)
         return result.scalars().all()
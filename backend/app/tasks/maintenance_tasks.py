@@ -0,0 +1,72 @@
+from app.core.celery_app import celery_app
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Kept apart from monitoring_tasks, whose imports pull in the legacy task
+# database: periodic maintenance must register even where that is unavailable.
+
+@celery_app.task
+def maintain_partitions():
+    """
+    Create upcoming monthly history partitions and drop expired ones
+    """
+    from app.core.database import sync_engine
+    from app.core.partitioning import maintain_partitions as _maintain
+
+    try:
+        start_time = time.time()
+        with sync_engine.begin() as conn:
+            report = _maintain(conn)
+        result = {
+            'tables': report,
+            'execution_time': time.time() - start_time,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        logger.info(f"Partition maintenance completed: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        return {
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+@celery_app.task
+def rotate_credential_keys(chunk_size: int = 1000, workers: int = 4, dry_run: bool = False):
+    """
+    Re-encrypt all user credentials under the primary master key
+    """
+    from app.core.credential_rotation import rotate_credentials
+
+    try:
+        return rotate_credentials(chunk_size=chunk_size, workers=workers, dry_run=dry_run)
+    except Exception as e:
+        logger.error(f"Credential key rotation failed: {e}")
+        return {
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+@celery_app.task
+def prune_profiles():
+    """
+    Delete execution profiles older than PROFILE_RETENTION_HOURS
+    """
+    from app.core.profiler import prune_profiles as _prune
+
+    try:
+        removed = _prune()
+        logger.info(f"Profile pruning removed {removed} files")
+        return {
+            'removed': removed,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Profile pruning failed: {e}")
+        return {
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }
@@ -0,0 +1,12 @@
+"""Performance benchmarks for the workflow execution engine.
+
+Everything runs offline against deterministic fakes (see ``fakes.py``).  Run
+from the ``backend`` directory::
+
+    python -m benchmarks.run                  # full engine suite, JSON results
+    python -m benchmarks.run --compare old.json
+    python -m benchmarks.bench_logging --help
+    python -m benchmarks.load_execute --levels 1 8 32   # concurrent SSE streams via ASGI
+    python -m benchmarks.bench_db_pool --help            # needs Postgres
+    python -m benchmarks.bench_search --rows 100000      # needs Postgres + pg_trgm
+"""
@@ -0,0 +1,85 @@
+"""Execution throughput under ``debug`` vs ``production`` logging.
+
+Builds a linear ``StartNode -> N echo nodes -> EndNode`` workflow and runs it
+many times concurrently through :class:`GraphBuilder`, once per logging mode,
+with root logging at DEBUG so every hot-path record that is not sampled out
+actually reaches the handler.  Reports executions per second for each mode.
+
+    python -m benchmarks.bench_logging --executions 2000 --concurrency 100 --nodes 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.config import get_settings
+from app.core.graph_builder import GraphBuilder
+from app.core.logging_config import configure_logging
+
+from benchmarks.fakes import FAKE_NODE_REGISTRY
+from benchmarks.topologies import linear_chain
+
+
+async def run_mode(mode: str, args: argparse.Namespace, sink) -> Dict[str, Any]:
+    settings = get_settings()
+    settings.EXECUTION_LOG_MODE = mode
+    settings.EXECUTION_LOG_SAMPLE_RATE = args.sample_rate
+    settings.LOG_LEVEL = "DEBUG"
+    settings.LOG_ASYNC = not args.sync_handler
+    configure_logging(settings, stream=sink)
+
+    builder = GraphBuilder(FAKE_NODE_REGISTRY, checkpointer=MemorySaver())
+    builder.build_from_flow(linear_chain(args.nodes))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> bool:
+        async with semaphore:
+            result = await builder.execute({"input": f"request {i}"}, session_id=f"{mode}-{i}")
+            return bool(result.get("success"))
+
+    # Warm-up so one-time import / compile costs do not skew the first mode.
+    await asyncio.gather(*(one(-i - 1) for i in range(min(args.concurrency, 20))))
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(args.executions)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "executions": args.executions,
+        "failures": outcomes.count(False),
+        "seconds": round(elapsed, 3),
+        "executions_per_sec": round(args.executions / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--nodes", type=int, default=10, help="Number of echo nodes between Start and End")
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="Production-mode sampling rate")
+    parser.add_argument("--sink", choices=["devnull", "stdout"], default="devnull",
+                        help="Where log records are written (stdout measures terminal I/O cost too)")
+    parser.add_argument("--sync-handler", action="store_true", help="Disable the queue-backed log handler")
+    args = parser.parse_args()
+
+    sink = open(os.devnull, "w") if args.sink == "devnull" else sys.stdout
+    results = [asyncio.run(run_mode(mode, args, sink)) for mode in ("debug", "production")]
+
+    speedup = results[1]["executions_per_sec"] / max(results[0]["executions_per_sec"], 1e-9)
+    report = {"nodes": args.nodes, "concurrency": args.concurrency, "results": results, "speedup": round(speedup, 2)}
+    print(json.dumps(report, indent=2), file=sys.stderr if args.sink == "stdout" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Deterministic, offline stand-ins for LLM, tool, embedding and RAG nodes.
+
+The fakes keep the real node contracts (provider nodes return LangChain
+objects, processor nodes return runnables or outputs) so the graph builder,
+wrappers and serialization run exactly as in production, but nothing touches
+the network and every run produces the same output.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.tools import Tool
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from app.nodes.agents.react_agent import ReactAgentNode
+from app.nodes.base import NodeInput, NodeOutput, NodeType, ProcessorNode, ProviderNode
+from app.nodes.memory.buffer_memory import BufferMemoryNode
+from app.nodes.special.end_node import EndNode
+from app.nodes.special.start_node import StartNode
+
+__all__ = [
+    "EchoNode",
+    "SlowFakeChatModel",
+    "FakeLLMNode",
+    "FakeToolNode",
+    "FakeEmbeddingsNode",
+    "FakeRAGNode",
+    "FAKE_NODE_REGISTRY",
+]
+
+# ReAct-formatted replies: one tool call, then a final answer.
+REACT_RESPONSES = [
+    "Thought: I should look this up.\nAction: lookup\nAction Input: benchmark",
+    "Thought: I now know the final answer.\nFinal Answer: The benchmark lookup succeeded.",
+]
+
+
+class EchoNode(ProcessorNode):
+    """Processor that returns its input unchanged – no I/O, no LLM."""
+
+    def __init__(self):
+        super().__init__()
+        self._metadata = {
+            "name": "EchoNode",
+            "description": "Benchmark node that echoes its input",
+            "node_type": NodeType.PROCESSOR,
+            "inputs": [NodeInput(name="input", type="str", description="Text to echo", required=True)],
+            "outputs": [NodeOutput(name="output", type="str", description="Echoed text")],
+        }
+
+    def execute(self, inputs: Dict[str, Any], connected_nodes: Dict[str, Any]) -> Any:  # type: ignore[override]
+        return {"output": inputs.get("input", "")}
+
+
+class SlowFakeChatModel(FakeListChatModel):
+    """FakeListChatModel that blocks for ``latency_ms`` per call, like an HTTP round-trip."""
+
+    latency_ms: float = 0.0
+
+    def _call(self, *args: Any, **kwargs: Any) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return super()._call(*args, **kwargs)
+
+
+class FakeLLMNode(ProviderNode):
+    """Chat model that replays ``responses`` in order (default: a ReAct loop)."""
+
+    def __init__(self):
+        super().__init__()
+        self._metadata = {
+            "name": "FakeLLM",
+            "description": "Deterministic chat model for benchmarks",
+            "node_type": NodeType.PROVIDER,
+            "inputs": [
+                NodeInput(name="responses", type="list", description="Replies to cycle through",
+                          default=REACT_RESPONSES, required=False),
+                NodeInput(name="latency_ms", type="float", description="Simulated latency per call",
+                          default=0.0, required=False),
+            ],
+            "outputs": [NodeOutput(name="output", type="llm", description="Fake chat model")],
+        }
+
+    def execute(self, **kwargs) -> Runnable:
+        return SlowFakeChatModel(
+            responses=list(kwargs.get("responses") or REACT_RESPONSES),
+            latency_ms=float(kwargs.get("latency_ms") or 0.0),
+        )
+
+
+class FakeToolNode(ProviderNode):
+    """Tool that answers every query with a fixed-size deterministic string."""
+
+    def __init__(self):
+        super().__init__()
+        self._metadata = {
+            "name": "FakeTool",
+            "description": "Deterministic lookup tool for benchmarks",
+            "node_type": NodeType.PROVIDER,
+            "inputs": [
+                NodeInput(name="result_size", type="int", description="Characters per tool result",
+                          default=256, required=False),
+            ],
+            "outputs": [NodeOutput(name="output", type="tool", description="Fake tool")],
+        }
+
+    def execute(self, **kwargs) -> Runnable:
+        size = int(kwargs.get("result_size") or 256)
+
+        def lookup(query: str) -> str:
+            return (f"result for {query}: " * (size // 16 + 1))[:size]
+
+        return Tool(name="lookup", description="Look up a fact.", func=lookup)
+
+
+class FakeEmbeddingsNode(ProviderNode):
+    """Hash-seeded embeddings: identical text always maps to the same vector."""
+
+    def __init__(self):
+        super().__init__()
+        self._metadata = {
+            "name": "FakeEmbeddings",
+            "description": "Deterministic embeddings for benchmarks",
+            "node_type": NodeType.PROVIDER,
+            "inputs": [
+                NodeInput(name="size", type="int", description="Embedding dimension", default=384, required=False),
+            ],
+            "outputs": [NodeOutput(name="output", type="embeddings", description="Fake embeddings")],
+        }
+
+    def execute(self, **kwargs) -> Runnable:
+        return DeterministicFakeEmbedding(size=int(kwargs.get("size") or 384))  # type: ignore[return-value]
+
+
+class FakeRAGNode(ProcessorNode):
+    """Embed the query, retrieve top-k from an in-memory corpus, ask the LLM."""
+
+    _stores: Dict[tuple, InMemoryVectorStore] = {}
+
+    def __init__(self):
+        super().__init__()
+        self._metadata = {
+            "name": "FakeRAG",
+            "description": "Retrieval-augmented generation over a synthetic corpus",
+            "node_type": NodeType.PROCESSOR,
+            "inputs": [
+                NodeInput(name="llm", type="BaseLanguageModel", description="Chat model", is_connection=True),
+                NodeInput(name="embeddings", type="embeddings", description="Embedding model", is_connection=True),
+                NodeInput(name="corpus_size", type="int", description="Documents in the corpus",
+                          default=1000, required=False),
+                NodeInput(name="top_k", type="int", description="Documents to retrieve", default=4, required=False),
+            ],
+            "outputs": [NodeOutput(name="output", type="str", description="Answer")],
+        }
+
+    @classmethod
+    def _store(cls, embeddings, corpus_size: int) -> InMemoryVectorStore:
+        # The index is built once per process, like a pre-populated vector DB.
+        key = (getattr(embeddings, "size", None), corpus_size)
+        store = cls._stores.get(key)
+        if store is None:
+            store = InMemoryVectorStore(embeddings)
+            store.add_texts([f"Document {i}: synthetic fact number {i} about topic {i % 37}." for i in range(corpus_size)])
+            cls._stores[key] = store
+        return store
+
+    def execute(self, inputs: Dict[str, Any], connected_nodes: Dict[str, Runnable]) -> Runnable:  # type: ignore[override]
+        llm = connected_nodes["llm"]
+        store = self._store(connected_nodes["embeddings"], int(inputs.get("corpus_size") or 1000))
+        top_k = int(inputs.get("top_k") or 4)
+
+        def answer(question: Any) -> Dict[str, Any]:
+            question = question.get("input", "") if isinstance(question, dict) else str(question)
+            docs: List[Any] = store.similarity_search(question, k=top_k)
+            context = "\n".join(doc.page_content for doc in docs)
+            response = llm.invoke(f"Answer using the context.\n\n{context}\n\nQuestion: {question}")
+            return {"output": getattr(response, "content", str(response))}
+
+        return RunnableLambda(answer)
+
+
+FAKE_NODE_REGISTRY = {
+    "StartNode": StartNode,
+    "EndNode": EndNode,
+    "EchoNode": EchoNode,
+    "FakeLLM": FakeLLMNode,
+    "FakeTool": FakeToolNode,
+    "FakeEmbeddings": FakeEmbeddingsNode,
+    "FakeRAG": FakeRAGNode,
+    "ReactAgent": ReactAgentNode,
+    "BufferMemory": BufferMemoryNode,
+}
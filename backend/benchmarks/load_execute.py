@@ -0,0 +1,255 @@
+"""Load test for ``POST /api/v1/workflows/execute`` (SSE streaming).
+
+Runs the real workflows router in-process behind an ASGI client, with the
+engine's node registry replaced by the offline fakes from
+:mod:`benchmarks.fakes`.  Authentication goes through the real
+``get_current_user`` dependency against a throwaway SQLite database
+(``--auth db``, the default), or is stubbed out entirely (``--auth none``)
+to isolate engine cost.
+
+For each concurrency level it keeps that many streams in flight for
+``--duration`` seconds and reports:
+
+* ``ttft_p50/p95/p99_ms`` – time to first token event; flows whose stream
+  carries no token events fall back to the ``complete`` event
+* ``ttfe_p50_ms``        – time to the first SSE event of any type
+* ``total_p50/p95_ms``   – full stream duration
+* ``streams_per_sec`` / ``events_per_sec`` / ``error_rate``
+
+Thresholds make it usable as a CI gate (exit code 1 on violation)::
+
+    python -m benchmarks.load_execute --levels 1 8 32 --duration 10 \\
+        --max-p95-ttft-ms 500 --max-error-rate 0.01 --output load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import get_settings
+from app.core.logging_config import configure_logging
+
+from benchmarks.fakes import FAKE_NODE_REGISTRY
+from benchmarks.topologies import SCENARIOS, rag_pipeline, react_agent
+
+EXECUTE_PATH = "/api/v1/workflows/execute"
+
+LOAD_FLOWS = {
+    "react_agent": react_agent,
+    "rag_pipeline": rag_pipeline,
+}
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)], 2)
+
+
+def _register_fake_nodes() -> None:
+    """Make the engine see only the fakes (registry must be filled before get_engine())."""
+    from app.core.node_registry import node_registry
+
+    for node_cls in FAKE_NODE_REGISTRY.values():
+        node_registry.register_node(node_cls)
+
+
+async def build_app(auth: str) -> Tuple[FastAPI, Dict[str, str]]:
+    """Return the app under test and the headers every request should send."""
+    from app.api.workflows import router as workflows_router
+    from app.auth.dependencies import get_current_user
+
+    _register_fake_nodes()
+    app = FastAPI()
+    app.include_router(workflows_router, prefix="/api/v1/workflows")
+
+    if auth == "none":
+        from app.models.user import User
+
+        user = User(id=uuid.uuid4(), email="load@example.com", status="active", password_hash="-")
+        app.dependency_overrides[get_current_user] = lambda: user
+        return app, {}
+
+    # Real JWT + user lookup against a throwaway SQLite database.
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import app.models  # noqa: F401 – configure all mapper relationships
+    import app.models.api_key  # noqa: F401
+    from app.core.database import get_db_session
+    from app.core.security import create_access_token
+    from app.models.user import User
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="kai-load-"), "load.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(User(id=uuid.uuid4(), email="load@example.com", status="active", password_hash="-"))
+        await session.commit()
+
+    async def sqlite_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_session] = sqlite_session
+    token = create_access_token({"sub": "load@example.com"})
+    return app, {"Authorization": f"Bearer {token}"}
+
+
+async def one_stream(client: httpx.AsyncClient, headers: Dict[str, str], flow: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    first_event = first_token = complete_at = None
+    events = 0
+    error: Optional[str] = None
+    try:
+        async with client.stream(
+            "POST", EXECUTE_PATH, json={"flow_data": flow, "input_text": "load test"}, headers=headers
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return {"error": f"HTTP {response.status_code}", "events": 0}
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                now = time.perf_counter()
+                events += 1
+                first_event = first_event or now
+                event = json.loads(line[6:])
+                kind = event.get("type") or event.get("event")
+                if kind == "token" and first_token is None:
+                    first_token = now
+                elif kind == "complete":
+                    complete_at = now
+                elif kind == "error":
+                    error = str(event.get("error") or event.get("data"))
+    except Exception as e:  # noqa: BLE001 – count transport failures as errors
+        error = f"{type(e).__name__}: {e}"
+
+    if complete_at is None and error is None:
+        error = "stream ended without complete event"
+    ended = time.perf_counter()
+    ttft = (first_token or complete_at)
+    return {
+        "error": error,
+        "events": events,
+        "ttft_ms": (ttft - started) * 1000 if ttft else None,
+        "ttfe_ms": (first_event - started) * 1000 if first_event else None,
+        "total_ms": (ended - started) * 1000,
+        "real_token": first_token is not None,
+    }
+
+
+async def run_level(app: FastAPI, headers: Dict[str, str], flow: Dict[str, Any],
+                    concurrency: int, duration: float) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=120) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                results.append(await one_stream(client, headers, flow))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ok = [r for r in results if not r["error"]]
+    errors = [r["error"] for r in results if r["error"]]
+    return {
+        "concurrency": concurrency,
+        "streams": len(results),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / max(len(results), 1), 4),
+        "sample_errors": sorted(set(errors))[:3],
+        "streams_per_sec": round(len(results) / elapsed, 2),
+        "events_per_sec": round(sum(r["events"] for r in results) / elapsed, 1),
+        "ttft_p50_ms": _percentile([r["ttft_ms"] for r in ok if r["ttft_ms"] is not None], 50),
+        "ttft_p95_ms": _percentile([r["ttft_ms"] for r in ok if r["ttft_ms"] is not None], 95),
+        "ttft_p99_ms": _percentile([r["ttft_ms"] for r in ok if r["ttft_ms"] is not None], 99),
+        "ttfe_p50_ms": _percentile([r["ttfe_ms"] for r in ok if r["ttfe_ms"] is not None], 50),
+        "total_p50_ms": _percentile([r["total_ms"] for r in ok], 50),
+        "total_p95_ms": _percentile([r["total_ms"] for r in ok], 95),
+        "streams_with_tokens": sum(1 for r in ok if r["real_token"]),
+    }
+
+
+def check_thresholds(levels: List[Dict[str, Any]], args: argparse.Namespace) -> List[str]:
+    failures = []
+    for level in levels:
+        tag = f"concurrency={level['concurrency']}"
+        if args.max_error_rate is not None and level["error_rate"] > args.max_error_rate:
+            failures.append(f"{tag}: error_rate {level['error_rate']} > {args.max_error_rate}")
+        p95 = level["ttft_p95_ms"]
+        if args.max_p95_ttft_ms is not None and (p95 is None or p95 > args.max_p95_ttft_ms):
+            failures.append(f"{tag}: ttft_p95_ms {p95} > {args.max_p95_ttft_ms}")
+        if args.min_streams_per_sec is not None and level["streams_per_sec"] < args.min_streams_per_sec:
+            failures.append(f"{tag}: streams_per_sec {level['streams_per_sec']} < {args.min_streams_per_sec}")
+    return failures
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    app, headers = await build_app(args.auth)
+    if args.flow in LOAD_FLOWS:
+        flow = LOAD_FLOWS[args.flow](llm_latency_ms=args.llm_latency_ms)
+    else:
+        flow = SCENARIOS[args.flow][0]()
+
+    # Warm-up: node construction, graph compile and imports stay out of the numbers.
+    await run_level(app, headers, flow, 1, 0.5)
+
+    levels = []
+    for concurrency in args.levels:
+        print(f"concurrency {concurrency}...", file=sys.stderr)
+        levels.append(await run_level(app, headers, flow, concurrency, args.duration))
+    return {"flow": args.flow, "auth": args.auth, "llm_latency_ms": args.llm_latency_ms, "levels": levels}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flow", default="react_agent", choices=sorted(set(LOAD_FLOWS) | set(SCENARIOS)))
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrent streams per step")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Simulated LLM latency per call")
+    parser.add_argument("--auth", choices=["db", "none"], default="db")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--max-p95-ttft-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--min-streams-per-sec", type=float)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.EXECUTION_LOG_MODE = "production"
+    settings.EXECUTION_LOG_SAMPLE_RATE = 0.0
+    settings.LOG_LEVEL = "WARNING"
+    configure_logging(settings, stream=sys.stderr)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+    print(output)
+
+    failures = check_thresholds(report["levels"], args)
+    if failures:
+        print("Load-test thresholds violated:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
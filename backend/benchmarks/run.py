@@ -0,0 +1,219 @@
+"""Workflow engine benchmark suite.
+
+Drives :class:`GraphBuilder` over the scenarios in
+:mod:`benchmarks.topologies` using the offline fakes in
+:mod:`benchmarks.fakes` and measures, per scenario:
+
+* ``build_ms``            – ``build_from_flow`` (instantiate + compile)
+* ``exec_p50/p95/p99_ms`` – sequential sync execution latency
+* ``overhead_per_node_ms``– execution time not spent inside node functions,
+  divided by the number of executed nodes (from the per-execution metrics)
+* ``exec_per_sec``        – concurrent sync executions per second
+* ``stream_events_per_sec`` – SSE-style events produced per second when streaming
+* ``peak_kb`` / ``retained_kb_per_exec`` – tracemalloc peak and growth per run
+
+Results are written as JSON and can be compared with an earlier run::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare baseline.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.config import get_settings
+from app.core.graph_builder import GraphBuilder
+from app.core.logging_config import configure_logging
+
+from benchmarks.fakes import FAKE_NODE_REGISTRY
+from benchmarks.topologies import SCENARIOS, FlowData
+
+# Metrics where a larger value is an improvement; everything else is "lower is better".
+HIGHER_IS_BETTER = {"exec_per_sec", "stream_events_per_sec"}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _builder(flow: FlowData) -> GraphBuilder:
+    builder = GraphBuilder(FAKE_NODE_REGISTRY, checkpointer=MemorySaver())
+    builder.build_from_flow(copy.deepcopy(flow))
+    return builder
+
+
+async def _execute(builder: GraphBuilder, session_id: str) -> Dict[str, Any]:
+    result = await builder.execute({"input": "What does the benchmark measure?"}, session_id=session_id)
+    if not result.get("success"):
+        raise RuntimeError(f"Execution failed: {result.get('error')}")
+    return result
+
+
+async def measure_scenario(name: str, flow: FlowData, executions: int, concurrency: int) -> Dict[str, Any]:
+    # Build
+    build_times = []
+    for _ in range(5):
+        flow_copy = copy.deepcopy(flow)
+        builder = GraphBuilder(FAKE_NODE_REGISTRY, checkpointer=MemorySaver())
+        started = time.perf_counter()
+        builder.build_from_flow(flow_copy)
+        build_times.append((time.perf_counter() - started) * 1000)
+
+    # Sequential latency + framework overhead per node
+    builder = _builder(flow)
+    await _execute(builder, f"{name}-warmup")
+    latencies, overheads = [], []
+    for i in range(executions):
+        started = time.perf_counter()
+        result = await _execute(builder, f"{name}-seq-{i}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        metrics = result.get("metrics", {})
+        nodes = metrics.get("nodes", {})
+        node_ms = sum(node["duration_ms"] for node in nodes.values())
+        overheads.append((metrics.get("total_duration_ms", 0) - node_ms) / max(len(nodes), 1))
+
+    # Concurrent throughput
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> None:
+        async with semaphore:
+            await _execute(builder, f"{name}-conc-{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(executions)))
+    exec_per_sec = executions / (time.perf_counter() - started)
+
+    # Streaming throughput
+    events = 0
+    started = time.perf_counter()
+    for i in range(max(executions // 5, 1)):
+        stream = await builder.execute({"input": "stream"}, session_id=f"{name}-stream-{i}", stream=True)
+        async for _ in stream:  # type: ignore[union-attr]
+            events += 1
+    stream_events_per_sec = events / (time.perf_counter() - started)
+
+    # Memory: peak during a fresh build + executions, and growth per execution
+    gc.collect()
+    tracemalloc.start()
+    builder = _builder(flow)
+    await _execute(builder, f"{name}-mem-warmup")
+    gc.collect()
+    baseline, _ = tracemalloc.get_traced_memory()
+    mem_runs = max(executions // 5, 1)
+    for i in range(mem_runs):
+        await _execute(builder, f"{name}-mem-{i}")
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "nodes": len(flow["nodes"]),
+        "edges": len(flow["edges"]),
+        "executions": executions,
+        "build_ms": round(statistics.median(build_times), 3),
+        "exec_p50_ms": round(_percentile(latencies, 50), 3),
+        "exec_p95_ms": round(_percentile(latencies, 95), 3),
+        "exec_p99_ms": round(_percentile(latencies, 99), 3),
+        "overhead_per_node_ms": round(statistics.median(overheads), 4),
+        "exec_per_sec": round(exec_per_sec, 2),
+        "stream_events_per_sec": round(stream_events_per_sec, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "retained_kb_per_exec": round((current - baseline) / 1024 / mem_runs, 2),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the list of regressions."""
+    regressions = []
+    print(f"{'scenario':<16} {'metric':<24} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metrics in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key, value in metrics.items():
+            if key in ("nodes", "edges", "executions") or not base.get(key):
+                continue
+            change = (value - base[key]) / base[key]
+            worse = -change if key in HIGHER_IS_BETTER else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            print(f"{name:<16} {key:<24} {base[key]:>12} {value:>12} {change:>+8.1%}{flag}")
+            if flag:
+                regressions.append(f"{name}.{key}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="*", choices=sorted(SCENARIOS), help="Subset to run (default: all)")
+    parser.add_argument("--executions", type=int, help="Override executions per measurement")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative regression that fails --compare")
+    args = parser.parse_args()
+
+    # Benchmarks measure the engine, not log I/O.
+    settings = get_settings()
+    settings.EXECUTION_LOG_MODE = "production"
+    settings.EXECUTION_LOG_SAMPLE_RATE = 0.0
+    settings.LOG_LEVEL = "WARNING"
+    configure_logging(settings, stream=sys.stderr)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios or list(SCENARIOS):
+        factory, default_executions = SCENARIOS[name]
+        print(f"running {name}...", file=sys.stderr)
+        results["scenarios"][name] = asyncio.run(
+            measure_scenario(name, factory(), args.executions or default_executions, args.concurrency)
+        )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
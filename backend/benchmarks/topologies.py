@@ -0,0 +1,106 @@
+"""ReactFlow ``flow_data`` generators for representative workflow shapes.
+
+All flows use the nodes in :mod:`benchmarks.fakes` and are fully
+deterministic, so results are comparable across commits.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Tuple
+
+FlowData = Dict[str, Any]
+
+
+def _node(node_id: str, node_type: str, **data: Any) -> Dict[str, Any]:
+    return {"id": node_id, "type": node_type, "data": data}
+
+
+def _edge(source: str, target: str, target_handle: str = "input") -> Dict[str, Any]:
+    return {
+        "id": f"{source}->{target}:{target_handle}",
+        "source": source,
+        "target": target,
+        "sourceHandle": "output",
+        "targetHandle": target_handle,
+    }
+
+
+def linear_chain(length: int = 10) -> FlowData:
+    """``StartNode -> echo_0 -> ... -> echo_{length-1} -> EndNode``."""
+    ids = [f"echo_{i}" for i in range(length)]
+    nodes = [_node("start", "StartNode")] + [_node(i, "EchoNode") for i in ids] + [_node("end", "EndNode")]
+    path = ["start"] + ids + ["end"]
+    return {"nodes": nodes, "edges": [_edge(a, b) for a, b in zip(path, path[1:])]}
+
+
+def fan_out(width: int = 32) -> FlowData:
+    """One hub node fanning out to ``width`` parallel branches that join again."""
+    branches = [f"branch_{i}" for i in range(width)]
+    nodes = [_node("start", "StartNode"), _node("hub", "EchoNode"), _node("join", "EchoNode"), _node("end", "EndNode")]
+    nodes += [_node(b, "EchoNode") for b in branches]
+    edges = [_edge("start", "hub"), _edge("join", "end")]
+    for b in branches:
+        edges += [_edge("hub", b), _edge(b, "join")]
+    return {"nodes": nodes, "edges": edges}
+
+
+def react_agent(tool_result_size: int = 256, llm_latency_ms: float = 0.0) -> FlowData:
+    """ReAct agent with a fake LLM (one tool call + final answer), a tool and buffer memory."""
+    nodes = [
+        _node("start", "StartNode"),
+        _node("llm", "FakeLLM", latency_ms=llm_latency_ms),
+        _node("tool", "FakeTool", result_size=tool_result_size),
+        _node("memory", "BufferMemory"),
+        _node("agent", "ReactAgent", max_iterations=4),
+        _node("end", "EndNode"),
+    ]
+    edges = [
+        _edge("start", "agent"),
+        _edge("llm", "agent", "llm"),
+        _edge("tool", "agent", "tools"),
+        _edge("memory", "agent", "memory"),
+        _edge("agent", "end"),
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+def rag_pipeline(corpus_size: int = 1000, top_k: int = 4, llm_latency_ms: float = 0.0) -> FlowData:
+    """Embed query -> retrieve top-k from an in-memory corpus -> fake LLM answer."""
+    nodes = [
+        _node("start", "StartNode"),
+        _node("embeddings", "FakeEmbeddings", size=384),
+        _node("llm", "FakeLLM", responses=["The answer is in document 7."], latency_ms=llm_latency_ms),
+        _node("rag", "FakeRAG", corpus_size=corpus_size, top_k=top_k),
+        _node("end", "EndNode"),
+    ]
+    edges = [
+        _edge("start", "rag"),
+        _edge("embeddings", "rag", "embeddings"),
+        _edge("llm", "rag", "llm"),
+        _edge("rag", "end"),
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+def canvas(node_count: int = 500, lanes: int = 10) -> FlowData:
+    """A large canvas: ``lanes`` parallel echo chains totalling ``node_count`` nodes."""
+    depth = max(node_count // lanes, 1)
+    nodes: List[Dict[str, Any]] = [_node("start", "StartNode"), _node("end", "EndNode")]
+    edges: List[Dict[str, Any]] = []
+    for lane in range(lanes):
+        ids = [f"n_{lane}_{d}" for d in range(depth)]
+        nodes += [_node(i, "EchoNode") for i in ids]
+        path = ["start"] + ids + ["end"]
+        edges += [_edge(a, b) for a, b in zip(path, path[1:])]
+    return {"nodes": nodes, "edges": edges}
+
+
+# name -> (flow factory, default executions per measurement)
+SCENARIOS: Dict[str, Tuple[Callable[[], FlowData], int]] = {
+    "linear_10": (lambda: linear_chain(10), 200),
+    "linear_50": (lambda: linear_chain(50), 50),
+    "fan_out_32": (lambda: fan_out(32), 50),
+    "react_agent": (react_agent, 50),
+    "rag_pipeline": (rag_pipeline, 50),
+    "canvas_500": (canvas, 5),
+}
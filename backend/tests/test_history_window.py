@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("langchain")
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.core.history_window import message_tokens, split_window
+
+
+def _conversation(turns):
+    messages = []
+    for i in range(turns):
+        messages += [HumanMessage(content=f"question {i} " * 5), AIMessage(content=f"answer {i} " * 5)]
+    return messages
+
+
+def _cost(messages):
+    return sum(message_tokens(m) for m in messages)
+
+
+def test_non_positive_budget_keeps_everything():
+    messages = _conversation(3)
+    assert split_window(messages, 0) == ([], messages)
+
+
+def test_keeps_newest_whole_turns_within_budget():
+    messages = _conversation(4)
+    budget = _cost(messages[-4:])  # exactly the last two turns
+    evicted, kept = split_window(messages, budget)
+    assert kept == messages[-4:]
+    assert evicted == messages[:-4]
+
+
+def test_never_splits_a_turn():
+    messages = _conversation(3)
+    evicted, kept = split_window(messages, _cost(messages[-2:]) + _cost(messages[-3:-2]) // 2)
+    assert kept == messages[-2:]
+    assert kept[0].type == "human"
+    assert evicted + kept == messages
+
+
+def test_turn_larger_than_budget_is_evicted():
+    messages = _conversation(2)
+    evicted, kept = split_window(messages, 1)
+    assert kept == []
+    assert evicted == messages
+
+
+def test_leading_non_human_messages_form_a_turn():
+    messages = [SystemMessage(content="be brief")] + _conversation(1)
+    evicted, kept = split_window(messages, _cost(messages[1:]))
+    assert evicted == messages[:1]
+    assert kept == messages[1:]
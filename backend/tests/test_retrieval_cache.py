@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.documents import Document
+
+from app.core.retrieval_cache import RetrievalCache
+
+VECTOR = [0.1, 0.2, 0.3]
+
+
+class _Search:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [Document(page_content=f"result {self.calls}")]
+
+
+def test_repeated_search_is_served_from_cache():
+    cache, run = RetrievalCache(), _Search()
+    first = cache.search("docs", VECTOR, 4, {}, run)
+    second = cache.search("docs", VECTOR, 4, {}, run)
+    assert run.calls == 1
+    assert second == first
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_bumps_version_and_forces_a_new_search():
+    cache, run = RetrievalCache(), _Search()
+    cache.search("docs", VECTOR, 4, {}, run)
+    cache.invalidate("docs")
+    assert cache.version("docs") == 1
+    result = cache.search("docs", VECTOR, 4, {}, run)
+    assert run.calls == 2
+    assert result[0].page_content == "result 2"
+
+
+def test_invalidation_is_per_collection():
+    cache, run = RetrievalCache(), _Search()
+    cache.search("docs", VECTOR, 4, {}, run)
+    cache.invalidate("other")
+    cache.search("docs", VECTOR, 4, {}, run)
+    assert run.calls == 1
+
+
+def test_k_and_search_kwargs_are_part_of_the_key():
+    cache, run = RetrievalCache(), _Search()
+    cache.search("docs", VECTOR, 4, {}, run)
+    cache.search("docs", VECTOR, 8, {}, run)
+    cache.search("docs", VECTOR, 4, {"filter": {"source": "a"}}, run)
+    assert run.calls == 3
+
+
+def test_cached_documents_are_copies():
+    cache, run = RetrievalCache(), _Search()
+    cache.search("docs", VECTOR, 4, {}, run)[0].page_content = "changed"
+    assert cache.search("docs", VECTOR, 4, {}, run)[0].page_content == "result 1"
+
+
+def test_expired_entries_are_searched_again():
+    cache, run = RetrievalCache(ttl_seconds=0), _Search()
+    cache.search("docs", VECTOR, 4, {}, run)
+    cache.search("docs", VECTOR, 4, {}, run)
+    assert run.calls == 2
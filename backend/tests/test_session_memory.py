@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.session_memory import _MemoryBackend
+
+
+def _backend(ttl_seconds=60.0, max_sessions=10, max_bytes=0):
+    return _MemoryBackend(ttl_seconds=ttl_seconds, max_sessions=max_sessions, max_bytes=max_bytes)
+
+
+def test_append_and_read():
+    backend = _backend()
+    backend.append("a", [HumanMessage(content="hi"), AIMessage(content="hello")])
+    assert [m.content for m in backend.messages("a")] == ["hi", "hello"]
+    assert backend.messages("missing") == []
+
+
+def test_idle_session_expires():
+    backend = _backend(ttl_seconds=10)
+    backend.append("a", [HumanMessage(content="hi")])
+    backend._sessions["a"].touched -= 11
+    assert backend.messages("a") == []
+    assert backend.stats()["sessions"] == 0
+
+
+def test_expired_sessions_are_evicted_on_write():
+    backend = _backend(ttl_seconds=10)
+    backend.append("old", [HumanMessage(content="hi")])
+    backend._sessions["old"].touched -= 11
+    backend.append("new", [HumanMessage(content="hi")])
+    assert list(backend._sessions) == ["new"]
+    assert backend.evictions == 1
+
+
+def test_least_recently_used_session_evicted_beyond_max_sessions():
+    backend = _backend(max_sessions=2)
+    backend.append("a", [HumanMessage(content="1")])
+    backend.append("b", [HumanMessage(content="2")])
+    backend.messages("a")  # touch a, so b is now the oldest
+    backend.append("c", [HumanMessage(content="3")])
+    assert backend.messages("b") == []
+    assert backend.messages("a") and backend.messages("c")
+    assert backend.evictions == 1
+
+
+def test_byte_budget_evicts_oldest_but_keeps_newest():
+    backend = _backend(max_bytes=10)
+    backend.append("a", [HumanMessage(content="x" * 6)])
+    backend.append("b", [HumanMessage(content="y" * 6)])
+    assert backend.messages("a") == []
+    assert backend.stats()["content_bytes"] == 6
+
+    # A single session over the budget is kept: the session just written is never evicted
+    backend.append("c", [HumanMessage(content="z" * 20)])
+    assert [m.content for m in backend.messages("c")] == ["z" * 20]
+
+
+def test_clear_releases_bytes():
+    backend = _backend()
+    backend.append("a", [HumanMessage(content="abc")])
+    backend.clear("a")
+    assert backend.stats()["content_bytes"] == 0
@@ -0,0 +1,51 @@
+import os
+import uuid
+
+import pytest
+
+from app.core.storage_paths import safe_name, user_storage_path
+
+USER = str(uuid.uuid4())
+
+
+def test_resolves_inside_user_directory(tmp_path):
+    path = user_storage_path(str(tmp_path), USER, "indexes/docs")
+    assert path == os.path.join(os.path.realpath(tmp_path), USER, "indexes", "docs")
+
+
+def test_users_get_separate_directories(tmp_path):
+    other = str(uuid.uuid4())
+    assert user_storage_path(str(tmp_path), USER, "a") != user_storage_path(str(tmp_path), other, "a")
+    assert user_storage_path(str(tmp_path), None, "a").endswith(os.path.join("anonymous", "a"))
+
+
+@pytest.mark.parametrize("relative", ["..", "../other", "a/../../b", "a\\..\\..\\b"])
+def test_rejects_parent_components(tmp_path, relative):
+    with pytest.raises(ValueError):
+        user_storage_path(str(tmp_path), USER, relative)
+
+
+def test_rejects_absolute_path(tmp_path):
+    with pytest.raises(ValueError):
+        user_storage_path(str(tmp_path), USER, str(tmp_path / "elsewhere"))
+
+
+def test_rejects_symlink_escape(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    user_dir = tmp_path / "root" / USER
+    user_dir.mkdir(parents=True)
+    os.symlink(outside, user_dir / "link")
+    with pytest.raises(ValueError):
+        user_storage_path(str(tmp_path / "root"), USER, "link/index")
+
+
+def test_rejects_unsafe_user_id(tmp_path):
+    with pytest.raises(ValueError):
+        user_storage_path(str(tmp_path), "../admin", "a")
+
+
+@pytest.mark.parametrize("name", ["", "..", ".hidden", "a/b", "a..b", "x" * 200])
+def test_safe_name_rejects(name):
+    with pytest.raises(ValueError):
+        safe_name(name)
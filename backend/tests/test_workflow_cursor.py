@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+from app.services.workflow_service import decode_cursor, encode_cursor
+
+CREATED = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+UPDATED = datetime(2024, 6, 2, 8, 0, tzinfo=timezone.utc)
+
+
+def test_round_trip_uses_updated_at():
+    workflow = SimpleNamespace(id=uuid.uuid4(), created_at=CREATED, updated_at=UPDATED)
+    assert decode_cursor(encode_cursor(workflow)) == (UPDATED, workflow.id)
+
+
+def test_round_trip_falls_back_to_created_at_when_never_updated():
+    workflow = SimpleNamespace(id=uuid.uuid4(), created_at=CREATED, updated_at=None)
+    assert decode_cursor(encode_cursor(workflow)) == (CREATED, workflow.id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bnVsbA"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -10,6 +10,7 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";    -- UUID generation
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";     -- Encryption functions
 CREATE EXTENSION IF NOT EXISTS "pg_stat_statements";  -- Query statistics
 CREATE EXTENSION IF NOT EXISTS "btree_gin";    -- Advanced indexing
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";      -- Trigram similarity search
 
 -- ==============================================================
 -- UTILITY FUNCTIONS
@@ -142,6 +143,10 @@ CREATE TABLE workflows (
     template_source_id UUID,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED,
     
     -- Constraints
     CONSTRAINT workflows_name_length CHECK (char_length(name) >= 1 AND char_length(name) <= 255),
@@ -168,6 +173,10 @@ CREATE TABLE workflow_templates (
     documentation_url TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED,
     
     -- Constraints
     CONSTRAINT template_rating_range CHECK (rating >= 0.0 AND rating <= 5.0),
@@ -176,13 +185,16 @@ CREATE TABLE workflow_templates (
 );
 
 -- 7. WORKFLOW_EXECUTIONS TABLE
+-- Range-partitioned by month on created_at; partitions are created and dropped
+-- (retention) by app/core/partitioning.py.
 CREATE TABLE workflow_executions (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    workflow_id UUID NOT NULL,
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    workflow_id UUID, -- NULL for ad-hoc runs of unsaved flows
     user_id UUID NOT NULL,
     organization_id UUID,
     session_id VARCHAR(255),
     execution_mode VARCHAR(20) DEFAULT 'manual',
+    source VARCHAR(20) DEFAULT 'api',
     status VARCHAR(50) NOT NULL DEFAULT 'pending',
     inputs JSONB,
     outputs JSONB,
@@ -191,21 +203,25 @@ CREATE TABLE workflow_executions (
     error_code VARCHAR(50),
     error_stack_trace TEXT,
     execution_time_ms INTEGER,
+    duration_ms INTEGER,
     node_count INTEGER,
     nodes_executed INTEGER DEFAULT 0,
     memory_usage_mb INTEGER,
     started_at TIMESTAMP WITH TIME ZONE,
     completed_at TIMESTAMP WITH TIME ZONE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     
     -- Constraints
+    PRIMARY KEY (id, created_at),
     CONSTRAINT exec_status_valid CHECK (status IN ('pending', 'running', 'completed', 'failed', 'cancelled', 'timeout')),
     CONSTRAINT exec_mode_valid CHECK (execution_mode IN ('manual', 'scheduled', 'api', 'webhook')),
     CONSTRAINT exec_time_positive CHECK (execution_time_ms >= 0),
     CONSTRAINT exec_node_count_positive CHECK (node_count >= 0),
     CONSTRAINT exec_nodes_executed_valid CHECK (nodes_executed >= 0 AND nodes_executed <= node_count),
     CONSTRAINT exec_memory_positive CHECK (memory_usage_mb >= 0)
-);
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE workflow_executions_default PARTITION OF workflow_executions DEFAULT;
 
 -- 8. EXECUTION_CHECKPOINTS TABLE
 CREATE TABLE execution_checkpoints (
@@ -271,8 +287,9 @@ CREATE TABLE login_method (
 );
 
 -- 11. LOGIN_ACTIVITY TABLE
+-- Range-partitioned by month on attempted_at (see workflow_executions)
 CREATE TABLE login_activity (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     username VARCHAR(255) NOT NULL,
     user_id UUID,
     activity_code INTEGER NOT NULL,
@@ -284,14 +301,17 @@ CREATE TABLE login_activity (
     success BOOLEAN DEFAULT FALSE,
     risk_score INTEGER DEFAULT 0,
     geolocation JSONB,
-    attempted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    attempted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     
     -- Constraints
+    PRIMARY KEY (id, attempted_at),
     CONSTRAINT activity_type_valid CHECK (
         activity_type IN ('login', 'logout', 'failed_login', 'password_reset', 'account_locked', 'api_access')
     ),
     CONSTRAINT activity_risk_score_range CHECK (risk_score >= 0 AND risk_score <= 100)
-);
+) PARTITION BY RANGE (attempted_at);
+
+CREATE TABLE login_activity_default PARTITION OF login_activity DEFAULT;
 
 -- 12. CHAT_MESSAGE TABLE
 CREATE TABLE chat_message (
@@ -445,8 +465,8 @@ ALTER TABLE workflow_executions ADD CONSTRAINT fk_workflow_executions_organizati
     FOREIGN KEY (organization_id) REFERENCES organization(id) ON DELETE SET NULL;
 
 -- Execution Checkpoint constraints
-ALTER TABLE execution_checkpoints ADD CONSTRAINT fk_execution_checkpoints_execution 
-    FOREIGN KEY (execution_id) REFERENCES workflow_executions(id) ON DELETE CASCADE;
+-- No FK to workflow_executions: its key is (id, created_at). Checkpoints are
+-- deleted with their execution and before an expired partition is dropped.
 
 -- User Credential constraints
 ALTER TABLE user_credentials ADD CONSTRAINT fk_user_credentials_user 
@@ -526,6 +546,11 @@ CREATE INDEX idx_workflows_last_executed ON workflows(last_executed_at);
 CREATE INDEX idx_workflows_tags ON workflows USING GIN(tags);
 CREATE INDEX idx_workflows_flow_data_gin ON workflows USING GIN(flow_data);
 CREATE INDEX idx_workflows_user_public ON workflows(user_id, is_public);
+CREATE INDEX idx_workflows_search_vector ON workflows USING GIN(search_vector);
+CREATE INDEX idx_workflows_name_trgm ON workflows USING GIN(name gin_trgm_ops);
+-- Keyset pagination (see WorkflowService): newest first by coalesce(updated_at, created_at), id
+CREATE INDEX ix_workflows_user_updated_id ON workflows(user_id, (coalesce(updated_at, created_at)) DESC, id DESC);
+CREATE INDEX ix_workflows_public_updated_id ON workflows(is_public, (coalesce(updated_at, created_at)) DESC, id DESC);
 
 -- Workflow Template indexes
 CREATE INDEX idx_workflow_templates_category ON workflow_templates(category);
@@ -537,10 +562,11 @@ CREATE INDEX idx_workflow_templates_rating ON workflow_templates(rating);
 CREATE INDEX idx_workflow_templates_download_count ON workflow_templates(download_count);
 CREATE INDEX idx_workflow_templates_tags ON workflow_templates USING GIN(tags);
 CREATE INDEX idx_workflow_templates_flow_data_gin ON workflow_templates USING GIN(flow_data);
+CREATE INDEX idx_workflow_templates_search_vector ON workflow_templates USING GIN(search_vector);
+CREATE INDEX idx_workflow_templates_name_trgm ON workflow_templates USING GIN(name gin_trgm_ops);
 
 -- Workflow Execution indexes
-CREATE INDEX idx_workflow_executions_workflow_id ON workflow_executions(workflow_id);
-CREATE INDEX idx_workflow_executions_user_id ON workflow_executions(user_id);
+CREATE INDEX ix_workflow_executions_workflow_created ON workflow_executions(workflow_id, created_at DESC);
 CREATE INDEX idx_workflow_executions_organization_id ON workflow_executions(organization_id);
 CREATE INDEX idx_workflow_executions_status ON workflow_executions(status);
 CREATE INDEX idx_workflow_executions_session_id ON workflow_executions(session_id);
@@ -549,6 +575,8 @@ CREATE INDEX idx_workflow_executions_created_at ON workflow_executions(created_a
 CREATE INDEX idx_workflow_executions_started_at ON workflow_executions(started_at);
 CREATE INDEX idx_workflow_executions_completed_at ON workflow_executions(completed_at);
 CREATE INDEX idx_workflow_executions_user_status ON workflow_executions(user_id, status);
+CREATE INDEX ix_workflow_executions_user_created ON workflow_executions(user_id, created_at DESC, id DESC);
+CREATE INDEX ix_workflow_executions_user_status_created ON workflow_executions(user_id, status, created_at DESC);
 CREATE INDEX idx_workflow_executions_workflow_status ON workflow_executions(workflow_id, status);
 CREATE INDEX idx_workflow_executions_status_time ON workflow_executions(status, started_at) WHERE status IN ('running', 'pending');
 CREATE INDEX idx_workflow_executions_inputs_gin ON workflow_executions USING GIN(inputs);
@@ -595,6 +623,7 @@ CREATE INDEX idx_chat_message_created_at ON chat_message(created_at);
 CREATE INDEX idx_chat_message_model_used ON chat_message(model_used);
 CREATE INDEX idx_chat_message_chatflow_created ON chat_message(chatflow_id, created_at);
 CREATE INDEX idx_chat_message_session_created ON chat_message(session_id, created_at DESC);
+CREATE INDEX ix_chat_message_user_chatflow_session_created ON chat_message(user_id, chatflow_id, session_id, created_at DESC);
 
 -- Workflow Sharing indexes
 CREATE INDEX idx_workflow_sharing_workflow_id ON workflow_sharing(workflow_id);